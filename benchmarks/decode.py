@@ -0,0 +1,125 @@
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils import decoder
+
+# Compares the old handler path (full json.loads of the frame, then float()
+# on the fields) with the decoder path (split_frame + schema extraction),
+# once per available parser.
+# Usage: python benchmarks/decode.py [messages per case]
+
+
+def frame(stream, data):
+    return json.dumps({"stream": stream, "data": data}, separators=(",", ":"))
+
+
+def sample_messages():
+    rng = random.Random(1)
+    now = int(time.time() * 1000)
+
+    def levels(n):
+        return [[f"{rng.uniform(60000, 70000):.2f}", f"{rng.uniform(0, 3):.5f}"] for _ in range(n)]
+
+    ticker = frame("btcusdt@ticker", {
+        "e": "24hrTicker", "E": now, "s": "BTCUSDT", "p": "-94.99", "P": "-0.14",
+        "w": "65213.50", "x": "65500.00", "c": "65405.01", "Q": "0.002", "b": "65405.00",
+        "B": "3.1", "a": "65405.01", "A": "0.9", "o": "65500.00", "h": "66000.00",
+        "l": "64800.00", "v": "21345.12", "q": "1392345123.45", "O": now - 86400000,
+        "C": now, "F": 1, "L": 1000000, "n": 1000000
+    })
+    trade = frame("btcusdt@trade", {
+        "e": "trade", "E": now, "s": "BTCUSDT", "t": 12345, "p": "65405.01",
+        "q": "0.01200", "T": now, "m": True, "M": True
+    })
+    depth = frame("btcusdt@depth@100ms", {
+        "e": "depthUpdate", "E": now, "s": "BTCUSDT", "U": 157, "u": 160,
+        "b": levels(20), "a": levels(20)
+    })
+    kline = frame("btcusdt@kline_1m", {
+        "e": "kline", "E": now, "s": "BTCUSDT", "k": {
+            "t": now - now % 60000, "T": now - now % 60000 + 59999, "s": "BTCUSDT",
+            "i": "1m", "f": 100, "L": 200, "o": "65400.00", "c": "65405.01",
+            "h": "65410.00", "l": "65390.00", "v": "12.345", "n": 100, "x": False,
+            "q": "807000.12", "V": "6.1", "Q": "399000.01", "B": "0"
+        }
+    })
+    return ticker, trade, depth, kline
+
+
+def old_ticker(message):
+    data = json.loads(message)["data"]
+    return float(data["c"]), float(data["p"]), float(data["P"]), float(data["v"])
+
+
+def old_trade(message):
+    data = json.loads(message)["data"]
+    return float(data["p"]), float(data["q"]), data["m"]
+
+
+def old_depth(message):
+    data = json.loads(message)["data"]
+    return (data["U"], data["u"], [(float(p), float(q)) for p, q in data["b"]],
+            [(float(p), float(q)) for p, q in data["a"]])
+
+
+def old_kline(message):
+    k = json.loads(message)["data"]["k"]
+    return k["t"], float(k["o"]), float(k["h"]), float(k["l"]), float(k["c"]), float(k["v"])
+
+
+def new_ticker(message):
+    return decoder.TICKER.extract(decoder.split_frame(message)[1])
+
+
+def new_trade(message):
+    return decoder.TRADE.extract(decoder.split_frame(message)[1])
+
+
+def new_depth(message):
+    return decoder.depth_update(decoder.split_frame(message)[1])
+
+
+def new_kline(message):
+    return decoder.KLINE.extract(decoder.split_frame(message)[1])
+
+
+def rate(handler, message, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        handler(message)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    ticker, trade, depth, kline = sample_messages()
+
+    cases = [
+        ("ticker", ticker, old_ticker, new_ticker),
+        ("trade", trade, old_trade, new_trade),
+        ("depth diff", depth, old_depth, new_depth),
+        ("kline", kline, old_kline, new_kline),
+    ]
+
+    parsers = ["json"] if decoder.orjson is None else ["json", "orjson"]
+    default = decoder.PARSER
+
+    print(f"{count} messages per case, default parser: {default}")
+    for parser in parsers:
+        decoder.set_parser(parser)
+        print(f"\n{'handler':<12}{'old msg/s':>14}{parser + ' msg/s':>16}{'speedup':>10}")
+        for name, message, old, new in cases:
+            old_rate = rate(old, message, count)
+            new_rate = rate(new, message, count)
+            print(f"{name:<12}{old_rate:>14,.0f}{new_rate:>16,.0f}{new_rate / old_rate:>9.2f}x")
+
+    decoder.set_parser(default)
+
+
+if __name__ == "__main__":
+    main()
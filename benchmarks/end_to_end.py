@@ -0,0 +1,398 @@
+import argparse
+import itertools
+import json
+import os
+import resource
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+from utils import binance_rest
+from utils.market_state import MarketState
+from utils.stand_in import StandInServer
+from utils.stream_hub import StreamHub
+from utils.ui_scheduler import FrameLoop, UpdateScheduler
+
+# Drives the dashboard components with synthetic or recorded messages and
+# reports sustained msgs/s, arrival-to-painted-frame latency, render times
+# and peak RSS. Lists of values sweep over every combination, each run in
+# its own process so peak RSS stays per configuration.
+#
+#   python benchmarks/end_to_end.py
+#   python benchmarks/end_to_end.py --symbols 1,6,20 --depth 100,1000 --history 1440,10080
+#   python benchmarks/end_to_end.py --replay session.gz --rate 0
+#
+# The tk frontend uses the real widgets and needs a display (xvfb-run works);
+# the agg frontend renders the chart off-screen and runs anywhere; the text
+# frontend is the terminal dashboard's view, without matplotlib at all.
+
+SYMBOLS = ["btcusdt", "ethusdt", "solusdt", "linkusdt", "xrpusdt", "dogeusdt"]
+KINDS = ["ticker", "trade", "depth@100ms", "kline_1m"]
+
+
+class SyntheticSource:
+    # Pregenerates every frame before the run so producing them costs
+    # nothing while measuring; REST answers come from the same markets.
+
+    def __init__(self, symbols, depth, history, rate, duration, max_ticks, seed=1):
+        self.server = StandInServer(seed=seed, depth=depth, history=history)
+        self.history = history
+        self.symbols = symbols
+        self.responses = {}
+
+        now = int(time.time() * 1000)
+        for symbol in symbols:
+            self.server.market(symbol)
+            for path, params in (("/api/v3/depth", {"symbol": symbol.upper(), "limit": 1000}),
+                                 ("/api/v3/klines", {"symbol": symbol.upper(), "limit": history})):
+                status, body = self.server.on_http(f"{path}?{urlencode(params)}")
+                self.responses[(path, symbol.upper())] = json.loads(body)
+
+        ticks = int(rate * duration) if rate > 0 else max_ticks
+        interval = 1000 / rate if rate > 0 else 100
+        self.ticks = []
+        for i in range(ticks):
+            t = int(now + i * interval)
+            frames = []
+            for symbol in symbols:
+                self.server.market(symbol).step(t)
+                for kind in KINDS:
+                    stream = f"{symbol}@{kind}"
+                    data = self.server.make_payload(stream, t)
+                    if data is not None:
+                        frames.append(json.dumps({"stream": stream, "data": data}, separators=(",", ":")))
+                self.server.market(symbol).closed_candle = None
+            self.ticks.append(frames)
+
+    def response(self, path, params):
+        return self.responses[(path, params["symbol"])]
+
+
+class RecordedSource:
+    def __init__(self, path):
+        from utils.recorder import read_records
+        from utils.replay import ReplayHub
+
+        self.replay = ReplayHub(path)
+        self.ticks = []
+        self.symbols = []
+        for ts, source, data in read_records(path):
+            if source != "ws":
+                continue
+            stream = data[len('{"stream":"'):data.find('"', len('{"stream":"'))]
+            symbol = stream.partition("@")[0]
+            if symbol not in self.symbols:
+                self.symbols.append(symbol)
+            self.ticks.append([data])
+
+    def response(self, path, params):
+        return self.replay.response(path, params)
+
+
+class TimedScheduler(UpdateScheduler):
+    # Stamps every message that arrived before a frame with that frame's
+    # painted time
+
+    def __init__(self, root, fps, arrivals):
+        super().__init__(root, fps)
+        self.arrivals = arrivals
+        self.latencies = []
+        self.frames = 0
+
+    def flush(self):
+        with self.arrivals[0]:
+            batch = self.arrivals[1]
+            self.arrivals[1] = []
+
+        super().flush()
+        if hasattr(self.root, "update_idletasks"):
+            self.root.update_idletasks()
+
+        painted = time.perf_counter()
+        self.latencies.extend(painted - arrived for arrived in batch)
+        self.frames += 1
+
+
+class Timer:
+    def __init__(self, obj, name):
+        self.samples = []
+        method = getattr(obj, name)
+
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.samples.append(time.perf_counter() - started)
+
+        setattr(obj, name, timed)
+
+
+class HeadlessChart:
+    # PriceVolumeChart's data path and renderer on an off-screen Agg canvas
+
+    WINDOW = 60
+
+    def __init__(self, scheduler):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        from components.candle_renderer import CandleRenderer
+
+        self.scheduler = scheduler
+        self.state = None
+        self.series = None
+
+        self.fig = Figure(figsize=(6, 4), dpi=100)
+        gs = self.fig.add_gridspec(2, 1, height_ratios=[3, 1], hspace=0.05)
+        ax_price = self.fig.add_subplot(gs[0])
+        ax_vol = self.fig.add_subplot(gs[1], sharex=ax_price)
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.renderer = CandleRenderer(self.canvas, ax_price, ax_vol, "#EAECEF", "#2B3139", "#0ECB81", "#F6465D")
+
+    def bind(self, state):
+        from utils.resample import IntervalSeries
+
+        self.state = state
+        self.series = IntervalSeries(state.candles, "1m")
+        state.add_view(self)
+
+    def on_state(self, state, kind):
+        if kind == "candles":
+            self.scheduler.post((self, "candles"), self.render, state)
+
+    def render(self, state):
+        candles = self.series.update()
+        self.renderer.render(candles.view(self.WINDOW), full=False)
+
+
+def build_tk(scheduler_args):
+    import tkinter as tk
+    from tkinter import ttk
+    from components.chart import PriceVolumeChart
+    from components.order_book import OrderBook
+    from components.ticker import CryptoTicker
+
+    root = tk.Tk()
+    root.geometry("1000x762")
+    scheduler = TimedScheduler(root, *scheduler_args)
+
+    left = ttk.Frame(root)
+    left.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    right = ttk.Frame(root)
+    right.pack(side=tk.RIGHT, fill=tk.BOTH)
+    chart_frame = ttk.Frame(left)
+    chart_frame.pack(fill=tk.BOTH, expand=True)
+    ask_frame = ttk.Frame(right)
+    ask_frame.pack(fill=tk.BOTH, expand=True)
+    bid_frame = ttk.Frame(right)
+    bid_frame.pack(fill=tk.BOTH, expand=True)
+
+    chart = PriceVolumeChart(chart_frame, scheduler)
+    book = OrderBook(ask_frame, bid_frame, scheduler)
+    ticker = CryptoTicker(left, scheduler)
+    chart.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    book.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+    ticker.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+    timers = {"chart": Timer(chart, "render"), "book": Timer(book, "render"), "ticker": Timer(ticker, "render")}
+    return root, scheduler, [chart, book, ticker], timers
+
+
+def build_agg(scheduler_args):
+    from components.text_view import TextView
+
+    root = FrameLoop()
+    scheduler = TimedScheduler(root, *scheduler_args)
+    chart = HeadlessChart(scheduler)
+    text = TextView(scheduler)
+    timers = {"chart": Timer(chart, "render"), "book": Timer(text, "render")}
+    return root, scheduler, [chart, text], timers
+
+
+def build_text(scheduler_args):
+    from components.text_view import TextView
+
+    root = FrameLoop()
+    scheduler = TimedScheduler(root, *scheduler_args)
+    text = TextView(scheduler)
+    timers = {"book": Timer(text, "render")}
+    return root, scheduler, [text], timers
+
+
+def percentiles(samples, scale=1000):
+    if not samples:
+        return None, None, None
+    samples = np.asarray(samples) * scale
+    return float(np.mean(samples)), float(np.percentile(samples, 50)), float(np.percentile(samples, 99))
+
+
+def run(args):
+    if args.replay:
+        source = RecordedSource(args.replay)
+    else:
+        source = SyntheticSource(symbol_names(args.symbols), args.depth, args.history,
+                                 args.rate, args.duration, args.max_ticks)
+    binance_rest.set_replay(source)
+
+    arrivals = [threading.Lock(), []]
+    build = {"tk": build_tk, "agg": build_agg, "text": build_text}[args.frontend]
+    root, scheduler, views, timers = build((args.fps, arrivals))
+
+    hub = StreamHub()
+    market = MarketState(hub, scheduler, capacity=max(args.history, 60))
+    states = [market.add(symbol) for symbol in source.symbols]
+    for view in views:
+        view.bind(states[0])
+
+    # Let history and book snapshots load before the clock starts
+    deadline = time.perf_counter() + 10
+    while time.perf_counter() < deadline and not (len(states[0].candles) and states[0].book.is_synced):
+        root.update()
+        if not states[0].book.is_synced and not states[0].book.is_fetching:
+            states[0].book.request_snapshot()
+    for timer in timers.values():
+        timer.samples.clear()
+    scheduler.latencies.clear()
+    scheduler.frames = 0
+    scheduler.start()
+
+    done = threading.Event()
+    counts = {"messages": 0, "elapsed": 0.0}
+
+    def produce():
+        started = time.perf_counter()
+        for i, frames in enumerate(source.ticks):
+            if args.rate > 0 and not args.replay:
+                delay = started + i / args.rate - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            for frame in frames:
+                with arrivals[0]:
+                    arrivals[1].append(time.perf_counter())
+                hub.on_message(None, frame)
+            counts["messages"] += len(frames)
+            if time.perf_counter() - started > args.duration:
+                break
+        counts["elapsed"] = time.perf_counter() - started
+        done.set()
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    threading.Thread(target=produce, daemon=True).start()
+    while not done.is_set():
+        root.update()
+
+    # Drain: let the last messages reach a painted frame
+    drain = time.perf_counter() + 2 / args.fps
+    while time.perf_counter() < drain:
+        root.update()
+    wall = time.perf_counter() - started
+
+    scheduler.stop()
+    market.stop()
+
+    latency = percentiles(scheduler.latencies)
+    chart = percentiles(timers["chart"].samples if "chart" in timers else [])
+    book = percentiles(timers["book"].samples)
+    stats = scheduler.stats()
+    return {
+        "frontend": args.frontend,
+        "symbols": len(source.symbols),
+        "depth": args.depth,
+        "history": args.history,
+        "messages": counts["messages"],
+        "msgs_per_s": counts["messages"] / counts["elapsed"] if counts["elapsed"] else 0,
+        "fps": scheduler.frames / wall,
+        "latency_p50_ms": latency[1],
+        "latency_p99_ms": latency[2],
+        "redraw_mean_ms": chart[0],
+        "redraw_p99_ms": chart[2],
+        "book_mean_ms": book[0],
+        "coalesced": stats["coalesced"],
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "rss_growth_mb": (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024,
+    }
+
+
+def symbol_names(count):
+    return [SYMBOLS[i] if i < len(SYMBOLS) else f"sym{i}usdt" for i in range(count)]
+
+
+def fmt(value, spec):
+    return "-" if value is None else format(value, spec)
+
+
+def print_table(results):
+    columns = [
+        ("frontend", "frontend", "<9", "{}"), ("symbols", "syms", ">5", "d"), ("depth", "depth", ">6", "d"),
+        ("history", "history", ">8", "d"), ("msgs_per_s", "msg/s", ">9", ",.0f"), ("fps", "fps", ">6", ".1f"),
+        ("latency_p50_ms", "p50 ms", ">8", ".1f"), ("latency_p99_ms", "p99 ms", ">8", ".1f"),
+        ("redraw_mean_ms", "redraw ms", ">10", ".2f"), ("redraw_p99_ms", "p99", ">7", ".2f"),
+        ("book_mean_ms", "book ms", ">8", ".2f"), ("peak_rss_mb", "RSS MB", ">8", ".0f"),
+    ]
+    print("".join(format(title, align) for key, title, align, spec in columns))
+    for result in results:
+        cells = []
+        for key, title, align, spec in columns:
+            value = result[key]
+            text = value if spec == "{}" else fmt(value, spec)
+            cells.append(format(text, align))
+        print("".join(cells))
+
+
+def int_list(text):
+    return [int(value) for value in text.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end dashboard benchmark")
+    parser.add_argument("--frontend", choices=["tk", "agg", "text"], default="tk" if os.environ.get("DISPLAY") else "agg")
+    parser.add_argument("--symbols", type=int_list, default=[1], help="symbol counts to sweep, e.g. 1,6,20")
+    parser.add_argument("--depth", type=int_list, default=[100], help="book levels per side to sweep")
+    parser.add_argument("--history", type=int_list, default=[1440], help="1m candles of history to sweep")
+    parser.add_argument("--rate", type=float, default=10, help="ticks per second per symbol, 0 = as fast as possible")
+    parser.add_argument("--duration", type=float, default=5, help="seconds per run")
+    parser.add_argument("--max-ticks", type=int, default=2000, help="ticks generated when --rate is 0")
+    parser.add_argument("--fps", type=int, default=20)
+    parser.add_argument("--replay", metavar="PATH", help="drive the run from a recording instead")
+    parser.add_argument("--json", action="store_true", help="print one JSON result per run")
+    args = parser.parse_args()
+
+    if args.frontend == "tk" and not os.environ.get("DISPLAY"):
+        parser.error("the tk frontend needs a display: run under xvfb-run or use --frontend agg")
+
+    configs = list(itertools.product(args.symbols, args.depth, args.history))
+    if len(configs) == 1:
+        args.symbols, args.depth, args.history = configs[0]
+        result = run(args)
+        if args.json:
+            print(json.dumps(result))
+        else:
+            print_table([result])
+        return
+
+    results = []
+    for symbols, depth, history in configs:
+        command = [
+            sys.executable, __file__, "--json", "--frontend", args.frontend,
+            "--symbols", str(symbols), "--depth", str(depth), "--history", str(history),
+            "--rate", str(args.rate), "--duration", str(args.duration),
+            "--max-ticks", str(args.max_ticks), "--fps", str(args.fps),
+        ]
+        if args.replay:
+            command += ["--replay", args.replay]
+        output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+        print(f"done: {symbols} symbols, depth {depth}, history {history}", file=sys.stderr)
+
+    print_table(results)
+
+
+if __name__ == "__main__":
+    main()
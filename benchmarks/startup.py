@@ -0,0 +1,107 @@
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Import time breakdown of the dashboard's startup stages, measured with
+# python -X importtime in fresh interpreters (median over several runs).
+# Each stage only counts what was not already imported by an earlier one,
+# mirroring main.py: the shell before the first paint, then the network and
+# chart stacks on the loader thread.
+#
+#   python benchmarks/startup.py
+#   python benchmarks/startup.py --runs 10 --top 12
+#
+# Time to the first painted (and first live) price needs a display; run the
+# app with --startup-report for those milestones.
+
+STAGES = [
+    ("shell", [
+        "tkinter", "tkinter.ttk", "components.ticker", "components.order_book", "components.watchlist",
+        "components.metrics_overlay", "components.alerts_panel", "utils.preferences",
+        "utils.alerts", "utils.metrics", "utils.ui_scheduler",
+    ]),
+    ("network stack", ["utils.market_state", "utils.stream_hub"]),
+    ("chart stack", ["components.chart"]),
+]
+
+
+def script():
+    lines = ["import sys"]
+    for name, modules in STAGES:
+        lines.append(f"sys.stderr.write('@stage {name}\\n')")
+        for module in modules:
+            lines.append(f"try:\n    import {module}\nexcept Exception as e:\n    sys.stderr.write('@error {module}: %s\\n' % e)")
+    return "\n".join(lines)
+
+
+def run_once(code):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True
+    )
+
+    stage = None
+    totals = {}
+    modules = {}
+    errors = []
+    for line in result.stderr.splitlines():
+        if line.startswith("@stage "):
+            stage = line[7:]
+            totals[stage] = 0
+        elif line.startswith("@error "):
+            errors.append(line[7:])
+        elif line.startswith("import time:") and stage:
+            parts = line[12:].split("|")
+            if len(parts) != 3 or not parts[0].strip().isdigit():
+                continue
+            cumulative = int(parts[1])
+            name = parts[2].rstrip()
+            depth = (len(name) - len(name.lstrip())) // 2
+            if depth == 0:
+                totals[stage] += cumulative
+            if depth <= 1:
+                modules[(stage, name.strip())] = cumulative
+    return totals, modules, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup import time breakdown")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="heaviest modules listed per stage")
+    args = parser.parse_args()
+
+    code = script()
+    run_once(code)  # warm the bytecode caches
+
+    totals = {}
+    modules = {}
+    errors = set()
+    for _ in range(args.runs):
+        run_totals, run_modules, run_errors = run_once(code)
+        for stage, value in run_totals.items():
+            totals.setdefault(stage, []).append(value)
+        for key, value in run_modules.items():
+            modules.setdefault(key, []).append(value)
+        errors.update(run_errors)
+
+    for name, _ in STAGES:
+        total = statistics.median(totals.get(name, [0])) / 1000
+        print(f"{name:<40}{total:>9.1f} ms")
+        heaviest = sorted(
+            ((statistics.median(values) / 1000, module) for (stage, module), values in modules.items() if stage == name),
+            reverse=True
+        )
+        for ms, module in heaviest[:args.top]:
+            print(f"    {module:<36}{ms:>9.1f} ms")
+        print()
+
+    for error in sorted(errors):
+        print(f"import failed: {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import tkinter as tk
+from tkinter import ttk
+from utils.alerts import Alert
+
+
+class AlertsPanel:
+    # Window listing every alert, with a form adding one for the shown
+    # symbol and a log of the alerts that fired
+
+    BG = "#1A1D20"
+    TEXT_MAIN = "#EAECEF"
+    LOG_SIZE = 200
+
+    TYPES = {
+        "Price above": ("price", "above"),
+        "Price below": ("price", "below"),
+        "Price crosses": ("price", "cross"),
+        "Rises % within": ("move", "above"),
+        "Falls % within": ("move", "below"),
+        "Volume x average": ("volume", "above"),
+        "Trade larger than": ("trade", "above"),
+    }
+
+    def __init__(self, root, alerts, current_symbol):
+        self.root = root
+        self.alerts = alerts
+        self.current_symbol = current_symbol
+        self.window = None
+        self.fired = []
+
+    def toggle(self, event=None):
+        if self.window is not None:
+            self.close()
+            return
+
+        self.window = tk.Toplevel(self.root, bg=self.BG)
+        self.window.title("Alerts")
+        self.window.geometry("460x480")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        form = ttk.Frame(self.window, style="Card.TFrame", padding=10)
+        form.pack(fill=tk.X)
+
+        self.symbol_label = ttk.Label(form, style="Card.TLabel", font=("Bahnschrift", 10, "bold"), width=10)
+        self.symbol_label.grid(row=0, column=0, sticky=tk.W)
+
+        self.alert_type = tk.StringVar(value="Price above")
+        ttk.Combobox(form, textvariable=self.alert_type, values=list(self.TYPES), state="readonly", width=17).grid(
+            row=0, column=1, padx=5)
+
+        self.level = tk.StringVar()
+        level_entry = ttk.Entry(form, textvariable=self.level, width=12)
+        level_entry.grid(row=0, column=2, padx=5)
+        level_entry.bind("<Return>", self.on_add)
+
+        self.minutes = tk.StringVar(value="5")
+        ttk.Entry(form, textvariable=self.minutes, width=4).grid(row=0, column=3)
+        ttk.Label(form, text="min", style="Card.TLabel").grid(row=0, column=4, padx=(2, 5))
+        ttk.Button(form, text="Add", width=5, command=self.on_add).grid(row=0, column=5)
+
+        ttk.Label(self.window, text="Active", style="Card.TLabel", font=("Bahnschrift", 10, "bold")).pack(
+            fill=tk.X, padx=10, pady=(5, 0))
+        self.active_list = self.listbox(8)
+        self.active_list.bind("<Delete>", self.on_remove)
+        ttk.Button(self.window, text="Remove selected", command=self.on_remove).pack(anchor=tk.E, padx=10)
+
+        ttk.Label(self.window, text="Fired", style="Card.TLabel", font=("Bahnschrift", 10, "bold")).pack(
+            fill=tk.X, padx=10, pady=(5, 0))
+        self.fired_list = self.listbox(10)
+
+        self.refresh()
+        for line in self.fired:
+            self.fired_list.insert(0, line)
+
+    def listbox(self, height):
+        box = tk.Listbox(
+            self.window, height=height, font=("Consolas", 9), bg="#0B0E11", fg=self.TEXT_MAIN,
+            selectbackground="#2B3139", highlightthickness=0, borderwidth=0
+        )
+        box.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        return box
+
+    def close(self):
+        if self.window is not None:
+            self.window.destroy()
+            self.window = None
+
+    def refresh(self):
+        if self.window is None:
+            return
+        self.symbol_label.config(text=self.current_symbol().upper())
+        self.shown = sorted(self.alerts.all(), key=lambda alert: (alert.symbol, alert.kind, alert.level))
+        self.active_list.delete(0, tk.END)
+        for alert in self.shown:
+            self.active_list.insert(tk.END, alert.describe())
+
+    def log(self, line):
+        self.fired.append(line)
+        del self.fired[:-self.LOG_SIZE]
+        if self.window is not None:
+            self.fired_list.insert(0, line)
+            self.fired_list.delete(self.LOG_SIZE, tk.END)
+
+    def on_add(self, event=None):
+        kind, direction = self.TYPES[self.alert_type.get()]
+        try:
+            level = float(self.level.get().replace(",", ""))
+            window = int(float(self.minutes.get()) * 60_000)
+        except ValueError:
+            print(f"invalid alert level: {self.level.get()!r}")
+            return
+        if level <= 0 or window <= 0:
+            return
+
+        self.alerts.add(Alert(self.current_symbol(), kind, level, direction, window))
+        self.level.set("")
+        self.refresh()
+
+    def on_remove(self, event=None):
+        for index in self.active_list.curselection():
+            self.alerts.remove(self.shown[index].id)
+        self.refresh()
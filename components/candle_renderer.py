@@ -0,0 +1,317 @@
+import numpy as np
+from datetime import datetime
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.colors import to_rgba
+from matplotlib.ticker import FuncFormatter, MaxNLocator
+
+
+def vol_formatter(x, pos):
+    if x >= 1_000_000:
+        return f"{x / 1_000_000:.1f}M"
+    elif x >= 1_000:
+        return f"{x / 1_000:.0f}K"
+    return f"{int(x)}"
+
+
+def candle_geometry(opens, highs, lows, closes, volumes, x, width=0.6):
+    left = x - width / 2
+    right = x + width / 2
+
+    bottom = np.minimum(opens, closes)
+    top = bottom + np.maximum(np.abs(closes - opens), 0.0001)
+
+    wicks = np.empty((len(x), 2, 2))
+    wicks[:, 0, 0] = x
+    wicks[:, 1, 0] = x
+    wicks[:, 0, 1] = lows
+    wicks[:, 1, 1] = highs
+
+    bodies = np.empty((len(x), 4, 2))
+    bodies[:, 0] = np.column_stack((left, bottom))
+    bodies[:, 1] = np.column_stack((left, top))
+    bodies[:, 2] = np.column_stack((right, top))
+    bodies[:, 3] = np.column_stack((right, bottom))
+
+    bars = np.empty((len(x), 4, 2))
+    bars[:, 0] = np.column_stack((left, np.zeros_like(x)))
+    bars[:, 1] = np.column_stack((left, volumes))
+    bars[:, 2] = np.column_stack((right, volumes))
+    bars[:, 3] = np.column_stack((right, np.zeros_like(x)))
+
+    return wicks, bodies, bars
+
+
+class CandleRenderer:
+    WIDTH = 0.6
+    TICKS = 7
+    LINE_COLORS = {
+        "sma": "#F0B90B", "ema": "#1E90FF", "vwap": "#FF8C00",
+        "mid": "#B37FEB", "upper": "#B37FEB", "lower": "#B37FEB",
+        "rsi": "#B37FEB", "macd": "#1E90FF", "signal": "#F0B90B",
+    }
+
+    def __init__(self, canvas, ax_price, ax_vol, text, grid, green, red):
+        self.canvas = canvas
+        self.ax_price = ax_price
+        self.ax_vol = ax_vol
+        self.green = np.array(to_rgba(green))
+        self.red = np.array(to_rgba(red))
+        self.background = None
+        self.count = 0
+        self.last_time = None
+        self.xlim = None
+        self.positions = np.empty(0)
+        self.times = np.empty(0, dtype=np.int64)
+        self.time_format = "%H:%M"
+        self.text = text
+
+        # Indicators: committed values as static lines, the segment to the
+        # live candle as an animated line that is blitted with the candle
+        self.ax_lower = ax_vol.twinx()
+        self.ax_lower.set_visible(False)
+        self.ax_lower.tick_params(axis="y", colors=text, labelsize=8)
+        for spine in self.ax_lower.spines.values():
+            spine.set_visible(False)
+        self.indicator_names = ()
+        self.lines = []
+        self.line_values = []
+
+        # Closed candles: redrawn only on a full draw and cached in the background
+        self.wicks = LineCollection([], linewidths=1, zorder=3)
+        self.bodies = PolyCollection([], zorder=4)
+        self.bars = PolyCollection([], zorder=3)
+
+        # In-progress candle and last-price line: blitted on every tick
+        self.live_wick = LineCollection([], linewidths=1, zorder=3, animated=True)
+        self.live_body = PolyCollection([], zorder=4, animated=True)
+        self.live_bar = PolyCollection([], zorder=3, animated=True)
+        self.last_line = ax_price.axhline(0, linestyle="--", linewidth=1, color="#bbbbbb", zorder=2, animated=True)
+
+        for artist in (self.wicks, self.bodies, self.live_wick, self.live_body):
+            ax_price.add_collection(artist)
+        for artist in (self.bars, self.live_bar):
+            ax_vol.add_collection(artist)
+
+        for ax, label in ((ax_price, "Price"), (ax_vol, "Volume")):
+            ax.grid(True, color=grid, linewidth=0.6, zorder=0)
+            ax.set_ylabel(label, color=text)
+            ax.tick_params(axis="y", colors=text)
+            for spine in ax.spines.values():
+                spine.set_visible(False)
+
+        ax_price.tick_params(axis="x", bottom=False, labelbottom=False)
+        ax_vol.tick_params(axis="x", colors=text, labelrotation=30)
+        ax_vol.yaxis.set_major_formatter(FuncFormatter(vol_formatter))
+
+        # x is in candles; ticks follow zoom and pan and are labelled with
+        # the time of the nearest drawn bar
+        ax_vol.xaxis.set_major_locator(MaxNLocator(self.TICKS, integer=True))
+        ax_vol.xaxis.set_major_formatter(FuncFormatter(self.format_time))
+
+        self.draw_cid = self.canvas.mpl_connect("draw_event", self.on_draw)
+
+    def colors(self, opens, closes):
+        return np.where((closes >= opens)[:, None], self.green, self.red)
+
+    def format_time(self, x, pos):
+        if not len(self.positions):
+            return ""
+        i = min(int(np.searchsorted(self.positions, x)), len(self.positions) - 1)
+        if i and x - self.positions[i - 1] < self.positions[i] - x:
+            i -= 1
+        return datetime.fromtimestamp(self.times[i] / 1000).strftime(self.time_format)
+
+    def set_indicators(self, indicators):
+        for record in self.lines:
+            record[2].remove()
+            record[3].remove()
+        for ax in (self.ax_price, self.ax_lower):
+            if ax.get_legend():
+                ax.get_legend().remove()
+
+        self.indicator_names = tuple(indicator.name for indicator in indicators)
+        self.lines = []
+        handles = {self.ax_price: [], self.ax_lower: []}
+
+        for indicator in indicators:
+            ax = self.ax_price if indicator.panel == "price" else self.ax_lower
+            for index, line in enumerate(indicator.lines):
+                color = self.LINE_COLORS.get(line)
+                if color is None:
+                    continue
+                static, = ax.plot([], [], color=color, linewidth=1, zorder=5, label=indicator.name)
+                live, = ax.plot([], [], color=color, linewidth=1, zorder=5, animated=True)
+                self.lines.append((indicator, index, static, live, ax))
+                if index == 0:
+                    handles[ax].append(static)
+
+        self.ax_lower.set_visible(bool(handles[self.ax_lower]))
+        for ax, lines in handles.items():
+            if lines:
+                ax.legend(handles=lines, loc="upper left", fontsize=7, frameon=False, labelcolor=self.text)
+
+    def render(self, candles, full=True, indicators=(), positions=None, width=WIDTH, xlim=None, live=True):
+        # positions: x of each row (default 0..n-1), width: bar width in x
+        # units, live: the last row is the in-progress candle (blitted)
+        if tuple(indicator.name for indicator, values in indicators) != self.indicator_names:
+            self.set_indicators([indicator for indicator, values in indicators])
+            full = True
+        values = {id(indicator): values for indicator, values in indicators}
+        self.line_values = [values[id(record[0])][record[1]] for record in self.lines]
+
+        if len(candles) == 0:
+            if self.count:
+                self.clear()
+            return
+
+        if positions is None:
+            positions = np.arange(len(candles), dtype=float)
+        if xlim is None:
+            xlim = (-1, len(candles))
+        last_time = candles["time"][-1]
+
+        if (full or not live or self.background is None or len(candles) != self.count or last_time != self.last_time
+                or xlim != self.xlim or self.out_of_view(candles["high"][-1], candles["low"][-1], candles["volume"][-1])):
+            self.last_time = last_time
+            self.xlim = xlim
+            self.draw_full(candles, positions, width, live)
+        else:
+            self.set_live(candles, positions, width)
+            self.blit()
+
+    def clear(self):
+        self.count = 0
+        self.last_time = None
+        self.positions = np.empty(0)
+        self.wicks.set_segments([])
+        for artist in (self.bodies, self.bars):
+            artist.set_verts([])
+        for record in self.lines:
+            record[2].set_data([], [])
+        self.clear_live()
+        self.canvas.draw()
+
+    def out_of_view(self, high, low, volume):
+        y_lo, y_hi = self.ax_price.get_ylim()
+        if high > y_hi or low < y_lo or volume > self.ax_vol.get_ylim()[1]:
+            return True
+
+        for record, values in zip(self.lines, self.line_values):
+            value = values[-1]
+            lo, hi = record[4].get_ylim()
+            if value > hi or value < lo:
+                return True
+        return False
+
+    def value_range(self, ax):
+        values = [values for record, values in zip(self.lines, self.line_values) if record[4] is ax]
+        if not values:
+            return None
+        values = np.concatenate(values)
+        values = values[np.isfinite(values)]
+        if not len(values):
+            return None
+        return float(values.min()), float(values.max())
+
+    def draw_full(self, candles, positions, width, live):
+        n = len(candles)
+        self.count = n
+        self.positions = positions
+        self.times = candles["time"]
+
+        # Without a live candle in view every row is drawn as a static bar
+        static = candles[:-1] if live else candles
+        wicks, bodies, bars = candle_geometry(
+            static["open"], static["high"], static["low"], static["close"], static["volume"],
+            positions[:len(static)], width
+        )
+        colors = self.colors(static["open"], static["close"])
+
+        self.wicks.set_segments(wicks)
+        self.wicks.set_color(colors)
+        self.bodies.set_verts(bodies)
+        self.bodies.set_facecolor(colors)
+        self.bodies.set_edgecolor(colors)
+        self.bars.set_verts(bars)
+        self.bars.set_facecolor(colors)
+
+        if live:
+            self.set_live(candles, positions, width)
+        else:
+            self.clear_live()
+
+        for record, values in zip(self.lines, self.line_values):
+            record[2].set_data(positions[:len(static)], values[:len(static)])
+
+        lo = float(np.min(candles["low"]))
+        hi = float(np.max(candles["high"]))
+        overlay = self.value_range(self.ax_price)
+        if overlay:
+            lo = min(lo, overlay[0])
+            hi = max(hi, overlay[1])
+        pad = (hi - lo) * 0.05 or hi * 0.001 or 1
+        self.ax_price.set_xlim(*self.xlim)
+        self.ax_price.set_ylim(lo - pad, hi + pad)
+        self.ax_vol.set_ylim(0, float(np.max(candles["volume"])) * 1.1 or 1)
+
+        limits = next((record[0].limits for record in self.lines if record[4] is self.ax_lower), None)
+        lower = limits or self.value_range(self.ax_lower)
+        if lower:
+            pad = (lower[1] - lower[0]) * 0.1 or abs(lower[1]) * 0.1 or 1
+            self.ax_lower.set_ylim(lower[0] - pad, lower[1] + pad)
+
+        self.canvas.draw()
+
+    def set_live(self, candles, positions, width):
+        live = candles[-1:]
+        opens = live["open"]
+        closes = live["close"]
+        wicks, bodies, bars = candle_geometry(
+            opens, live["high"], live["low"], closes, live["volume"], positions[-1:], width
+        )
+        colors = self.colors(opens, closes)
+
+        self.live_wick.set_segments(wicks)
+        self.live_wick.set_color(colors)
+        self.live_body.set_verts(bodies)
+        self.live_body.set_facecolor(colors)
+        self.live_body.set_edgecolor(colors)
+        self.live_bar.set_verts(bars)
+        self.live_bar.set_facecolor(colors)
+        self.last_line.set_ydata([closes[-1], closes[-1]])
+
+        x = positions[-2:]
+        for record, values in zip(self.lines, self.line_values):
+            record[3].set_data(x, values[len(values) - len(x):])
+
+    def clear_live(self):
+        self.live_wick.set_segments([])
+        for artist in (self.live_body, self.live_bar):
+            artist.set_verts([])
+        self.last_line.set_ydata([float("nan")] * 2)
+        for record in self.lines:
+            record[3].set_data([], [])
+
+    def live_artists(self):
+        return (
+            (self.ax_price, self.last_line),
+            (self.ax_price, self.live_wick),
+            (self.ax_price, self.live_body),
+            (self.ax_vol, self.live_bar),
+        ) + tuple((record[4], record[3]) for record in self.lines)
+
+    def close(self):
+        self.canvas.mpl_disconnect(self.draw_cid)
+        self.background = None
+
+    def on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        for ax, artist in self.live_artists():
+            ax.draw_artist(artist)
+
+    def blit(self):
+        self.canvas.restore_region(self.background)
+        for ax, artist in self.live_artists():
+            ax.draw_artist(artist)
+        self.canvas.blit(self.ax_price.bbox)
+        self.canvas.blit(self.ax_vol.bbox)
@@ -1,21 +1,41 @@
+import math
 import tkinter as tk
 from tkinter import ttk
-import threading
-import requests
-import websocket
-import json
-from datetime import datetime
+import numpy as np
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.patches as patches
-
-
-class PriceVolumeChart:
-    def __init__(self, parent, symbol):
+from components.candle_renderer import CandleRenderer
+from utils.indicators import AVAILABLE, IndicatorSet
+from utils.metrics import metrics
+from utils.resample import IntervalSeries, decimate
+from utils.symbol_view import SymbolView
+
+
+class PriceVolumeChart(SymbolView):
+    # Mouse wheel zooms, dragging pans back through the history and a double
+    # click returns to the latest candles. The view is `span` candles ending
+    # `offset` candles before the newest (0 = following the live candle).
+
+    KINDS = ("candles",)
+    WINDOW = 60
+    MIN_SPAN = 20
+    ZOOM_STEP = 1.25
+    BAR_PIXELS = 3
+    INTERVALS = ["1m", "5m", "15m", "1h", "4h", "1d"]
+    TIME_FORMATS = {"1h": "%d %H:%M", "4h": "%d %H:%M", "1d": "%m-%d"}
+
+    def __init__(self, parent, scheduler, interval="1m", on_interval_change=None,
+                 indicators=(), on_indicators_change=None):
+        super().__init__(scheduler)
         self.parent = parent
-        self.symbol = symbol.lower()
-        self.is_active = False
-        self.ws = None
+        self.on_interval_change = on_interval_change
+        self.on_indicators_change = on_indicators_change
+        self.series = None
+        self.indicators = IndicatorSet(indicators)
+        self.span = self.WINDOW
+        self.offset = 0
+        self.last_time = None
+        self.drag = None
 
         self.BG = "#1A1D20"
         self.GRID = "#2B3139"
@@ -23,15 +43,32 @@ class PriceVolumeChart:
         self.GREEN = "#0ECB81"
         self.RED = "#F6465D"
 
-        self.times = []
-        self.opens = []
-        self.highs = []
-        self.lows = []
-        self.closes = []
-        self.volumes = []
-
         self.frame = ttk.Frame(parent, style="Card.TFrame")
 
+        self.toolbar = ttk.Frame(self.frame, style="Card.TFrame")
+        self.toolbar.pack(fill=tk.X, padx=10, pady=(10, 0))
+
+        self.interval = tk.StringVar(value=interval if interval in self.INTERVALS else "1m")
+        self.interval_combo = ttk.Combobox(
+            self.toolbar,
+            textvariable=self.interval,
+            values=self.INTERVALS,
+            state="readonly",
+            width=5
+        )
+        self.interval_combo.pack(side=tk.RIGHT)
+        self.interval_combo.bind("<<ComboboxSelected>>", self.on_interval_select)
+
+        self.indicator_button = ttk.Menubutton(self.toolbar, text="Indicators")
+        self.indicator_button.pack(side=tk.RIGHT, padx=(0, 6))
+        self.indicator_menu = tk.Menu(self.indicator_button, tearoff=False)
+        self.indicator_button["menu"] = self.indicator_menu
+        self.indicator_vars = {}
+        for name in AVAILABLE:
+            var = tk.BooleanVar(value=name in indicators)
+            self.indicator_vars[name] = var
+            self.indicator_menu.add_checkbutton(label=name, variable=var, command=self.on_indicator_select)
+
         self.fig = Figure(figsize=(6, 4), dpi=100)
         self.fig.patch.set_facecolor(self.BG)
 
@@ -45,207 +82,147 @@ class PriceVolumeChart:
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.frame)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
-    def start(self):
-        if self.is_active:
-            return
-        self.is_active = True
-        self.load_history()
-        self.start_ws()
-
-    def stop(self):
-        self.is_active = False
-        if self.ws:
-            self.ws.close()
-            self.ws = None
-
-    def load_history(self):
-        url = "https://api.binance.com/api/v3/klines"
-        params = {
-            "symbol": self.symbol.upper(),
-            "interval": "1m",
-            "limit": 60
-        }
-
-        def task():
-            try:
-                r = requests.get(url, params=params, timeout=5)
-                klines = r.json()
-
-                self.times.clear()
-                self.opens.clear()
-                self.highs.clear()
-                self.lows.clear()
-                self.closes.clear()
-                self.volumes.clear()
-
-                for k in klines:
-                    self.times.append(datetime.fromtimestamp(k[0] / 1000).strftime("%H:%M"))
-                    self.opens.append(float(k[1]))
-                    self.highs.append(float(k[2]))
-                    self.lows.append(float(k[3]))
-                    self.closes.append(float(k[4]))
-                    self.volumes.append(float(k[5]))
-
-                self.parent.after(0, self.redraw)
-
-            except Exception as e:
-                print("REST error:", e)
-
-        threading.Thread(target=task, daemon=True).start()
-
-    def start_ws(self):
-        url = f"wss://stream.binance.com:9443/ws/{self.symbol}@kline_1m"
-
-        self.ws = websocket.WebSocketApp(
-            url,
-            on_message=self.on_ws_message,
-            on_open=lambda ws: print(f"{self.symbol} kline connected"),
-            on_close=lambda ws, a, b: print(f"{self.symbol} kline closed"),
-            on_error=lambda ws, e: print(f"{self.symbol} kline error:", e)
-        )
-
-        threading.Thread(target=self.ws.run_forever, daemon=True).start()
-
-    def on_ws_message(self, ws, message):
-        if not self.is_active:
-            return
-
-        data = json.loads(message)
-        k = data["k"]
-
-        time = datetime.fromtimestamp(k["t"] / 1000).strftime("%H:%M")
-        o = float(k["o"])
-        h = float(k["h"])
-        l = float(k["l"])
-        c = float(k["c"])
-        v = float(k["v"])
-        closed = k["x"]
-
-        self.parent.after(
-            0,
-            self.update_candle,
-            time, o, h, l, c, v, closed
+        self.renderer = CandleRenderer(
+            self.canvas, self.ax_price, self.ax_vol,
+            self.TEXT, self.GRID, self.GREEN, self.RED
         )
+        self.renderer.time_format = self.TIME_FORMATS.get(self.interval.get(), "%H:%M")
 
-    def update_candle(self, time, o, h, l, c, v, closed):
-        if not self.opens:
-            return
+        self.canvas.mpl_connect("scroll_event", self.on_scroll)
+        self.canvas.mpl_connect("button_press_event", self.on_press)
+        self.canvas.mpl_connect("motion_notify_event", self.on_motion)
+        self.canvas.mpl_connect("button_release_event", self.on_release)
 
-        if closed:
-            self.times.append(time)
-            self.opens.append(o)
-            self.highs.append(h)
-            self.lows.append(l)
-            self.closes.append(c)
-            self.volumes.append(v)
-        else:
-            self.highs[-1] = h
-            self.lows[-1] = l
-            self.closes[-1] = c
-            self.volumes[-1] = v
-            self.times[-1] = time
-
-        self.times = self.times[-60:]
-        self.opens = self.opens[-60:]
-        self.highs = self.highs[-60:]
-        self.lows = self.lows[-60:]
-        self.closes = self.closes[-60:]
-        self.volumes = self.volumes[-60:]
+    def reset(self):
+        self.series = IntervalSeries(self.state.candles, self.interval.get())
+        self.reset_view()
 
+    def refresh(self, state):
         self.redraw()
 
-    def redraw(self):
-        from matplotlib.ticker import FuncFormatter, ScalarFormatter
-
-        self.ax_price.clear()
-        self.ax_vol.clear()
-
-        self.ax_price.set_facecolor(self.BG)
-        self.ax_vol.set_facecolor(self.BG)
-
-        width = 0.6
-        volume_colors = []
-
-        self.ax_price.grid(True, color=self.GRID, linewidth=0.6, zorder=0)
-        self.ax_vol.grid(True, color=self.GRID, linewidth=0.6, zorder=0)
-
-        for i in range(len(self.opens)):
-            o = self.opens[i]
-            h = self.highs[i]
-            l = self.lows[i]
-            c = self.closes[i]
-
-            color = self.GREEN if c >= o else self.RED
-            volume_colors.append(color)
-
-            # Wick
-            self.ax_price.plot(
-                [i, i], [l, h],
-                color=color,
-                linewidth=1,
-                zorder=3
-            )
+    def unbind(self):
+        super().unbind()
+        self.series = None
+        self.indicators.reset()
+
+    def destroy(self):
+        self.unbind()
+        self.renderer.close()
+        self.canvas.get_tk_widget().destroy()
+        self.fig.clear()
+        self.frame.destroy()
+
+    def show_candles(self, state):
+        self.redraw(full=False)
+
+    def on_indicator_select(self):
+        names = [name for name, var in self.indicator_vars.items() if var.get()]
+        self.indicators = IndicatorSet(names)
+        if self.on_indicators_change:
+            self.on_indicators_change(names)
+        if self.state:
+            self.redraw()
+
+    def on_interval_select(self, event=None):
+        interval = self.interval.get()
+        self.renderer.time_format = self.TIME_FORMATS.get(interval, "%H:%M")
+        if self.on_interval_change:
+            self.on_interval_change(interval)
+
+        # Switching interval is a local re-aggregation of the 1m candles
+        if self.state:
+            self.series = IntervalSeries(self.state.candles, interval)
+            self.reset_view()
+            self.redraw()
+
+    def reset_view(self):
+        self.span = self.WINDOW
+        self.offset = 0
+        self.last_time = None
+
+    def set_view(self, span, offset):
+        size = len(self.series.candles) if self.series else 0
+        span = int(round(min(max(span, self.MIN_SPAN), max(size, self.MIN_SPAN))))
+        offset = int(round(min(max(offset, 0), max(size - span, 0))))
+        if (span, offset) != (self.span, self.offset):
+            self.span = span
+            self.offset = offset
+            self.scheduler.post((self, "view"), self.redraw)
+
+    def on_scroll(self, event):
+        if not self.series or event.inaxes not in (self.ax_price, self.ax_vol):
+            return
+        span = self.span / self.ZOOM_STEP if event.step > 0 else self.span * self.ZOOM_STEP
+
+        # Following the live candle stays anchored to it; otherwise the
+        # candle under the cursor stays put
+        offset = self.offset
+        if offset and event.xdata is not None:
+            share = (-offset - event.xdata) / self.span
+            offset = -event.xdata - share * span
+        self.set_view(span, offset)
+
+    def on_press(self, event):
+        if event.inaxes not in (self.ax_price, self.ax_vol) or event.button != 1:
+            return
+        if event.dblclick:
+            self.set_view(self.WINDOW, 0)
+            return
+        self.drag = (event.x, self.offset)
 
-            # Body
-            rect = patches.Rectangle(
-                (i - width / 2, min(o, c)),
-                width,
-                max(abs(c - o), 0.0001),
-                facecolor=color,
-                edgecolor=color,
-                zorder=4
+    def on_motion(self, event):
+        if self.drag is None:
+            return
+        x, offset = self.drag
+        moved = (event.x - x) / (self.ax_price.bbox.width or 1) * self.span
+        self.set_view(self.span, offset + moved)
+
+    def on_release(self, event):
+        self.drag = None
+
+    def detail(self, span):
+        # Candles merged per drawn bar: a power of two, so zooming out
+        # regroups bars instead of reshuffling them
+        bars = max(self.ax_price.bbox.width / self.BAR_PIXELS, 1)
+        if span <= bars:
+            return 1
+        return 2 ** math.ceil(math.log2(span / bars))
+
+    def redraw(self, full=True):
+        with metrics.timed("chart_redraw"):
+            candles = self.series.update()
+            self.indicators.update(candles)
+
+            last = candles.last_time
+            moved = last is not None and self.last_time is not None and last > self.last_time
+            if self.offset and moved:
+                # Panned back: keep the same candles in view as new ones arrive
+                self.offset += (last - self.last_time) // self.series.step
+            self.last_time = last
+            if self.offset and not full:
+                return
+
+            size = len(candles)
+            end = max(size - self.offset, 0)
+            start = max(end - self.span, 0)
+            factor = self.detail(end - start)
+            if factor > 1:
+                # Reach back to the start of the bar cut by the left edge
+                start = max(start - factor, 0)
+
+            rows = candles.view()[start:end]
+            positions = np.arange(start - size + 1, end - size + 1, dtype=float)
+            indicators = [(indicator, values[:, start:end]) for indicator, values in self.indicators.view(size)]
+            width = self.renderer.WIDTH
+            if factor > 1:
+                rows, positions, ends = decimate(rows, positions, self.series.step * factor)
+                indicators = [(indicator, values[:, ends]) for indicator, values in indicators]
+                width *= factor
+
+            self.renderer.render(
+                rows, full=full, indicators=indicators, positions=positions, width=width,
+                xlim=(-self.offset - self.span, -self.offset + 1), live=not self.offset
             )
-            self.ax_price.add_patch(rect)
-
-        self.ax_price.axhline(
-            self.closes[-1],
-            linestyle="--",
-            linewidth=1,
-            color="#bbbbbb",
-            zorder=2
-        )
-
-        self.ax_price.set_ylabel("Price", color=self.TEXT)
-        self.ax_price.tick_params(axis="y", colors=self.TEXT)
-        self.ax_price.tick_params(axis="x", bottom=False, labelbottom=False)
-
-        for spine in self.ax_price.spines.values():
-            spine.set_visible(False)
-
-        self.ax_vol.bar(
-            range(len(self.volumes)),
-            self.volumes,
-            color=volume_colors,
-            width=0.6,
-            zorder=3
-        )
-
-        def vol_formatter(x, pos):
-            if x >= 1_000_000:
-                return f"{x / 1_000_000:.1f}M"
-            elif x >= 1_000:
-                return f"{x / 1_000:.0f}K"
-            return f"{int(x)}"
-
-        self.ax_vol.yaxis.set_major_formatter(FuncFormatter(vol_formatter))
-
-        sf = ScalarFormatter(useMathText=False)
-        sf.set_scientific(False)
-        sf.set_useOffset(False)
-        self.ax_vol.yaxis.set_major_formatter(FuncFormatter(vol_formatter))
-
-        self.ax_vol.set_ylabel("Volume", color=self.TEXT)
-        self.ax_vol.tick_params(axis="y", colors=self.TEXT)
-        self.ax_vol.tick_params(axis="x", colors=self.TEXT)
-
-        step = 10
-        self.ax_vol.set_xticks(range(0, len(self.times), step))
-        self.ax_vol.set_xticklabels(self.times[::step], rotation=30, ha="right")
-
-        for spine in self.ax_vol.spines.values():
-            spine.set_visible(False)
-
-        self.canvas.draw()
 
     def pack(self, **kwargs):
         self.frame.pack(**kwargs)
@@ -0,0 +1,195 @@
+import time
+import tkinter as tk
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from utils.liquidity import LiquidityHistory
+from utils.metrics import metrics
+
+
+class DepthView:
+    # Window with the liquidity heatmap (time x price, from the symbol's
+    # LiquidityHistory) and the cumulative depth of the current book beside
+    # it on the same price axis. The heatmap is one image artist whose array
+    # is refilled in place, and the figure is only redrawn when it gains a
+    # column or the axes have to move; in between, the depth curves (from
+    # preallocated level buffers) are blitted over the saved background.
+
+    BG = "#1A1D20"
+    GRID = "#2B3139"
+    TEXT = "#EAECEF"
+    GREEN = "#0ECB81"
+    RED = "#F6465D"
+    LEVELS = LiquidityHistory.LEVELS
+    MIN_INTERVAL = 0.1
+
+    def __init__(self, root, scheduler):
+        self.root = root
+        self.scheduler = scheduler
+        self.state = None
+        self.window = None
+        self.last_render = 0
+        self.column = None
+        self.background = None
+
+        columns = LiquidityHistory.COLUMNS
+        self.mids = np.full(columns, np.nan)
+        self.times = (np.arange(columns) - columns + 1) * LiquidityHistory.INTERVAL / 1000
+        self.extent = (self.times[0], self.times[-1], 0, 1)
+        self.depth = np.empty((2, self.LEVELS, 2))
+
+    def bind(self, state):
+        self.unbind()
+        self.state = state
+        self.column = None
+        if self.window is not None:
+            state.add_view(self)
+            self.render(state)
+
+    def unbind(self):
+        if self.state:
+            self.state.remove_view(self)
+        self.scheduler.discard(self)
+
+    def toggle(self, event=None):
+        if self.window is not None:
+            self.close()
+            return
+
+        self.window = tk.Toplevel(self.root, bg=self.BG)
+        self.window.title("Depth")
+        self.window.geometry("900x520")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.fig = Figure(figsize=(9, 5), dpi=100)
+        self.fig.patch.set_facecolor(self.BG)
+        gs = self.fig.add_gridspec(1, 2, width_ratios=[4, 1], wspace=0.04)
+        self.ax_heat = self.fig.add_subplot(gs[0])
+        self.ax_depth = self.fig.add_subplot(gs[1], sharey=self.ax_heat)
+
+        self.heatmap = self.ax_heat.imshow(
+            np.zeros((LiquidityHistory.BINS, LiquidityHistory.COLUMNS), dtype=np.float32),
+            origin="lower", aspect="auto", cmap="magma", interpolation="nearest", extent=self.extent
+        )
+        # The artist's own array is the buffer LiquidityHistory.read fills
+        self.image = self.heatmap.get_array().data
+        self.mid_line, = self.ax_heat.plot(self.times, self.mids, color=self.TEXT, linewidth=0.8)
+        self.bid_line, = self.ax_depth.plot([], [], color=self.GREEN, linewidth=1.2, drawstyle="steps-pre", animated=True)
+        self.ask_line, = self.ax_depth.plot([], [], color=self.RED, linewidth=1.2, drawstyle="steps-pre", animated=True)
+
+        for ax in (self.ax_heat, self.ax_depth):
+            ax.set_facecolor(self.BG)
+            ax.tick_params(colors=self.TEXT, labelsize=8)
+            for spine in ax.spines.values():
+                spine.set_visible(False)
+        self.ax_heat.set_xlabel("seconds ago", color=self.TEXT, fontsize=8)
+        self.ax_heat.set_ylabel("Price", color=self.TEXT)
+        self.ax_depth.set_xlabel("cumulative", color=self.TEXT, fontsize=8)
+        self.ax_depth.grid(True, color=self.GRID, linewidth=0.6)
+        self.ax_depth.tick_params(axis="y", left=False, labelleft=False)
+
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self.window)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.canvas.mpl_connect("draw_event", self.on_draw)
+        self.background = None
+
+        if self.state:
+            self.bind(self.state)
+
+    def close(self):
+        if self.window is None:
+            return
+        self.unbind()
+        self.canvas.get_tk_widget().destroy()
+        self.fig.clear()
+        self.window.destroy()
+        self.window = None
+
+    def destroy(self):
+        self.close()
+        self.state = None
+
+    def on_state(self, state, kind):
+        if kind == "book":
+            self.scheduler.post((self, "book"), self.render, state)
+
+    def render(self, state):
+        if state is not self.state or self.window is None:
+            return
+
+        # Books change every 100ms; the next change redraws anything skipped here
+        now = time.monotonic()
+        if now - self.last_render < self.MIN_INTERVAL:
+            return
+        self.last_render = now
+
+        with metrics.timed("depth_render"):
+            low, high, largest = self.update_depth(state.book)
+            full = self.background is None
+
+            liquidity = state.liquidity
+            if liquidity is not None:
+                limits = None
+                if liquidity.column != self.column:
+                    self.column = liquidity.column
+                    limits = liquidity.read(self.image, self.mids)
+                if limits:
+                    low, high = limits
+                    self.heatmap.set_extent((self.times[0], self.times[-1], low, high))
+                    self.heatmap.set_clim(0, float(self.image.max()) or 1)
+                    self.heatmap.changed()
+                    self.mid_line.set_ydata(self.mids)
+                    full = True
+                elif self.column is not None:
+                    low, high = self.ax_heat.get_ylim()
+
+            if low is not None:
+                full = self.set_limits(low, high, largest) or full
+
+            if full:
+                self.ax_heat.set_title(state.symbol.upper(), color=self.TEXT, fontsize=10, loc="left")
+                self.canvas.draw()
+            else:
+                self.blit()
+
+    def set_limits(self, low, high, largest):
+        # Limits only move when the data leaves them or shrinks to under half
+        # of them, so most updates can blit. True when they moved.
+        moved = False
+        y_lo, y_hi = self.ax_heat.get_ylim()
+        if low < y_lo or high > y_hi or (high - low) < (y_hi - y_lo) / 2:
+            self.ax_heat.set_ylim(low, high)
+            moved = True
+
+        x_hi = self.ax_depth.get_xlim()[1]
+        if largest > x_hi or largest < x_hi / 2:
+            self.ax_depth.set_xlim(0, largest * 1.2 or 1)
+            moved = True
+        return moved
+
+    def on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.ax_depth.bbox)
+        for line in (self.bid_line, self.ask_line):
+            self.ax_depth.draw_artist(line)
+
+    def blit(self):
+        self.canvas.restore_region(self.background)
+        for line in (self.bid_line, self.ask_line):
+            self.ax_depth.draw_artist(line)
+        self.canvas.blit(self.ax_depth.bbox)
+
+    def update_depth(self, book):
+        # Cumulative size outwards from the best bid/ask, drawn as steps
+        asks, bids = book.top(self.LEVELS)
+        largest = 0.0
+        for buffer, levels, line in ((self.depth[0], bids, self.bid_line), (self.depth[1], asks, self.ask_line)):
+            levels_view = buffer[:len(levels)]
+            if len(levels):
+                levels_view[:] = levels
+                np.cumsum(levels_view[:, 1], out=levels_view[:, 1])
+                largest = max(largest, levels_view[-1, 1])
+            line.set_data(levels_view[:, 1], levels_view[:, 0])
+
+        if not bids or not asks:
+            return None, None, largest
+        return self.depth[0, len(bids) - 1, 0], self.depth[1, len(asks) - 1, 0], largest
@@ -0,0 +1,59 @@
+import tkinter as tk
+from utils.metrics import metrics
+
+
+class MetricsOverlay:
+    # Samples the metrics once a second (also when hidden, so the exports
+    # stay current) and shows them over the dashboard when toggled on.
+
+    INTERVAL = 1000
+
+    def __init__(self, root, textfile=None):
+        self.root = root
+        self.textfile = textfile
+        self.is_visible = False
+        self.job = None
+
+        self.label = tk.Label(
+            root,
+            text="",
+            justify=tk.LEFT,
+            anchor=tk.NW,
+            font=("Consolas", 9),
+            bg="#000000",
+            fg="#EAECEF",
+            padx=10,
+            pady=10
+        )
+
+    def start(self):
+        if self.job is None:
+            self.job = self.root.after(self.INTERVAL, self.tick)
+
+    def stop(self):
+        if self.job is not None:
+            self.root.after_cancel(self.job)
+            self.job = None
+
+    def tick(self):
+        metrics.sample()
+
+        if self.textfile:
+            try:
+                metrics.write_textfile(self.textfile)
+            except OSError as e:
+                print(f"metrics file error: {e}")
+
+        if self.is_visible:
+            self.label.config(text=metrics.summary())
+
+        self.job = self.root.after(self.INTERVAL, self.tick)
+
+    def toggle(self, event=None):
+        self.is_visible = not self.is_visible
+        if self.is_visible:
+            self.label.config(text=metrics.summary())
+            self.label.place(relx=1.0, x=-20, y=70, anchor=tk.NE)
+            self.label.lift()
+        else:
+            self.label.place_forget()
@@ -1,17 +1,19 @@
 import tkinter as tk
 from tkinter import ttk
-import websocket
-import json
-import threading
+from utils.metrics import metrics
+from utils.symbol_view import SymbolView
 
 
-class OrderBook:
-    def __init__(self, parent_1, parent_2,symbol):
+class OrderBook(SymbolView):
+    KINDS = ("book",)
+    DEPTH = 20
+
+    def __init__(self, parent_1, parent_2, scheduler):
+        super().__init__(scheduler)
         self.parent_1 = parent_1
         self.parent_2 = parent_2
-        self.symbol = symbol.lower()
-        self.is_active = False
-        self.order_ws = None
+        self.ask_rows = []
+        self.bid_rows = []
 
         # Ask
         self.ask_frame = ttk.Frame(self.parent_1, style="Order.TFrame")
@@ -43,50 +45,38 @@ class OrderBook:
         )
         self.bid_list.pack(fill=tk.BOTH, expand=True)
 
-    def start(self):
-        if self.is_active:
-            return
-
-        self.is_active = True
-
-        order_url = f"wss://stream.binance.com:9443/ws/{self.symbol}@depth20@100ms"
-
-        self.order_ws = websocket.WebSocketApp(
-            order_url,
-            on_message=self.on_order_book,
-            on_error=lambda ws, error: print(f"{self.symbol} order error: {error}"),
-            on_close=lambda ws, status, message: print(f"{self.symbol} order closed"),
-            on_open=lambda ws: print(f"{self.symbol} order connected")
-        )
-
-        threading.Thread(target=self.order_ws.run_forever, daemon=True).start()
+    def reset(self):
+        self.ask_rows = self.update_rows(self.ask_list, self.ask_rows, [])
+        self.bid_rows = self.update_rows(self.bid_list, self.bid_rows, [])
 
-    def stop(self):
-        self.is_active = False
-        if self.order_ws:
-            self.order_ws.close()
-            self.order_ws = None
+    def destroy(self):
+        self.unbind()
+        self.ask_frame.destroy()
+        self.bid_frame.destroy()
 
-    def on_order_book(self, ws, message):
-        if not self.is_active:
-            return
+    def show_book(self, asks, bids):
+        with metrics.timed("order_book_render"):
+            self.update_order_book(asks, bids)
 
-        data = json.loads(message)
-        asks = data["asks"]
-        bids = data["bids"]
+    def update_order_book(self, asks, bids):
+        self.ask_rows = self.update_rows(self.ask_list, self.ask_rows, reversed(asks))
+        self.bid_rows = self.update_rows(self.bid_list, self.bid_rows, bids)
 
-        self.parent_1.after(0, self.update_order_book, asks, bids)
-        self.parent_2.after(0, self.update_order_book, asks, bids)
+    def update_rows(self, listbox, old_rows, levels):
+        # Only touch the rows whose text actually changed
+        rows = [f" {price:<11,.2f} {amount:.4f}" for price, amount in levels]
 
-    def update_order_book(self, asks, bids):
-        self.ask_list.delete(0, tk.END)
-        self.bid_list.delete(0, tk.END)
+        for i, text in enumerate(rows):
+            if i >= len(old_rows):
+                listbox.insert(tk.END, text)
+            elif old_rows[i] != text:
+                listbox.delete(i)
+                listbox.insert(i, text)
 
-        for price, amount in reversed(asks):
-            self.ask_list.insert(tk.END, f" {float(price):<11,.2f} {float(amount):.4f}")
+        if len(old_rows) > len(rows):
+            listbox.delete(len(rows), tk.END)
 
-        for price, amount in bids:
-            self.bid_list.insert(tk.END, f" {float(price):<11,.2f} {float(amount):.4f}")
+        return rows
 
     def pack(self, **kwargs):
         self.ask_frame.pack(**kwargs)
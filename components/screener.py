@@ -0,0 +1,220 @@
+import tkinter as tk
+from tkinter import ttk
+
+
+def format_volume(value):
+    if value >= 1_000_000_000:
+        return f"{value / 1_000_000_000:.2f}B"
+    if value >= 1_000_000:
+        return f"{value / 1_000_000:.1f}M"
+    if value >= 1_000:
+        return f"{value / 1_000:.0f}K"
+    return f"{value:.0f}"
+
+
+class ScreenerView:
+    # Window ranking every USDT pair of a MarketTable. The list is virtual:
+    # the canvas holds one row of text items per visible line, and scrolling
+    # or a new frame only rewrites those with the rows now under them, so
+    # it costs the same for 400 symbols as for 20. The table is only fed
+    # (from the hub returned by get_hub) while the window is open. Clicking
+    # a row hands its symbol to on_select.
+
+    BG = "#0B0E11"
+    CARD_BG = "#1A1D20"
+    TEXT = "#EAECEF"
+    MUTED = "#848E9C"
+    GREEN = "#0ECB81"
+    RED = "#F6465D"
+    ROW_HEIGHT = 20
+    FONT = ("Consolas", 10)
+
+    # (title, sort key, x, anchor)
+    COLUMNS = [
+        ("Symbol", "symbol", 10, tk.W),
+        ("Price", "price", 200, tk.E),
+        ("Change %", "change", 290, tk.E),
+        ("Range %", "range", 370, tk.E),
+        ("Volume", "volume", 460, tk.E),
+    ]
+
+    def __init__(self, root, scheduler, table, on_select, get_hub):
+        self.root = root
+        self.scheduler = scheduler
+        self.table = table
+        self.on_select = on_select
+        self.get_hub = get_hub
+        self.window = None
+        self.sort_key = "volume"
+        self.descending = True
+        self.order = []
+        self.first = 0
+        self.items = []
+        self.shown = []
+
+    def toggle(self, event=None):
+        if self.window is not None:
+            self.close()
+            return
+
+        self.window = tk.Toplevel(self.root, bg=self.BG)
+        self.window.title("Screener")
+        self.window.geometry("500x600")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        form = ttk.Frame(self.window, style="Card.TFrame", padding=10)
+        form.pack(fill=tk.X)
+
+        ttk.Label(form, text="Filter", style="Card.TLabel").pack(side=tk.LEFT)
+        self.query = tk.StringVar()
+        self.query.trace_add("write", lambda *args: self.refresh())
+        ttk.Entry(form, textvariable=self.query, width=10).pack(side=tk.LEFT, padx=(5, 15))
+
+        ttk.Label(form, text="Min volume (M USDT)", style="Card.TLabel").pack(side=tk.LEFT)
+        self.min_volume = tk.StringVar(value="0")
+        self.min_volume.trace_add("write", lambda *args: self.refresh())
+        ttk.Entry(form, textvariable=self.min_volume, width=6).pack(side=tk.LEFT, padx=5)
+
+        self.count_label = ttk.Label(form, text="", style="Card.TLabel")
+        self.count_label.pack(side=tk.RIGHT)
+
+        self.header = tk.Canvas(self.window, height=self.ROW_HEIGHT + 4, bg=self.CARD_BG, highlightthickness=0)
+        self.header.pack(fill=tk.X)
+        self.titles = {}
+        for title, key, x, anchor in self.COLUMNS:
+            item = self.header.create_text(x, 12, text=title, anchor=anchor, fill=self.MUTED,
+                                           font=("Consolas", 10, "bold"))
+            self.header.tag_bind(item, "<Button-1>", lambda event, k=key: self.on_sort(k))
+            self.titles[key] = (item, title)
+
+        body = ttk.Frame(self.window, style="TFrame")
+        body.pack(fill=tk.BOTH, expand=True)
+        self.scrollbar = ttk.Scrollbar(body, orient=tk.VERTICAL, command=self.on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas = tk.Canvas(body, bg=self.BG, highlightthickness=0)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.canvas.bind("<Configure>", self.on_resize)
+        self.canvas.bind("<Button-1>", self.on_click)
+        self.canvas.bind("<MouseWheel>", lambda event: self.scroll(-1 if event.delta > 0 else 1, "units"))
+        self.canvas.bind("<Button-4>", lambda event: self.scroll(-1, "units"))
+        self.canvas.bind("<Button-5>", lambda event: self.scroll(1, "units"))
+
+        self.items = []
+        self.shown = []
+        self.first = 0
+        self.table.on_change = self.on_table_change
+        self.table.watch(self.get_hub())
+        self.set_titles()
+        self.refresh()
+
+    def close(self):
+        if self.window is None:
+            return
+        self.table.unwatch()
+        self.table.on_change = None
+        self.scheduler.discard(self)
+        self.window.destroy()
+        self.window = None
+        self.items = []
+
+    def on_table_change(self, table):
+        # Stream thread
+        self.scheduler.post((self, "table"), self.refresh)
+
+    def on_resize(self, event):
+        # One pool of text items per line that fits; rows below are virtual
+        lines = max(event.height // self.ROW_HEIGHT, 1)
+        while len(self.items) < lines:
+            y = len(self.items) * self.ROW_HEIGHT + self.ROW_HEIGHT // 2
+            self.items.append([
+                self.canvas.create_text(x, y, text="", anchor=anchor, fill=self.TEXT, font=self.FONT)
+                for title, key, x, anchor in self.COLUMNS
+            ])
+            self.shown.append(None)
+        while len(self.items) > lines:
+            for item in self.items.pop():
+                self.canvas.delete(item)
+            self.shown.pop()
+        self.draw()
+
+    def on_sort(self, key):
+        if key == self.sort_key:
+            self.descending = not self.descending
+        else:
+            self.sort_key = key
+            self.descending = key != "symbol"
+        self.first = 0
+        self.set_titles()
+        self.refresh()
+
+    def set_titles(self):
+        for key, (item, title) in self.titles.items():
+            if key == self.sort_key:
+                title += " ▼" if self.descending else " ▲"
+            self.header.itemconfig(item, text=title, fill=self.TEXT if key == self.sort_key else self.MUTED)
+
+    def refresh(self):
+        if self.window is None:
+            return
+        try:
+            min_volume = float(self.min_volume.get() or 0) * 1_000_000
+        except ValueError:
+            min_volume = 0.0
+        self.order = self.table.rank(self.sort_key, self.descending, self.query.get().strip(), min_volume)
+        self.count_label.config(text=f"{len(self.order)} / {self.table.size} pairs")
+        self.draw()
+
+    def scroll(self, amount, what):
+        step = len(self.items) if what == "pages" else 1
+        self.set_first(self.first + amount * step)
+
+    def on_scrollbar(self, action, amount, what=None):
+        if action == "moveto":
+            self.set_first(round(float(amount) * len(self.order)))
+        else:
+            self.scroll(int(amount), what)
+
+    def set_first(self, first):
+        first = max(min(first, len(self.order) - len(self.items)), 0)
+        if first != self.first:
+            self.first = first
+            self.draw()
+
+    def draw(self):
+        total = len(self.order)
+        self.first = max(min(self.first, total - len(self.items)), 0)
+        visible = self.order[self.first:self.first + len(self.items)]
+        rows = self.table.get(visible) if len(visible) else []
+
+        for line, items in enumerate(self.items):
+            row = rows[line] if line < len(rows) else None
+            if row == self.shown[line]:
+                continue
+            self.shown[line] = row
+            if row is None:
+                for item in items:
+                    self.canvas.itemconfig(item, text="")
+                continue
+
+            symbol, price, change, spread, volume = row
+            color = self.GREEN if change >= 0 else self.RED
+            texts = (
+                symbol,
+                f"{price:,.2f}" if price >= 1 else f"{price:.6f}",
+                f"{change:+.2f}",
+                f"{spread:.2f}",
+                format_volume(volume),
+            )
+            for index, (item, text) in enumerate(zip(items, texts)):
+                self.canvas.itemconfig(item, text=text, fill=color if index == 2 else self.TEXT)
+
+        if total:
+            self.scrollbar.set(self.first / total, min((self.first + len(self.items)) / total, 1))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def on_click(self, event):
+        line = event.y // self.ROW_HEIGHT
+        if line < len(self.shown) and self.shown[line]:
+            self.on_select(self.shown[line][0])
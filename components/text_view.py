@@ -0,0 +1,140 @@
+from collections import deque
+from datetime import datetime
+import numpy as np
+from utils.symbol_view import SymbolView
+
+# Styles of the text segments; the terminal maps them to colours
+UP = "up"
+DOWN = "down"
+MUTED = "muted"
+BOLD = "bold"
+
+BLOCKS = "▁▂▃▄▅▆▇█"
+
+
+def sparkline(values, low, high):
+    # One block character per value, scaled between low and high
+    if high <= low:
+        return BLOCKS[len(BLOCKS) // 2] * len(values)
+    levels = ((np.asarray(values) - low) / (high - low) * (len(BLOCKS) - 1)).round().astype(int)
+    return "".join([BLOCKS[level] for level in levels])
+
+
+def format_price(price):
+    return f"{price:,.2f}" if price >= 1 else f"{price:.6f}"
+
+
+class TextView(SymbolView):
+    # The dashboard as lines of text: ticker, trade flow, the latest
+    # trades, the book and the recent 1m candles as a sparkline (one
+    # character per candle, coloured by direction). Each line is a list of
+    # (text, style) segments; the terminal frontend paints them with curses
+    # and the headless mode prints summary(). Nothing here imports Tk or
+    # matplotlib.
+
+    KINDS = ("ticker", "trades", "book", "candles")
+    DEPTH = 8
+    TRADE_ROWS = 8
+    CANDLES = 60
+
+    def __init__(self, scheduler, width=80):
+        super().__init__(scheduler)
+        self.width = width
+        self.version = 0
+        self.reset()
+
+    def reset(self):
+        self.ticker = [[("--", MUTED)]]
+        self.flow = [[("Trade flow 1m --", MUTED)]]
+        self.trades = deque(maxlen=self.TRADE_ROWS)
+        self.asks = []
+        self.bids = []
+        self.spark = [[("", None)]]
+        self.candle_count = 0
+        self.last = None
+        self.best = None
+        self.version += 1
+
+    def show_ticker(self, price, change, percent, volume):
+        style = UP if change >= 0 else DOWN
+        self.last = (price, percent)
+        self.ticker = [[
+            (format_price(price), style),
+            (f"  {change:+,.2f} ({percent:+.2f}%)", style),
+            (f"  vol 24h {volume:,.2f}", None),
+        ]]
+        self.version += 1
+
+    def show_trades(self, trades):
+        for time, price, amount, is_sell, side in trades:
+            self.trades.appendleft([(
+                f"{time:%H:%M:%S}  {side:<5} {format_price(price):>14} {amount:>12,.4f}",
+                DOWN if is_sell else UP
+            )])
+        self.version += 1
+
+    def show_flow(self, vwap, buy_volume, sell_volume, count, rate, largest):
+        if vwap is None:
+            self.flow = [[("Trade flow 1m --", MUTED)]]
+        else:
+            time, price, amount, is_sell = largest
+            self.flow = [[
+                (f"VWAP {format_price(vwap)}  ", None),
+                (f"buy {buy_volume:,.4f}", UP),
+                (" / ", None),
+                (f"sell {sell_volume:,.4f}", DOWN),
+                (f"  {rate:,.1f} trades/s ({count} in 1m)  largest {amount:,.4f} @ {format_price(price)}", None),
+            ]]
+        self.version += 1
+
+    def show_book(self, asks, bids):
+        self.best = (bids[0][0], asks[0][0]) if asks and bids else None
+        self.asks = [[(f"{format_price(price):>14} {amount:>12,.4f}", DOWN)] for price, amount in reversed(asks)]
+        self.bids = [[(f"{format_price(price):>14} {amount:>12,.4f}", UP)] for price, amount in bids]
+        self.version += 1
+
+    def show_candles(self, state):
+        candles = state.candles.view(min(self.CANDLES, max(self.width - 20, 1)))
+        if not len(candles):
+            return
+
+        closes = candles["close"]
+        low = float(candles["low"].min())
+        high = float(candles["high"].max())
+        line = sparkline(closes, low, high)
+
+        # Consecutive candles of the same direction share a segment
+        up = candles["close"] >= candles["open"]
+        segments = [(format_price(low) + " ", MUTED)]
+        start = 0
+        for i in range(1, len(line) + 1):
+            if i == len(line) or up[i] != up[start]:
+                segments.append((line[start:i], UP if up[start] else DOWN))
+                start = i
+        segments.append((" " + format_price(high), MUTED))
+        self.spark = [segments]
+        self.candle_count = len(candles)
+        self.version += 1
+
+    def lines(self):
+        title = self.state.symbol.upper() if self.state else "--"
+        return (
+            [[(f"{title}  {datetime.now():%H:%M:%S}", BOLD)]]
+            + self.ticker + self.flow + [[("", None)]]
+            + [[(f"1m closes, last {self.candle_count}", MUTED)]]
+            + self.spark + [[("", None)], [("Order book", BOLD)]]
+            + self.asks + [[("-" * 27, MUTED)]] + self.bids + [[("", None)], [("Market trades", BOLD)]]
+            + list(self.trades)
+        )
+
+    def summary(self):
+        # One plain line, for logs and the headless mode
+        title = self.state.symbol.upper() if self.state else "--"
+        parts = [f"{datetime.now():%H:%M:%S} {title}"]
+        if self.last:
+            parts.append(f"{format_price(self.last[0])} {self.last[1]:+.2f}%")
+        if self.best:
+            parts.append(f"bid {format_price(self.best[0])} ask {format_price(self.best[1])}")
+        if self.state:
+            parts.append(f"{self.trade_count} trades, {len(self.state.candles)} candles")
+        return " | ".join(parts)
@@ -1,18 +1,17 @@
 import tkinter as tk
 from tkinter import ttk
-import websocket
-import json
-import threading
-from datetime import datetime
+from utils import startup
+from utils.symbol_view import SymbolView
 
 
-class CryptoTicker:
-    def __init__(self, parent, symbol):
+class CryptoTicker(SymbolView):
+    KINDS = ("ticker", "trades")
+    TRADE_ROWS = 8
+    MUTED = "#848E9C"
+
+    def __init__(self, parent, scheduler):
+        super().__init__(scheduler)
         self.parent = parent
-        self.symbol = symbol.lower()
-        self.is_active = False
-        self.ticker_ws = None
-        self.trade_ws = None
 
         self.left_frame = ttk.Frame(parent, style="TFrame")
         self.right_frame = ttk.Frame(parent, style="TFrame")
@@ -38,6 +37,24 @@ class CryptoTicker:
         self.volume_label = ttk.Label(self.volume_frame, text="--", font=("Consolas", 12, "bold"), anchor=tk.W, style="Card.TLabel")
         self.volume_label.pack(fill=tk.X, pady=(10, 0))
 
+        # Trade flow over the last minute
+        self.flow_frame = ttk.Frame(self.left_frame, padding=10, style="Card.TFrame")
+        self.flow_frame.pack(fill=tk.BOTH, expand=True, padx=(0, 20), pady=(20, 0))
+
+        self.flow_title_label = ttk.Label(self.flow_frame, text="Trade Flow 1m", font=("Bahnschrift", 12, "bold"), anchor=tk.W, style="Card.TLabel").pack(fill=tk.X)
+
+        self.vwap_label = ttk.Label(self.flow_frame, text="VWAP --", font=("Consolas", 10, "bold"), anchor=tk.W, style="Card.TLabel")
+        self.vwap_label.pack(fill=tk.X, pady=(10, 0))
+
+        self.buy_sell_label = ttk.Label(self.flow_frame, text="Buy -- / Sell --", font=("Consolas", 10), anchor=tk.W, style="Card.TLabel")
+        self.buy_sell_label.pack(fill=tk.X)
+
+        self.rate_label = ttk.Label(self.flow_frame, text="-- trades/s", font=("Consolas", 10), anchor=tk.W, style="Card.TLabel")
+        self.rate_label.pack(fill=tk.X)
+
+        self.largest_label = ttk.Label(self.flow_frame, text="Largest --", font=("Consolas", 10), anchor=tk.W, style="Card.TLabel")
+        self.largest_label.pack(fill=tk.X)
+
         # Market Trades
         self.market_trades_frame = ttk.Frame(self.right_frame, padding=10, style="Card.TFrame")
         self.market_trades_frame.pack(side=tk.LEFT, fill=tk.X, expand=True, pady=(20, 0))
@@ -58,61 +75,23 @@ class CryptoTicker:
         )
         self.trade_list.pack(fill=tk.BOTH, expand=True, pady=(5, 0))
 
-    def start(self):
-        if self.is_active:
-            return
-
-        self.is_active = True
-
-        ticker_url = f"wss://stream.binance.com:9443/ws/{self.symbol}@ticker"
-
-        self.ticker_ws = websocket.WebSocketApp(
-            ticker_url,
-            on_message=self.on_message,
-            on_error=lambda ws, error: print(f"{self.symbol} ticker error: {error}"),
-            on_close=lambda ws, status, message: print(f"{self.symbol} ticker closed"),
-            on_open=lambda ws: print(f"{self.symbol} ticker connected")
-        )
+    def reset(self):
+        self.trade_list.delete(0, tk.END)
+        self.price_label.config(text="--", foreground="")
+        self.change_label.config(text="--", foreground="")
+        self.volume_label.config(text="--")
+        self.show_flow(None, 0, 0, 0, 0, None)
 
-        threading.Thread(target=self.ticker_ws.run_forever, daemon=True).start()
+    def destroy(self):
+        self.unbind()
+        self.left_frame.destroy()
+        self.right_frame.destroy()
 
-        trade_url = f"wss://stream.binance.com:9443/ws/{self.symbol}@trade"
-
-        self.trade_ws = websocket.WebSocketApp(
-            trade_url,
-            on_message=self.on_trade_message,
-            on_error=lambda ws, error: print(f"{self.symbol} trade error: {error}"),
-            on_close=lambda ws, status, message: print(f"{self.symbol} trade closed"),
-            on_open=lambda ws: print(f"{self.symbol} trade connected")
-        )
-
-        threading.Thread(target=self.trade_ws.run_forever, daemon=True).start()
-
-    def stop(self):
-        self.is_active = False
-        if self.ticker_ws:
-            self.ticker_ws.close()
-            self.ticker_ws = None
-        if self.trade_ws:
-            self.trade_ws.close()
-            self.trade_ws = None
-
-    def on_message(self, ws, message):
-        if not self.is_active:
-            return
-
-        data = json.loads(message)
-        price = float(data['c'])
-        change = float(data['p'])
-        percent = float(data['P'])
-        volume = float(data['v'])
-
-        self.parent.after(0, self.update_display, price, change, percent, volume)
+    def show_ticker(self, price, change, percent, volume):
+        self.update_display(price, change, percent, volume)
+        startup.mark("first_live_price")
 
     def update_display(self, price, change, percent, volume):
-        if not self.is_active:
-            return
-
         color = "#0ECB81" if change >= 0 else "#F6465D"
         self.price_label.config(text=f"{price:,.2f}", foreground=color)
 
@@ -121,27 +100,40 @@ class CryptoTicker:
 
         self.volume_label.config(text=f"{volume:,.2f}")
 
-    def on_trade_message(self, ws, message):
-        if not self.is_active:
+    def show_last_known(self, ticker):
+        # Price from the previous session, greyed out until the stream delivers
+        self.update_display(*ticker)
+        self.price_label.config(foreground=self.MUTED)
+        self.change_label.config(foreground=self.MUTED)
+
+    def show_flow(self, vwap, buy_volume, sell_volume, count, rate, largest):
+        if vwap is None:
+            self.vwap_label.config(text="VWAP --")
+            self.buy_sell_label.config(text="Buy -- / Sell --")
+            self.rate_label.config(text="-- trades/s")
+            self.largest_label.config(text="Largest --", foreground="")
             return
 
-        data = json.loads(message)
-        price = float(data["p"])
-        amount = float(data["q"])
-        is_sell = data["m"]
-        side = "ASK" if is_sell else "BID"
+        self.vwap_label.config(text=f"VWAP {vwap:,.2f}")
+        self.buy_sell_label.config(text=f"Buy {buy_volume:,.4f} / Sell {sell_volume:,.4f}")
+        self.rate_label.config(text=f"{rate:,.1f} trades/s ({count} in 1m)")
 
-        self.parent.after(0, self.add_trade_to_list, price, amount, is_sell, side)
+        time, price, amount, is_sell = largest
+        self.largest_label.config(
+            text=f"Largest {amount:,.4f} @ {price:,.2f}",
+            foreground="#F6465D" if is_sell else "#0ECB81"
+        )
 
-    def add_trade_to_list(self, price, amount, is_sell, side):
-        time = datetime.now().strftime("%H:%M:%S")
-        text = f" {time:<12} {side:<12} {price:<13,.2f} {amount:<14,.4f} {(price * amount):,.2f}"
+    def show_trades(self, trades):
+        for time, price, amount, is_sell, side in trades:
+            time = time.strftime("%H:%M:%S")
+            text = f" {time:<12} {side:<12} {price:<13,.2f} {amount:<14,.4f} {(price * amount):,.2f}"
 
-        self.trade_list.insert(0, text)
-        self.trade_list.itemconfig(0, fg="#F6465D" if is_sell else "#0ECB81")
+            self.trade_list.insert(0, text)
+            self.trade_list.itemconfig(0, fg="#F6465D" if is_sell else "#0ECB81")
 
-        if self.trade_list.size() > 8:
-            self.trade_list.delete(8)
+        if self.trade_list.size() > self.TRADE_ROWS:
+            self.trade_list.delete(self.TRADE_ROWS, tk.END)
 
     def pack(self, **kwargs):
         self.left_frame.pack(**kwargs)
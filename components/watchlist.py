@@ -0,0 +1,82 @@
+import tkinter as tk
+from tkinter import ttk
+
+
+class Watchlist:
+    COLUMNS = 6
+
+    def __init__(self, parent, scheduler, on_select, on_add):
+        self.parent = parent
+        self.scheduler = scheduler
+        self.on_select = on_select
+        self.on_add = on_add
+        self.cards = {}
+        self.focused = None
+
+        self.frame = ttk.Frame(parent, style="TFrame")
+
+        self.grid_frame = ttk.Frame(self.frame, style="TFrame")
+        self.grid_frame.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        self.add_frame = ttk.Frame(self.frame, style="TFrame")
+        self.add_frame.pack(side=tk.RIGHT, anchor=tk.N)
+
+        self.new_symbol = tk.StringVar()
+        self.add_entry = ttk.Entry(self.add_frame, textvariable=self.new_symbol, width=10)
+        self.add_entry.pack(side=tk.LEFT, padx=(10, 5))
+        self.add_entry.bind("<Return>", self.on_add_click)
+        ttk.Button(self.add_frame, text="Add", width=5, command=self.on_add_click).pack(side=tk.LEFT)
+
+    def add_symbol(self, name, state):
+        if name in self.cards:
+            return
+
+        index = len(self.cards)
+        card = ttk.Frame(self.grid_frame, padding=(8, 4), style="Card.TFrame")
+        card.grid(row=index // self.COLUMNS, column=index % self.COLUMNS, sticky=tk.EW, padx=(0, 8), pady=(0, 8))
+        self.grid_frame.columnconfigure(index % self.COLUMNS, weight=1)
+
+        name_label = ttk.Label(card, text=name, font=("Bahnschrift", 10, "bold"), style="Card.TLabel")
+        name_label.pack(anchor=tk.W)
+        price_label = ttk.Label(card, text="--", font=("Consolas", 10, "bold"), style="Card.TLabel")
+        price_label.pack(anchor=tk.W)
+
+        for widget in (card, name_label, price_label):
+            widget.bind("<Button-1>", lambda event, n=name: self.on_select(n))
+
+        self.cards[state.symbol] = (name_label, price_label)
+        state.add_view(self)
+        self.render(state)
+
+    def on_state(self, state, kind):
+        if kind == "ticker":
+            self.scheduler.post((self, state.symbol), self.render, state)
+
+    def render(self, state):
+        if not state.ticker or state.symbol not in self.cards:
+            return
+
+        price, change, percent, volume = state.ticker
+        color = "#0ECB81" if change >= 0 else "#F6465D"
+        sign = "+" if change >= 0 else ""
+        text = f"{price:,.2f}" if price >= 1 else f"{price:.5f}"
+        self.cards[state.symbol][1].config(text=f"{text} {sign}{percent:.2f}%", foreground=color)
+
+    def set_focus(self, symbol):
+        if self.focused in self.cards:
+            self.cards[self.focused][0].config(foreground="#EAECEF")
+        self.focused = symbol
+        if symbol in self.cards:
+            self.cards[symbol][0].config(foreground="#F0B90B")
+
+    def on_add_click(self, event=None):
+        text = self.new_symbol.get().strip().upper()
+        if text:
+            self.new_symbol.set("")
+            self.on_add(text)
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def pack_forget(self):
+        self.frame.pack_forget()
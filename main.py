@@ -1,9 +1,26 @@
+from utils import startup  # first, so startup timings cover every import below
+import argparse
+import threading
+from datetime import datetime
 import tkinter as tk
 from tkinter import ttk
 from components.ticker import CryptoTicker
 from components.order_book import OrderBook
-from components.chart import PriceVolumeChart
+from components.watchlist import Watchlist
+from components.metrics_overlay import MetricsOverlay
+from components.alerts_panel import AlertsPanel
 from utils import preferences
+from utils.alerts import AlertEngine
+from utils.metrics import metrics, serve as serve_metrics
+from utils.ui_scheduler import UpdateScheduler
+
+# Only Tk and the light components are imported up front. The network stack
+# (numpy, requests, websocket) and the chart stack (matplotlib) are imported
+# on a loader thread after the window has painted; see TickerApp.load_modules.
+
+
+def count_widgets(widget):
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
 
 
 class TickerApp:
@@ -12,8 +29,16 @@ class TickerApp:
     TEXT_MAIN = "#EAECEF"
     ORDER_BOX = "#1A1D20"
 
-    def __init__(self, root):
+    def __init__(self, root, stream_url=None, fps=20, watchlist=False, ingest_workers=0,
+                 record=None, replay=None, replay_speed=1.0, metrics_file=None, metrics_port=None,
+                 use_asyncio=False, rest_url=None, startup_report=False, history=10080):
         self.root = root
+        self.is_watchlist = watchlist
+        self.options = {
+            "stream_url": stream_url, "rest_url": rest_url, "ingest_workers": ingest_workers,
+            "record": record, "replay": replay, "replay_speed": replay_speed, "use_asyncio": use_asyncio,
+            "history": history,
+        }
         self.root.title("Real-Time Binance Dashboard")
         self.root.geometry("1000x762")
         root.configure(bg=self.BG)
@@ -51,6 +76,23 @@ class TickerApp:
         )
         self.show_hide_btn.pack(side=tk.RIGHT)
 
+        self.metrics_btn = ttk.Button(self.top_frame, text="Metrics", command=self.toggle_metrics)
+        self.metrics_btn.pack(side=tk.RIGHT, padx=(0, 10))
+        self.root.bind("<F12>", self.toggle_metrics)
+
+        self.alerts_btn = ttk.Button(self.top_frame, text="Alerts", command=self.toggle_alerts)
+        self.alerts_btn.pack(side=tk.RIGHT, padx=(0, 10))
+
+        self.depth_btn = ttk.Button(self.top_frame, text="Depth", command=self.toggle_depth)
+        self.depth_btn.pack(side=tk.RIGHT, padx=(0, 10))
+
+        self.screener_btn = ttk.Button(self.top_frame, text="Screener", command=self.toggle_screener)
+        self.screener_btn.pack(side=tk.RIGHT, padx=(0, 10))
+
+        self.alert_label = ttk.Label(self.top_frame, text="", font=("Bahnschrift", 11, "bold"), foreground="#F0B90B")
+        self.alert_label.pack(side=tk.LEFT, padx=(15, 0), pady=(5, 0))
+        self.alert_clear_job = None
+
         # Main frame
         self.main_frame = ttk.Frame(self.root, style="TFrame")
         self.main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
@@ -103,20 +145,168 @@ class TickerApp:
             "DOGE/USDT": "dogeusdt",
         }
 
+        for name in preferences.load_preference("watchlist_symbols", []):
+            self.mapping[name] = name.replace("/", "").lower()
+        self.combo.config(values=list(self.mapping))
+
         saved_coin = preferences.load_preference("selected_coin", "BTC/USDT")
         if saved_coin not in self.mapping:
             saved_coin = "BTC/USDT"
         self.choice.set(saved_coin)
 
-        self.active_ticker = None
-        self.active_order_book = None
+        self.scheduler = UpdateScheduler(self.root, fps)
+        self.scheduler.start()
+
+        # Created by start_data once the network stack has been imported
+        self.hub = None
+        self.cache = None
+        self.recorder = None
+        self.market = None
+        self.alert_feed = None
+        self.screener_hub = None
+
+        # Alerts fire on the stream threads and are shown through the scheduler
+        self.alerts = AlertEngine(on_fire=self.on_alert_fired, on_change=self.on_alerts_changed)
+        self.alerts.load(preferences.load_preference("alerts", []))
+        self.alerts_panel = AlertsPanel(self.root, self.alerts, lambda: self.active_symbol or "btcusdt")
+
+        # Instrumentation: sampled once a second for the overlay and exports
+        self.metrics_overlay = MetricsOverlay(self.root, metrics_file)
+        self.metrics_overlay.start()
+        self.metrics_server = serve_metrics(metrics_port) if metrics_port else None
+        metrics.gauge("ui_pending_updates", lambda: self.scheduler.stats()["pending"])
+        metrics.gauge("ui_applied_updates", lambda: self.scheduler.stats()["applied"])
+        metrics.gauge("ui_coalesced_updates", lambda: self.scheduler.stats()["coalesced"])
+        metrics.gauge("tk_after_callbacks", lambda: len(self.root.tk.splitlist(self.root.tk.call("after", "info"))))
+        metrics.gauge("order_book_resyncs", self.active_book_resyncs)
+        metrics.gauge("stream_reconnects", lambda: self.hub.reconnects if self.hub else 0)
+        metrics.gauge("tk_widgets", lambda: count_widgets(self.root))
+        metrics.gauge("alerts_active", lambda: len(self.alerts.alerts))
+
+        # Components (and the chart's figure) are built once; switching
+        # coins only rebinds them to another symbol's state
+        self.active_symbol = None
         self.active_chart = None
-
+        self.depth_view = None
+        self.screener = None
+        self.create_components()
+
+        # Watchlist mode: every symbol streams at once
+        self.watchlist = None
+        if self.is_watchlist:
+            self.watchlist = Watchlist(self.root, self.scheduler, self.on_watchlist_select, self.add_symbol)
+            self.watchlist.pack(fill=tk.X, padx=20, pady=(20, 0), before=self.main_frame)
+
+        # Stage 1: the window with the last known price of the selected coin
+        self.last_tickers = preferences.load_preference("last_tickers", {})
         self.show_selected()
 
         if self.is_hidden:
             self.apply_hide_state()
 
+        startup.mark("window_built")
+        self.root.after_idle(self.on_first_paint)
+        if startup_report:
+            self.root.after(500, self.report_startup)
+
+    def on_first_paint(self):
+        # Idle callbacks run after Tk's own redraw, so the window is up by now
+        startup.mark("first_paint")
+        threading.Thread(target=self.load_modules, daemon=True).start()
+
+    def load_modules(self):
+        # Stage 2 and 3, off the Tk thread: import the network stack and start
+        # streaming, then import matplotlib and attach the chart. Both hand
+        # back to the Tk thread through the scheduler.
+        try:
+            with startup.stage("import network stack"):
+                import utils.market_state
+                import utils.stream_hub
+            self.scheduler.post((self, "start_data"), self.start_data)
+
+            with startup.stage("import chart stack"):
+                import components.chart
+            self.scheduler.post((self, "chart"), self.attach_chart)
+        except Exception as e:
+            print("startup error:", e)
+
+    def start_data(self):
+        from utils import binance_rest
+        from utils.market_state import MarketState
+        options = self.options
+
+        if options["rest_url"]:
+            binance_rest.set_base_url(options["rest_url"])
+
+        # With ingest workers, stream I/O and parsing run in other processes
+        # and this one only reads their shared memory and renders
+        if options["ingest_workers"] and not (options["record"] or options["replay"]):
+            from utils.ingest import IngestMarketState
+            self.market = IngestMarketState(
+                self.scheduler, options["ingest_workers"], options["stream_url"], binance_rest.BASE_URL,
+                options["history"], alerts=self.alerts
+            )
+        else:
+            if options["replay"]:
+                from utils.replay import ReplayHub
+                self.hub = ReplayHub(options["replay"], options["replay_speed"])
+                binance_rest.set_replay(self.hub)
+            elif options["use_asyncio"]:
+                from utils.async_hub import AsyncStreamHub
+                self.hub = AsyncStreamHub(options["stream_url"])
+            else:
+                from utils.stream_hub import StreamHub
+                self.hub = StreamHub(options["stream_url"])
+
+            # Recording and replay skip the kline cache so both sessions
+            # fetch (and look up) exactly the same REST history
+            if options["record"]:
+                from utils.recorder import Recorder
+                self.recorder = Recorder(options["record"])
+                self.hub.recorder = self.recorder
+                binance_rest.set_recorder(self.recorder)
+            elif not options["replay"]:
+                from utils.kline_cache import KlineCache
+                self.cache = KlineCache()
+
+            self.hub.start()
+            self.market = MarketState(self.hub, self.scheduler, options["history"], self.cache)
+
+            from utils.alerts import AlertFeed
+            self.alert_feed = AlertFeed(self.alerts, self.hub)
+
+        if self.watchlist:
+            for name, symbol in self.mapping.items():
+                self.watchlist.add_symbol(name, self.market.add(symbol))
+
+        self.show_selected()
+        startup.mark("streams_started")
+
+    def attach_chart(self):
+        from components.chart import PriceVolumeChart
+
+        with startup.stage("build chart"):
+            self.chart_placeholder.destroy()
+            self.active_chart = PriceVolumeChart(
+                self.chart_frame, self.scheduler,
+                interval=preferences.load_preference("chart_interval", "1m"),
+                on_interval_change=lambda interval: preferences.save_preference("chart_interval", interval),
+                indicators=preferences.load_preference("chart_indicators", []),
+                on_indicators_change=lambda names: preferences.save_preference("chart_indicators", names)
+            )
+            self.active_chart.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+            state = self.market.get(self.active_symbol) if self.market else None
+            if state:
+                self.active_chart.bind(state)
+        startup.mark("chart_attached")
+
+    def report_startup(self):
+        if "first_live_price" in startup.marks and "chart_attached" in startup.marks:
+            print(startup.summary())
+        else:
+            self.root.after(500, self.report_startup)
+
     def toggle_show_hide(self):
         self.is_hidden = not self.is_hidden
         preferences.save_preference("is_hidden_info", self.is_hidden)
@@ -129,61 +319,227 @@ class TickerApp:
 
     def apply_hide_state(self):
         self.right_frame.pack_forget()
-        if self.active_ticker:
-            self.active_ticker.pack_forget()
-        if self.active_order_book:
-            self.active_order_book.pack_forget()
+        self.active_ticker.pack_forget()
+        self.active_order_book.pack_forget()
 
     def show_info(self):
         self.right_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=False, padx=(20, 0))
         self.right_frame.config(width=200)
         self.right_frame.pack_propagate(False)
-        if self.active_ticker:
-            self.active_ticker.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        if self.active_order_book:
-            self.active_order_book.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.active_ticker.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.active_order_book.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+    def toggle_metrics(self, event=None):
+        self.metrics_overlay.toggle()
+
+    def toggle_alerts(self, event=None):
+        self.alerts_panel.toggle()
+
+    def toggle_depth(self, event=None):
+        # Built on first use: it needs matplotlib, which loads after startup
+        if self.depth_view is None:
+            from components.depth_view import DepthView
+            self.depth_view = DepthView(self.root, self.scheduler)
+            state = self.market.get(self.active_symbol) if self.market else None
+            if state:
+                self.depth_view.bind(state)
+        self.depth_view.toggle()
+
+    def toggle_screener(self, event=None):
+        if self.market is None:
+            return
+        if self.screener is None:
+            from components.screener import ScreenerView
+            from utils.screener import MarketTable
+            self.screener = ScreenerView(self.root, self.scheduler, MarketTable(), self.focus_symbol, self.screener_stream)
+        self.screener.toggle()
+
+    def screener_stream(self):
+        # Ingest workers own the symbol streams; the screener then gets a connection of its own
+        if self.hub:
+            return self.hub
+        if self.screener_hub is None:
+            from utils.stream_hub import StreamHub
+            self.screener_hub = StreamHub(self.options["stream_url"])
+            self.screener_hub.start()
+        return self.screener_hub
+
+    def focus_symbol(self, symbol):
+        # Screener rows may be any USDT pair; ones outside the list are
+        # added to the dropdown for this session
+        name = f"{symbol[:-4]}/USDT"
+        if name not in self.mapping:
+            self.mapping[name] = symbol.lower()
+            self.combo.config(values=list(self.mapping))
+        self.choice.set(name)
+        self.on_coin_change()
+
+    def on_alert_fired(self, alert, value):
+        # Stream thread: queue it for the next frame
+        self.scheduler.append((self, "alerts"), self.show_alerts, (alert, value), limit=50)
+
+    def on_alerts_changed(self):
+        self.scheduler.post((self, "alerts_changed"), self.save_alerts)
+
+    def show_alerts(self, fired):
+        for alert, value in fired:
+            line = f"{datetime.now():%H:%M:%S}  {alert.describe()}  ({value:,.2f})"
+            print(f"alert: {line}")
+            self.alerts_panel.log(line)
+
+        self.alert_label.config(text=f"Alert: {fired[-1][0].describe()}")
+        self.root.bell()
+        if self.alert_clear_job is not None:
+            self.root.after_cancel(self.alert_clear_job)
+        self.alert_clear_job = self.root.after(10_000, self.clear_alert_label)
+
+    def clear_alert_label(self):
+        self.alert_clear_job = None
+        self.alert_label.config(text="")
+
+    def save_alerts(self):
+        preferences.save_preference("alerts", self.alerts.to_list())
+        self.alerts_panel.refresh()
+
+    def active_book_resyncs(self):
+        state = self.market.get(self.active_symbol) if self.market and self.active_symbol else None
+        return state.book.resyncs if state else 0
 
     def on_coin_change(self, event=None):
         self.show_selected()
         preferences.save_preference("selected_coin", self.choice.get())
-        if self.is_hidden:
-            self.apply_hide_state()
+        self.alerts_panel.refresh()
 
-    def show_selected(self, event=None):
-        selection = self.choice.get()
-        symbol = self.mapping[selection]
-        self.title_label.config(text=f"{selection} DASHBOARD")
+    def on_watchlist_select(self, name):
+        self.choice.set(name)
+        self.on_coin_change()
 
-        for obj in [self.active_ticker, self.active_order_book, self.active_chart]:
-            if obj:
-                obj.stop()
-                obj.pack_forget()
+    def add_symbol(self, text):
+        base = text.split("/")[0]
+        if base.endswith("USDT") and base != "USDT":
+            base = base[:-4]
+        name = f"{base}/USDT"
+
+        if name not in self.mapping:
+            self.mapping[name] = f"{base}usdt".lower()
+            self.combo.config(values=list(self.mapping))
+            added = preferences.load_preference("watchlist_symbols", [])
+            preferences.save_preference("watchlist_symbols", added + [name])
 
-        self.active_ticker = CryptoTicker(self.left_frame, symbol)
-        self.active_order_book = OrderBook(self.ask_frame, self.bid_frame, symbol)
-        self.active_chart = PriceVolumeChart(self.chart_frame, symbol)
+        if self.market:
+            self.watchlist.add_symbol(name, self.market.add(self.mapping[name]))
+
+    def create_components(self):
+        self.active_ticker = CryptoTicker(self.left_frame, self.scheduler)
+        self.active_order_book = OrderBook(self.ask_frame, self.bid_frame, self.scheduler)
+
+        # The chart is attached once matplotlib has been imported
+        self.chart_placeholder = ttk.Label(self.chart_frame, text="Loading chart...", style="Card.TLabel", anchor=tk.CENTER)
+        self.chart_placeholder.pack(fill=tk.BOTH, expand=True)
 
         self.active_ticker.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         self.active_order_book.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        self.active_chart.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
-        self.active_ticker.start()
-        self.active_order_book.start()
-        self.active_chart.start()
+    def show_selected(self, event=None):
+        selection = self.choice.get()
+        symbol = self.mapping[selection]
+        self.title_label.config(text=f"{selection} DASHBOARD")
 
-        if self.is_hidden:
-            self.apply_hide_state()
+        if self.market is None:
+            # Still starting up: show the last known price until data flows
+            self.active_ticker.reset()
+            self.show_last_known(symbol)
+            self.active_symbol = symbol
+            return
+
+        previous = self.active_symbol
+        self.active_symbol = symbol
+        state = self.market.add(symbol)
+
+        self.active_ticker.bind(state)
+        self.active_order_book.bind(state)
+        if self.active_chart:
+            self.active_chart.bind(state)
+        if self.depth_view:
+            self.depth_view.bind(state)
+        if state.ticker is None:
+            self.show_last_known(symbol)
+
+        # Only the shown symbol keeps streaming, besides the watchlist's
+        if previous and previous != symbol and not (self.watchlist and previous in self.watchlist.cards):
+            self.market.remove(previous)
+
+        if self.watchlist:
+            self.watchlist.set_focus(symbol)
+
+    def show_last_known(self, symbol):
+        ticker = self.last_tickers.get(symbol)
+        if ticker:
+            self.active_ticker.show_last_known(ticker)
+
+    def save_last_tickers(self):
+        for symbol, state in self.market.symbols.items():
+            if state.ticker:
+                self.last_tickers[symbol] = list(state.ticker)
+        preferences.save_preference("last_tickers", self.last_tickers)
 
     def on_closing(self):
-        for obj in [self.active_ticker, self.active_order_book, self.active_chart]:
+        for obj in [self.active_ticker, self.active_order_book, self.active_chart, self.depth_view]:
             if obj:
-                obj.stop()
+                obj.destroy()
+        self.metrics_overlay.stop()
+        self.alerts_panel.close()
+        if self.screener:
+            self.screener.close()
+        if self.screener_hub:
+            self.screener_hub.stop()
+        if self.alert_feed:
+            self.alert_feed.stop()
+        if self.metrics_server:
+            self.metrics_server.stop()
+        if self.market:
+            self.save_last_tickers()
+            self.market.stop()
+        if self.hub:
+            self.hub.stop()
+        if self.cache:
+            self.cache.close()
+        if self.recorder:
+            self.recorder.close()
+        self.scheduler.stop()
+        stats = self.scheduler.stats()
+        print(f"UI updates: {stats['applied']} applied, {stats['coalesced']} coalesced")
         self.root.after(300, self.root.destroy)
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Real-Time Binance Dashboard")
+    parser.add_argument("--stream-url", help="combined stream endpoint, e.g. a local stand-in server")
+    parser.add_argument("--rest-url", help="REST API base URL, e.g. a local stand-in server")
+    parser.add_argument("--relay", metavar="HOST:PORT", help="stream and fetch through a local relay (utils/relay.py)")
+    parser.add_argument("--fps", type=int, default=20, help="maximum UI update rate")
+    parser.add_argument("--watchlist", action="store_true", help="stream every watchlist symbol at once")
+    parser.add_argument("--ingest-workers", type=int, default=0, help="run stream ingest in this many worker processes")
+    parser.add_argument("--record", metavar="PATH", help="record raw stream frames and REST responses to a .gz file")
+    parser.add_argument("--replay", metavar="PATH", help="replay a recording instead of connecting to the exchange")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="replay speed multiple, 0 = as fast as possible")
+    parser.add_argument("--metrics-file", metavar="PATH", help="write Prometheus metrics to this file every second")
+    parser.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--asyncio", action="store_true", help="run the stream connection on an asyncio event loop")
+    parser.add_argument("--startup-report", action="store_true", help="print startup stage and milestone timings")
+    parser.add_argument("--history", type=int, default=10080, help="1m candles kept per symbol for zooming out")
+    args = parser.parse_args()
+
+    if args.relay:
+        args.stream_url = f"ws://{args.relay}/stream"
+        args.rest_url = f"http://{args.relay}"
+
     root = tk.Tk()
-    app = TickerApp(root)
+    app = TickerApp(
+        root, args.stream_url, args.fps, args.watchlist, args.ingest_workers,
+        args.record, args.replay, args.replay_speed, args.metrics_file, args.metrics_port,
+        args.asyncio, args.rest_url, args.startup_report, args.history
+    )
     root.minsize(1000, 762)
     root.protocol("WM_DELETE_WINDOW", app.on_closing)
     root.mainloop()
@@ -0,0 +1,138 @@
+import argparse
+import time
+from components.text_view import TextView, UP, DOWN, MUTED, BOLD
+from utils import binance_rest
+from utils.market_state import MarketState
+from utils.stream_hub import StreamHub
+from utils.ui_scheduler import FrameLoop, UpdateScheduler
+
+# Terminal frontend: the same market state and scheduler as the Tk
+# dashboard, drawn as text with curses (or, with --headless, printed as one
+# summary line per interval). It never imports Tk or matplotlib, keeps no
+# liquidity history and a short candle history by default, so it suits
+# low-power boxes and SSH sessions.
+#
+#   python terminal.py --symbols btcusdt,ethusdt
+#   python terminal.py --headless --duration 30
+
+
+class TerminalApp:
+    def __init__(self, symbols, stream_url=None, fps=4, history=240):
+        self.symbols = symbols
+        self.index = 0
+        self.loop = FrameLoop()
+        self.scheduler = UpdateScheduler(self.loop, fps)
+        self.hub = StreamHub(stream_url)
+        self.market = MarketState(self.hub, self.scheduler, history, liquidity=False)
+        self.view = TextView(self.scheduler)
+
+    def start(self):
+        self.hub.start()
+        self.scheduler.start()
+        self.show(0)
+
+    def stop(self):
+        self.view.unbind()
+        self.scheduler.stop()
+        self.market.stop()
+        self.hub.stop()
+
+    def show(self, index):
+        previous = self.view.state
+        self.index = index % len(self.symbols)
+        self.view.bind(self.market.add(self.symbols[self.index]))
+        if previous and previous is not self.view.state:
+            self.market.remove(previous.symbol)
+
+    def run_headless(self, interval, duration):
+        started = time.monotonic()
+        next_print = started + interval
+        while not duration or time.monotonic() - started < duration:
+            self.loop.update(wait=0.05)
+            if time.monotonic() >= next_print:
+                next_print += interval
+                print(self.view.summary(), flush=True)
+
+    def run_curses(self, screen):
+        import curses
+
+        curses.curs_set(0)
+        curses.use_default_colors()
+        styles = {None: curses.A_NORMAL, BOLD: curses.A_BOLD}
+        for number, (style, color) in enumerate(((UP, curses.COLOR_GREEN), (DOWN, curses.COLOR_RED),
+                                                 (MUTED, curses.COLOR_BLUE)), start=1):
+            curses.init_pair(number, color, -1)
+            styles[style] = curses.color_pair(number)
+
+        painted = None
+        while True:
+            self.loop.update(wait=0)
+
+            height, width = screen.getmaxyx()
+            self.view.width = width
+            if self.view.version != painted:
+                painted = self.view.version
+                self.paint(screen, styles, height, width)
+
+            # Waiting for a key doubles as the frame sleep
+            due = self.loop.next_due()
+            screen.timeout(100 if due is None else max(int(due * 1000), 1))
+            key = screen.getch()
+            if key in (ord("q"), 27):
+                break
+            if key in (ord("\t"), curses.KEY_RIGHT, ord("n")):
+                self.show(self.index + 1)
+            elif key in (curses.KEY_BTAB, curses.KEY_LEFT, ord("p")):
+                self.show(self.index - 1)
+
+    def paint(self, screen, styles, height, width):
+        import curses
+
+        screen.erase()
+        lines = self.view.lines()
+        lines.append([("q quit, tab / n / p switch symbol", MUTED)])
+        for row, segments in enumerate(lines[:height]):
+            column = 0
+            for text, style in segments:
+                if column >= width - 1:
+                    break
+                text = text[:width - 1 - column]
+                try:
+                    screen.addstr(row, column, text, styles.get(style, curses.A_NORMAL))
+                except curses.error:
+                    pass
+                column += len(text)
+        screen.refresh()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Terminal Binance dashboard")
+    parser.add_argument("--symbols", default="btcusdt", help="comma-separated symbols, switched with tab")
+    parser.add_argument("--stream-url", help="combined stream endpoint, e.g. a local stand-in server")
+    parser.add_argument("--rest-url", help="REST API base URL, e.g. a local stand-in server")
+    parser.add_argument("--relay", metavar="HOST:PORT", help="stream and fetch through a local relay (utils/relay.py)")
+    parser.add_argument("--fps", type=int, default=4, help="maximum screen update rate")
+    parser.add_argument("--history", type=int, default=240, help="1m candles kept per symbol")
+    parser.add_argument("--headless", action="store_true", help="print a summary line instead of drawing the screen")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between headless summary lines")
+    parser.add_argument("--duration", type=float, default=0, help="headless: exit after this many seconds")
+    args = parser.parse_args()
+
+    if args.relay:
+        args.stream_url = f"ws://{args.relay}/stream"
+        args.rest_url = f"http://{args.relay}"
+    if args.rest_url:
+        binance_rest.set_base_url(args.rest_url)
+
+    app = TerminalApp([symbol.strip().lower() for symbol in args.symbols.split(",")], args.stream_url, args.fps, args.history)
+    app.start()
+    try:
+        if args.headless:
+            app.run_headless(args.interval, args.duration)
+        else:
+            import curses
+            curses.wrapper(app.run_curses)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        app.stop()
@@ -0,0 +1,390 @@
+import itertools
+import threading
+from bisect import bisect_left, bisect_right
+from collections import deque
+from utils import decoder
+
+KINDS = ("price", "move", "volume", "trade")
+DIRECTIONS = ("above", "below", "cross")
+
+
+class Alert:
+    # price:  level is a price, direction above/below/cross
+    # move:   level is a percent move within `window` ms, direction above (rise) or below (fall)
+    # volume: level is a multiple of the average volume of the last closed 1m candles
+    # trade:  level is a trade's notional value (price * amount)
+
+    ids = itertools.count(1)
+
+    def __init__(self, symbol, kind, level, direction="above", window=300_000, once=None, alert_id=None):
+        self.id = alert_id or next(Alert.ids)
+        self.symbol = symbol.lower()
+        self.kind = kind
+        self.level = float(level)
+        self.direction = direction
+        self.window = int(window)
+        # Price alerts are removed once they fire; the others keep watching
+        self.once = kind == "price" if once is None else once
+
+    def describe(self):
+        symbol = self.symbol.upper()
+        if self.kind == "price":
+            return f"{symbol} price {self.direction} {self.level:,.2f}"
+        if self.kind == "move":
+            return f"{symbol} {'rises' if self.direction == 'above' else 'falls'} {self.level:g}% in {self.window // 60_000}m"
+        if self.kind == "volume":
+            return f"{symbol} 1m volume {self.level:g}x average"
+        return f"{symbol} trade over {self.level:,.0f}"
+
+    def to_dict(self):
+        return {
+            "id": self.id, "symbol": self.symbol, "kind": self.kind, "level": self.level,
+            "direction": self.direction, "window": self.window, "once": self.once,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data["symbol"], data["kind"], data["level"], data.get("direction", "above"),
+            data.get("window", 300_000), data.get("once"), data.get("id")
+        )
+
+
+class ThresholdIndex:
+    # Alerts sorted by level. A value moving from a to b only visits the
+    # levels in between, found by bisection.
+
+    def __init__(self):
+        self.levels = []
+        self.alerts = []
+
+    def __len__(self):
+        return len(self.levels)
+
+    def add(self, alert):
+        i = bisect_right(self.levels, alert.level)
+        self.levels.insert(i, alert.level)
+        self.alerts.insert(i, alert)
+
+    def remove(self, alert):
+        i = bisect_left(self.levels, alert.level)
+        while i < len(self.levels) and self.levels[i] == alert.level:
+            if self.alerts[i] is alert:
+                del self.levels[i]
+                del self.alerts[i]
+                return
+            i += 1
+
+    def rising(self, old, new):
+        # old < level <= new
+        return self.alerts[bisect_right(self.levels, old):bisect_right(self.levels, new)]
+
+    def falling(self, old, new):
+        # new <= level < old
+        return self.alerts[bisect_left(self.levels, new):bisect_left(self.levels, old)]
+
+    def upto(self, value):
+        return self.alerts[:bisect_right(self.levels, value)]
+
+
+class MoveWindow:
+    # Rolling low/high over `window` ms (monotonic deques) and the alerts on
+    # the percent rise from the low and fall from the high
+
+    def __init__(self, window):
+        self.window = window
+        self.lows = deque()
+        self.highs = deque()
+        self.up = ThresholdIndex()
+        self.down = ThresholdIndex()
+        self.rise = 0.0
+        self.fall = 0.0
+
+    def __len__(self):
+        return len(self.up) + len(self.down)
+
+    def update(self, time, price):
+        while self.lows and self.lows[-1][1] >= price:
+            self.lows.pop()
+        self.lows.append((time, price))
+        while self.highs and self.highs[-1][1] <= price:
+            self.highs.pop()
+        self.highs.append((time, price))
+
+        cutoff = time - self.window
+        while self.lows[0][0] <= cutoff:
+            self.lows.popleft()
+        while self.highs[0][0] <= cutoff:
+            self.highs.popleft()
+
+        low = self.lows[0][1]
+        high = self.highs[0][1]
+        rise = (price - low) / low * 100 if low else 0.0
+        fall = (high - price) / high * 100 if high else 0.0
+
+        fired = []
+        if rise > self.rise:
+            fired += [(alert, rise) for alert in self.up.rising(self.rise, rise)]
+        if fall > self.fall:
+            fired += [(alert, fall) for alert in self.down.rising(self.fall, fall)]
+        self.rise = rise
+        self.fall = fall
+        return fired
+
+
+class SymbolAlerts:
+    # Every alert of one symbol, evaluated on the stream thread as trades
+    # and klines arrive. Only crossed thresholds are ever touched.
+
+    VOLUME_LOOKBACK = 20
+
+    def __init__(self, symbol, on_fire):
+        self.symbol = symbol
+        self.on_fire = on_fire
+        self.lock = threading.Lock()
+        self.alerts = {}
+
+        self.price = None
+        self.up = ThresholdIndex()
+        self.down = ThresholdIndex()
+        self.moves = {}
+        self.trades = ThresholdIndex()
+
+        self.volume = ThresholdIndex()
+        self.volumes = deque(maxlen=self.VOLUME_LOOKBACK)
+        self.closed_time = None
+        self.candle_time = None
+        self.ratio = 0.0
+
+    def indexes(self, alert):
+        if alert.kind == "price":
+            return [index for index, wanted in ((self.up, ("above", "cross")), (self.down, ("below", "cross")))
+                    if alert.direction in wanted]
+        if alert.kind == "move":
+            move = self.moves.get(alert.window)
+            if move is None:
+                move = self.moves[alert.window] = MoveWindow(alert.window)
+            return [move.down if alert.direction == "below" else move.up]
+        if alert.kind == "volume":
+            return [self.volume]
+        return [self.trades]
+
+    def __len__(self):
+        return len(self.alerts)
+
+    def add(self, alert):
+        with self.lock:
+            if alert.id in self.alerts:
+                return
+            self.alerts[alert.id] = alert
+            for index in self.indexes(alert):
+                index.add(alert)
+
+    def remove(self, alert):
+        # False if it was already gone, e.g. fired while being removed
+        with self.lock:
+            if self.alerts.pop(alert.id, None) is None:
+                return False
+            for index in self.indexes(alert):
+                index.remove(alert)
+            if alert.kind == "move" and not len(self.moves[alert.window]):
+                del self.moves[alert.window]
+            return True
+
+    def on_trade(self, time, price, amount):
+        if not self.alerts:
+            self.price = price
+            return
+
+        with self.lock:
+            previous = self.price
+            self.price = price
+
+            fired = []
+            if previous is not None and price > previous:
+                fired += [(alert, price) for alert in self.up.rising(previous, price)]
+            elif previous is not None and price < previous:
+                fired += [(alert, price) for alert in self.down.falling(previous, price)]
+            for move in self.moves.values():
+                fired += move.update(time, price)
+            if len(self.trades):
+                notional = price * amount
+                fired += [(alert, notional) for alert in self.trades.upto(notional)]
+
+        self.fire(fired)
+
+    def on_kline(self, time, volume, closed):
+        with self.lock:
+            if time != self.candle_time:
+                self.candle_time = time
+                self.ratio = 0.0
+
+            fired = []
+            if len(self.volume) and self.volumes:
+                average = sum(self.volumes) / len(self.volumes)
+                ratio = volume / average if average else 0.0
+                if ratio > self.ratio:
+                    fired = [(alert, ratio) for alert in self.volume.rising(self.ratio, ratio)]
+                    self.ratio = ratio
+
+            if closed and time != self.closed_time:
+                self.closed_time = time
+                self.volumes.append(volume)
+
+        self.fire(fired)
+
+    def fire(self, fired):
+        for alert, value in fired:
+            if alert.once and not self.remove(alert):
+                continue
+            self.on_fire(alert, value)
+
+
+class AlertEngine:
+    # Registry of all alerts, keyed by id, with one SymbolAlerts per symbol.
+    # on_fire(alert, value) is called on the thread that saw the data;
+    # on_change() whenever the set of alerts changes (e.g. to save them).
+
+    def __init__(self, on_fire=None, on_change=None):
+        self.on_fire = on_fire
+        self.on_change = on_change
+        self.lock = threading.Lock()
+        self.alerts = {}
+        self.books = {}
+        self.listeners = ()
+
+    def book(self, symbol):
+        symbol = symbol.lower()
+        with self.lock:
+            book = self.books.get(symbol)
+            if book is None:
+                book = self.books[symbol] = SymbolAlerts(symbol, self.fired)
+            return book
+
+    def add(self, alert):
+        # Re-adding an id replaces the alert
+        self.remove(alert.id)
+        with self.lock:
+            self.alerts[alert.id] = alert
+        self.book(alert.symbol).add(alert)
+        self.changed(alert, True)
+        return alert
+
+    def remove(self, alert_id):
+        with self.lock:
+            alert = self.alerts.pop(alert_id, None)
+        if alert:
+            self.book(alert.symbol).remove(alert)
+            self.changed(alert, False)
+
+    def get(self, alert_id):
+        with self.lock:
+            return self.alerts.get(alert_id)
+
+    def all(self):
+        with self.lock:
+            return list(self.alerts.values())
+
+    def symbols(self):
+        with self.lock:
+            return {alert.symbol for alert in self.alerts.values()}
+
+    def for_symbol(self, symbol):
+        with self.lock:
+            return [alert for alert in self.alerts.values() if alert.symbol == symbol.lower()]
+
+    def add_listener(self, callback):
+        # callback(alert, added) for every add and remove, e.g. to mirror alerts elsewhere
+        self.listeners = self.listeners + (callback,)
+
+    def changed(self, alert, added):
+        for callback in self.listeners:
+            callback(alert, added)
+        if self.on_change:
+            self.on_change()
+
+    def fired(self, alert, value):
+        # Called by a SymbolAlerts, which has already dropped a one-shot alert
+        if alert.once:
+            with self.lock:
+                self.alerts.pop(alert.id, None)
+            self.changed(alert, False)
+        if self.on_fire:
+            self.on_fire(alert, value)
+
+    def fired_remote(self, alert_id, value):
+        # An alert evaluated in another process fired
+        with self.lock:
+            alert = self.alerts.get(alert_id)
+        if alert is None:
+            return
+        if alert.once:
+            self.remove(alert_id)
+        if self.on_fire:
+            self.on_fire(alert, value)
+
+    def to_list(self):
+        with self.lock:
+            return [alert.to_dict() for alert in self.alerts.values()]
+
+    def load(self, items):
+        for data in items:
+            try:
+                alert = Alert.from_dict(data)
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"skipping saved alert {data}: {e}")
+                continue
+            self.add(alert)
+        # Keep new ids clear of the loaded ones
+        top = max(self.alerts, default=0)
+        Alert.ids = itertools.count(top + 1)
+
+
+class AlertFeed:
+    # Subscribes a hub to the trade and kline streams of every symbol that
+    # has alerts and evaluates them right in the stream callbacks, whether
+    # or not the symbol is on screen. The hub only opens a stream once, so
+    # a symbol that is also displayed costs no extra subscription.
+
+    def __init__(self, engine, hub):
+        self.engine = engine
+        self.hub = hub
+        self.lock = threading.Lock()
+        self.streams = {}
+        engine.add_listener(self.on_change)
+        for symbol in engine.symbols():
+            self.watch(symbol)
+
+    def on_change(self, alert, added):
+        if added:
+            self.watch(alert.symbol)
+        elif not len(self.engine.book(alert.symbol)):
+            self.unwatch(alert.symbol)
+
+    def watch(self, symbol):
+        book = self.engine.book(symbol)
+
+        def on_trade(payload):
+            price, amount, is_sell, trade_time = decoder.TRADE.extract(payload)
+            book.on_trade(trade_time, price, amount)
+
+        def on_kline(payload):
+            t, o, h, l, c, v, closed = decoder.KLINE.extract(payload)
+            book.on_kline(t, v, closed)
+
+        with self.lock:
+            if symbol in self.streams:
+                return
+            streams = self.streams[symbol] = {f"{symbol}@trade": on_trade, f"{symbol}@kline_1m": on_kline}
+        for stream, callback in streams.items():
+            self.hub.subscribe(stream, callback)
+
+    def unwatch(self, symbol):
+        with self.lock:
+            streams = self.streams.pop(symbol, {})
+        for stream, callback in streams.items():
+            self.hub.unsubscribe(stream, callback)
+
+    def stop(self):
+        for symbol in list(self.streams):
+            self.unwatch(symbol)
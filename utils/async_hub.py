@@ -0,0 +1,164 @@
+import asyncio
+import base64
+import json
+import os
+import ssl
+import struct
+import threading
+from urllib.parse import urlsplit
+from utils.stream_hub import StreamHub
+from utils.ws_server import OP_BINARY, OP_CLOSE, OP_PING, OP_PONG, OP_TEXT, accept_key, apply_mask, encode_frame
+
+OP_CONTINUATION = 0x0
+
+
+async def read_frame(reader):
+    b1, b2 = await reader.readexactly(2)
+    length = b2 & 0x7F
+
+    if length == 126:
+        length = struct.unpack("!H", await reader.readexactly(2))[0]
+    elif length == 127:
+        length = struct.unpack("!Q", await reader.readexactly(8))[0]
+
+    key = await reader.readexactly(4) if b2 & 0x80 else None
+    payload = await reader.readexactly(length) if length else b""
+    if key:
+        payload = apply_mask(payload, key)
+
+    return bool(b1 & 0x80), b1 & 0x0F, payload
+
+
+class AsyncStreamHub(StreamHub):
+    # Same interface and behaviour as StreamHub (subscriptions, backoff,
+    # stale detection, reconnect listeners), but the socket, pings, the
+    # subscription batching and the watchdog all live on one asyncio loop
+    # in a single thread. The WebSocket client reuses the ws_server codec.
+
+    CONNECT_TIMEOUT = 10
+
+    def __init__(self, url=None):
+        super().__init__(url)
+        self.loop = None
+        self.writer = None
+
+    def start(self):
+        if self.is_running:
+            return
+
+        self.is_running = True
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        asyncio.run_coroutine_threadsafe(self.supervise_async(), self.loop)
+        asyncio.run_coroutine_threadsafe(self.watchdog_async(), self.loop)
+
+    def stop(self):
+        self.is_running = False
+        if self.loop:
+            self.loop.call_soon_threadsafe(self.shutdown)
+
+    def shutdown(self):
+        if self.writer:
+            self.writer.close()
+        for task in asyncio.all_tasks(self.loop):
+            task.cancel()
+        self.loop.call_soon(self.loop.stop)
+
+    def schedule_flush(self):
+        with self.lock:
+            if self.flush_timer or not self.is_connected:
+                return
+            self.flush_timer = True
+        self.loop.call_soon_threadsafe(self.loop.call_later, self.BATCH_DELAY, self.flush)
+
+    def send(self, method, params):
+        # Always called on the loop thread (flush runs there)
+        writer = self.writer
+        if not writer:
+            return
+        message = json.dumps({"method": method, "params": params, "id": next(self.ids)})
+        writer.write(encode_frame(message, mask=True))
+
+    async def supervise_async(self):
+        attempt = 0
+
+        while self.is_running:
+            opens = self.opens
+            try:
+                await self.connect()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"stream hub error: {e}")
+
+            if self.is_connected:
+                self.on_close(None, None, None)
+            if not self.is_running:
+                break
+
+            if self.opens != opens:
+                attempt = 0
+            delay = self.reconnect_delay(attempt)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def watchdog_async(self):
+        while self.is_running:
+            await asyncio.sleep(1)
+            if self.writer and self.is_stale():
+                self.writer.close()
+
+    async def pinger(self, writer):
+        while True:
+            await asyncio.sleep(self.PING_INTERVAL)
+            writer.write(encode_frame(b"", OP_PING, mask=True))
+
+    async def connect(self):
+        url = urlsplit(self.url)
+        secure = url.scheme == "wss"
+        port = url.port or (443 if secure else 80)
+        path = (url.path or "/") + (f"?{url.query}" if url.query else "")
+
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(url.hostname, port, ssl=ssl.create_default_context() if secure else None),
+            self.CONNECT_TIMEOUT
+        )
+
+        key = base64.b64encode(os.urandom(16)).decode()
+        writer.write(
+            f"GET {path} HTTP/1.1\r\n"
+            f"Host: {url.netloc}\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\n"
+            "Sec-WebSocket-Version: 13\r\n\r\n".encode()
+        )
+        response = (await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.CONNECT_TIMEOUT)).decode()
+        if " 101 " not in response.split("\r\n", 1)[0] or accept_key(key) not in response:
+            writer.close()
+            raise ConnectionError(f"handshake failed: {response.splitlines()[0]}")
+
+        self.writer = writer
+        pinger = asyncio.ensure_future(self.pinger(writer))
+        self.on_open(None)
+
+        fragments = []
+        try:
+            while True:
+                fin, opcode, payload = await read_frame(reader)
+
+                if opcode == OP_PING:
+                    writer.write(encode_frame(payload, OP_PONG, mask=True))
+                elif opcode == OP_CLOSE:
+                    writer.write(encode_frame(payload[:2], OP_CLOSE, mask=True))
+                    break
+                elif opcode in (OP_TEXT, OP_BINARY, OP_CONTINUATION):
+                    fragments.append(payload)
+                    if fin:
+                        message = b"".join(fragments).decode()
+                        fragments = []
+                        self.on_message(None, message)
+        finally:
+            pinger.cancel()
+            self.writer = None
+            writer.close()
@@ -0,0 +1,19 @@
+from concurrent.futures import ThreadPoolExecutor
+
+# Blocking work (REST calls, cache backfills) shares one fixed pool, so the
+# thread count does not grow with the number of symbols
+WORKERS = 4
+
+executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="background")
+
+
+def report(future):
+    error = future.exception()
+    if error:
+        print("background task error:", error)
+
+
+def submit(fn, *args):
+    future = executor.submit(fn, *args)
+    future.add_done_callback(report)
+    return future
@@ -0,0 +1,48 @@
+import requests
+
+BASE_URL = "https://api.binance.com"
+
+# One pooled keep-alive session for every REST call
+session = requests.Session()
+
+# Optional utils.recorder.Recorder, and a replay source (utils.replay.ReplayHub)
+# that answers requests from a recording instead of the network
+recorder = None
+replay = None
+
+
+def set_base_url(url):
+    global BASE_URL
+    BASE_URL = url.rstrip("/")
+
+
+def set_recorder(source):
+    global recorder
+    recorder = source
+
+
+def set_replay(source):
+    global replay
+    replay = source
+
+
+def get(path, params, timeout=5):
+    if replay is not None:
+        return replay.response(path, params)
+
+    r = session.get(BASE_URL + path, params=params, timeout=timeout)
+    r.raise_for_status()
+    if recorder is not None:
+        recorder.record_rest(path, params, r.text)
+    return r.json()
+
+
+def get_klines(symbol, interval="1m", limit=500, start_time=None):
+    params = {"symbol": symbol.upper(), "interval": interval, "limit": limit}
+    if start_time is not None:
+        params["startTime"] = start_time
+    return get("/api/v3/klines", params)
+
+
+def get_depth(symbol, limit=1000):
+    return get("/api/v3/depth", {"symbol": symbol.upper(), "limit": limit})
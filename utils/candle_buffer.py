@@ -0,0 +1,85 @@
+import numpy as np
+
+CANDLE_DTYPE = np.dtype([
+    ("time", "i8"),
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("close", "f8"),
+    ("volume", "f8"),
+])
+
+
+class CandleBuffer:
+    # Every slot is stored twice (at i and i + capacity), so the candles in
+    # time order are always one contiguous slice and views never need a copy.
+
+    def __init__(self, capacity=1440):
+        self.capacity = capacity
+        self.data = np.zeros(capacity * 2, dtype=CANDLE_DTYPE)
+        self.start = 0
+        self.size = 0
+        self.generation = 0
+
+    def __len__(self):
+        return self.size
+
+    def clear(self):
+        self.start = 0
+        self.size = 0
+        self.generation += 1
+
+    @property
+    def last_time(self):
+        if not self.size:
+            return None
+        return int(self.data["time"][self.start + self.size - 1])
+
+    def write(self, slot, t, o, h, l, c, v):
+        row = (t, o, h, l, c, v)
+        self.data[slot] = row
+        self.data[slot + self.capacity] = row
+
+    def append(self, t, o, h, l, c, v):
+        if self.size < self.capacity:
+            slot = (self.start + self.size) % self.capacity
+            self.size += 1
+        else:
+            slot = self.start
+            self.start = (self.start + 1) % self.capacity
+        self.write(slot, t, o, h, l, c, v)
+
+    def update_last(self, h, l, c, v):
+        slot = (self.start + self.size - 1) % self.capacity
+        for index in (slot, slot + self.capacity):
+            row = self.data[index:index + 1]
+            row["high"] = h
+            row["low"] = l
+            row["close"] = c
+            row["volume"] = v
+
+    def upsert(self, t, o, h, l, c, v):
+        # Returns True when a new candle was started
+        last = self.last_time
+        if last == t:
+            self.update_last(h, l, c, v)
+            return False
+        if last is not None and t < last:
+            return False
+        self.append(t, o, h, l, c, v)
+        return True
+
+    def load(self, candles):
+        candles = np.asarray(candles, dtype=CANDLE_DTYPE)[-self.capacity:]
+        n = len(candles)
+        self.data[:n] = candles
+        self.data[self.capacity:self.capacity + n] = candles
+        self.start = 0
+        self.size = n
+        self.generation += 1
+
+    def view(self, n=None):
+        end = self.start + self.size
+        if n is None or n > self.size:
+            n = self.size
+        return self.data[end - n:end]
@@ -0,0 +1,109 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+FRAME_PREFIX = '{"stream":"'
+DATA_KEY = ',"data":'
+
+loads = json.loads
+PARSER = "json"
+RAW_PAYLOADS = True
+
+
+def set_parser(name):
+    # orjson parses a whole frame faster than the fields can be scanned out
+    # of it; with the stdlib parser, payloads stay raw and are scanned lazily.
+    global loads, PARSER, RAW_PAYLOADS
+    if name == "orjson" and orjson is None:
+        raise ValueError("orjson is not installed")
+    loads = orjson.loads if name == "orjson" else json.loads
+    PARSER = name
+    RAW_PAYLOADS = name == "json"
+
+
+def split_frame(message):
+    # Combined stream frames look like {"stream":"<name>","data":{...}}; cut
+    # out the name and the raw payload without parsing the payload itself.
+    if isinstance(message, bytes):
+        message = message.decode()
+
+    if RAW_PAYLOADS and message.startswith(FRAME_PREFIX):
+        end = message.find('"', len(FRAME_PREFIX))
+        if message.startswith(DATA_KEY, end + 1):
+            return message[len(FRAME_PREFIX):end], message[end + 1 + len(DATA_KEY):-1]
+
+    frame = loads(message)
+    if "stream" in frame:
+        return frame["stream"], frame["data"]
+    return None, frame
+
+
+def stream_name(message):
+    # Just the stream name, for code that passes frames on untouched
+    if isinstance(message, bytes):
+        message = message.decode()
+    if message.startswith(FRAME_PREFIX):
+        return message[len(FRAME_PREFIX):message.find('"', len(FRAME_PREFIX))]
+    return loads(message).get("stream")
+
+
+def to_bool(value):
+    return value is True or value == "true"
+
+
+class Schema:
+    # Pulls a few top-level (or kline "k") fields out of a payload. Raw
+    # payload strings are scanned with str.find, which beats a full stdlib
+    # parse when only a handful of the fields are needed.
+
+    def __init__(self, fields, nested=None):
+        self.fields = [(key, f'"{key}":', len(key) + 3, convert) for key, convert in fields]
+        self.nested = nested
+
+    def extract(self, payload):
+        if not isinstance(payload, str):
+            data = payload[self.nested] if self.nested else payload
+            return tuple([convert(data[key]) for key, _, _, convert in self.fields])
+
+        values = []
+        for key, needle, skip, convert in self.fields:
+            start = payload.find(needle)
+            if start < 0:
+                raise KeyError(key)
+            start += skip
+
+            if payload[start] == '"':
+                start += 1
+                value = payload[start:payload.index('"', start)]
+            else:
+                end = payload.find(",", start)
+                value = payload[start:end] if end >= 0 else payload[start:]
+                if "}" in value:
+                    value = value[:value.index("}")]
+
+            values.append(convert(value))
+        return tuple(values)
+
+
+TICKER = Schema([("c", float), ("p", float), ("P", float), ("v", float), ("E", int)])
+TRADE = Schema([("p", float), ("q", float), ("m", to_bool), ("T", int)])
+KLINE = Schema(
+    [("t", int), ("o", float), ("h", float), ("l", float), ("c", float), ("v", float), ("x", to_bool)],
+    nested="k"
+)
+
+
+def parse_levels(levels):
+    return [(float(price), float(qty)) for price, qty in levels]
+
+
+def depth_update(payload):
+    data = loads(payload) if isinstance(payload, str) else payload
+    return data["U"], data["u"], parse_levels(data["b"]), parse_levels(data["a"]), data.get("E")
+
+
+if orjson is not None:
+    set_parser("orjson")
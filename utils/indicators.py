@@ -0,0 +1,403 @@
+from collections import deque
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+DAY_MS = 86_400_000
+EMA_CHUNK = 64
+
+
+def ema(values, alpha, first=None):
+    # Exponential moving average seeded with the first value (or `first`).
+    # The recursion is unrolled per chunk: y[j] = w^(j+1)*y0 + alpha*w^j*cumsum(x*w^-k),
+    # short enough chunks keep w^-k finite for any period.
+    values = np.asarray(values, dtype=float)
+    out = np.empty(len(values))
+    if not len(values):
+        return out
+
+    w = 1 - alpha
+    prev = values[0] if first is None else first
+    start = 0 if first is not None else 1
+    if first is None:
+        out[0] = prev
+
+    if w == 0:
+        out[start:] = values[start:]
+        return out
+
+    powers = w ** np.arange(EMA_CHUNK + 1)
+    for i in range(start, len(values), EMA_CHUNK):
+        chunk = values[i:i + EMA_CHUNK]
+        n = len(chunk)
+        acc = np.cumsum(chunk / powers[:n])
+        out[i:i + n] = powers[1:n + 1] * prev + alpha * powers[:n] * acc
+        prev = out[i + n - 1]
+    return out
+
+
+def rolling(values, period):
+    # Windowed view (one row per complete window) for vectorized mean/std
+    if len(values) < period:
+        return None
+    return sliding_window_view(values, period)
+
+
+class SMA:
+    panel = "price"
+
+    def __init__(self, period=20):
+        self.period = period
+        self.name = f"SMA {period}"
+        self.lines = ("sma",)
+
+    def seed(self, rows):
+        closes = rows["close"]
+        out = np.full(len(closes), np.nan)
+        windows = rolling(closes, self.period)
+        if windows is not None:
+            out[self.period - 1:] = windows.mean(axis=1)
+
+        self.window = deque(closes[len(closes) - self.period + 1:].tolist() if self.period > 1 else ())
+        self.total = sum(self.window)
+        return out[None]
+
+    def value(self, row):
+        if len(self.window) < self.period - 1:
+            return (np.nan,)
+        return ((self.total + row[4]) / self.period,)
+
+    def commit(self, row):
+        values = self.value(row)
+        if self.period > 1:
+            if len(self.window) == self.period - 1:
+                self.total -= self.window.popleft()
+            self.window.append(row[4])
+            self.total += row[4]
+        return values
+
+
+class EMA:
+    panel = "price"
+
+    def __init__(self, period=50):
+        self.period = period
+        self.alpha = 2 / (period + 1)
+        self.name = f"EMA {period}"
+        self.lines = ("ema",)
+
+    def seed(self, rows):
+        out = ema(rows["close"], self.alpha)
+        self.prev = out[-1] if len(out) else None
+        return out[None]
+
+    def value(self, row):
+        if self.prev is None:
+            return (row[4],)
+        return (self.prev + self.alpha * (row[4] - self.prev),)
+
+    def commit(self, row):
+        values = self.value(row)
+        self.prev = values[0]
+        return values
+
+
+class Bollinger:
+    panel = "price"
+
+    def __init__(self, period=20, width=2.0):
+        self.period = period
+        self.width = width
+        self.name = f"BB {period}"
+        self.lines = ("mid", "upper", "lower")
+
+    def seed(self, rows):
+        closes = rows["close"]
+        out = np.full((3, len(closes)), np.nan)
+        windows = rolling(closes, self.period)
+        if windows is not None:
+            mid = windows.mean(axis=1)
+            band = windows.std(axis=1) * self.width
+            out[:, self.period - 1:] = mid, mid + band, mid - band
+
+        # Sums are kept relative to an anchor price so squaring stays precise
+        self.anchor = float(closes[-1]) if len(closes) else None
+        tail = closes[len(closes) - self.period + 1:] if self.period > 1 else closes[:0]
+        self.window = deque((tail - self.anchor).tolist() if len(tail) else ())
+        self.total = sum(self.window)
+        self.squares = sum(x * x for x in self.window)
+        return out
+
+    def value(self, row):
+        if self.anchor is None:
+            self.anchor = row[4]
+        if len(self.window) < self.period - 1:
+            return np.nan, np.nan, np.nan
+
+        x = row[4] - self.anchor
+        mean = (self.total + x) / self.period
+        variance = max((self.squares + x * x) / self.period - mean * mean, 0.0)
+        band = variance ** 0.5 * self.width
+        mid = mean + self.anchor
+        return mid, mid + band, mid - band
+
+    def commit(self, row):
+        values = self.value(row)
+        if self.period > 1:
+            x = row[4] - self.anchor
+            if len(self.window) == self.period - 1:
+                old = self.window.popleft()
+                self.total -= old
+                self.squares -= old * old
+            self.window.append(x)
+            self.total += x
+            self.squares += x * x
+        return values
+
+
+class VWAP:
+    # Session VWAP on the typical price, restarting at 00:00 UTC
+    panel = "price"
+
+    def __init__(self):
+        self.name = "VWAP"
+        self.lines = ("vwap",)
+
+    def seed(self, rows):
+        typical = (rows["high"] + rows["low"] + rows["close"]) / 3
+        volumes = rows["volume"]
+        days = rows["time"] // DAY_MS
+
+        pv = np.cumsum(typical * volumes)
+        vol = np.cumsum(volumes)
+        if len(days):
+            starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+            session = np.cumsum(np.r_[True, days[1:] != days[:-1]]) - 1
+            pv = pv - (pv - typical * volumes)[starts][session]
+            vol = vol - (vol - volumes)[starts][session]
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out = np.where(vol > 0, pv / vol, typical)
+
+        self.day = int(days[-1]) if len(days) else None
+        self.pv = float(pv[-1]) if len(pv) else 0.0
+        self.volume = float(vol[-1]) if len(vol) else 0.0
+        return out[None]
+
+    def sums(self, row):
+        t, o, h, l, c, v = row
+        typical = (h + l + c) / 3
+        if t // DAY_MS != self.day:
+            return t // DAY_MS, typical * v, v, typical
+        return self.day, self.pv + typical * v, self.volume + v, typical
+
+    def value(self, row):
+        day, pv, volume, typical = self.sums(row)
+        return (pv / volume if volume > 0 else typical,)
+
+    def commit(self, row):
+        values = self.value(row)
+        self.day, self.pv, self.volume, _ = self.sums(row)
+        return values
+
+
+class RSI:
+    # Wilder's RSI: gains and losses smoothed with alpha = 1 / period
+    panel = "lower"
+    limits = (0, 100)
+
+    def __init__(self, period=14):
+        self.period = period
+        self.alpha = 1 / period
+        self.name = f"RSI {period}"
+        self.lines = ("rsi",)
+
+    @staticmethod
+    def rsi(gain, loss):
+        if loss == 0:
+            return 100.0 if gain > 0 else 50.0
+        return 100 - 100 / (1 + gain / loss)
+
+    def seed(self, rows):
+        closes = rows["close"]
+        out = np.full(len(closes), np.nan)
+        self.count = len(closes)
+        self.prev = float(closes[-1]) if len(closes) else None
+        self.gain = self.loss = None
+
+        if len(closes) > 1:
+            diff = np.diff(closes)
+            gain = ema(np.maximum(diff, 0), self.alpha)
+            loss = ema(np.maximum(-diff, 0), self.alpha)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                rsi = np.where(loss > 0, 100 - 100 / (1 + gain / loss), np.where(gain > 0, 100.0, 50.0))
+            out[1:] = rsi
+            out[:self.period] = np.nan
+            self.gain = float(gain[-1])
+            self.loss = float(loss[-1])
+        return out[None]
+
+    def averages(self, row):
+        if self.prev is None:
+            return None, None
+        diff = row[4] - self.prev
+        gain = max(diff, 0.0)
+        loss = max(-diff, 0.0)
+        if self.gain is None:
+            return gain, loss
+        return self.gain + self.alpha * (gain - self.gain), self.loss + self.alpha * (loss - self.loss)
+
+    def value(self, row):
+        gain, loss = self.averages(row)
+        if gain is None or self.count < self.period:
+            return (np.nan,)
+        return (self.rsi(gain, loss),)
+
+    def commit(self, row):
+        values = self.value(row)
+        gain, loss = self.averages(row)
+        if gain is not None:
+            self.gain, self.loss = gain, loss
+        self.prev = row[4]
+        self.count += 1
+        return values
+
+
+class MACD:
+    panel = "lower"
+    limits = None
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.alphas = 2 / (fast + 1), 2 / (slow + 1), 2 / (signal + 1)
+        self.name = f"MACD {fast},{slow},{signal}"
+        self.lines = ("macd", "signal")
+
+    def seed(self, rows):
+        closes = rows["close"]
+        a_fast, a_slow, a_signal = self.alphas
+        fast = ema(closes, a_fast)
+        slow = ema(closes, a_slow)
+        macd = fast - slow
+        signal = ema(macd, a_signal)
+
+        self.prev = (fast[-1], slow[-1], signal[-1]) if len(closes) else None
+        return np.array((macd, signal))
+
+    def value(self, row):
+        c = row[4]
+        if self.prev is None:
+            self.pending = (c, c, 0.0)
+            return 0.0, 0.0
+
+        a_fast, a_slow, a_signal = self.alphas
+        fast, slow, signal = self.prev
+        fast += a_fast * (c - fast)
+        slow += a_slow * (c - slow)
+        macd = fast - slow
+        signal += a_signal * (macd - signal)
+        self.pending = (fast, slow, signal)
+        return macd, signal
+
+    def commit(self, row):
+        values = self.value(row)
+        self.prev = self.pending
+        return values
+
+
+AVAILABLE = {
+    "SMA 20": lambda: SMA(20),
+    "EMA 50": lambda: EMA(50),
+    "BB 20": lambda: Bollinger(20, 2.0),
+    "VWAP": VWAP,
+    "RSI 14": lambda: RSI(14),
+    "MACD": lambda: MACD(12, 26, 9),
+}
+
+
+class IndicatorSet:
+    # Indicator values kept alongside a CandleBuffer, slot for slot (mirrored
+    # the same way, so views line up without copies). A new or rebuilt buffer
+    # is seeded with one vectorized pass; after that each update only touches
+    # the newest rows: closed candles are committed into the running state and
+    # the live candle is evaluated against it without changing it.
+
+    RESEED_AFTER = 1000
+
+    def __init__(self, names=()):
+        self.indicators = [AVAILABLE[name]() for name in names if name in AVAILABLE]
+        self.candles = None
+        self.generation = None
+        self.last_time = None
+        self.values = None
+
+    def __bool__(self):
+        return bool(self.indicators)
+
+    def reset(self):
+        # Drop the buffer and values; the next update seeds from scratch
+        self.candles = None
+        self.generation = None
+        self.last_time = None
+        self.values = None
+
+    def update(self, candles):
+        if not self.indicators:
+            return
+        if candles is not self.candles or candles.generation != self.generation or self.last_time is None:
+            self.seed(candles)
+            return
+
+        last = candles.last_time
+        if last is None:
+            return
+        if last == self.last_time:
+            self.write(candles, 0, candles.view(1)[0].tolist(), commit=False)
+            return
+
+        # Commit the previous live candle and anything appended after it
+        times = candles.view(self.RESEED_AFTER + 1)["time"]
+        new = len(times) - int(np.searchsorted(times, self.last_time, side="right"))
+        if new >= len(times):
+            self.seed(candles)
+            return
+
+        rows = candles.view(new + 1).tolist()
+        for i, row in enumerate(rows):
+            self.write(candles, new - i, row, commit=i < new)
+        self.last_time = last
+
+    def seed(self, candles):
+        self.candles = candles
+        self.generation = candles.generation
+        self.last_time = candles.last_time
+        capacity = candles.capacity
+        rows = candles.view()
+
+        self.values = [np.full((len(indicator.lines), capacity * 2), np.nan) for indicator in self.indicators]
+        if not len(rows):
+            for indicator in self.indicators:
+                indicator.seed(rows)
+            return
+
+        slots = (candles.start + np.arange(len(rows) - 1)) % capacity
+        for indicator, values in zip(self.indicators, self.values):
+            out = indicator.seed(rows[:-1])
+            values[:, slots] = out
+            values[:, slots + capacity] = out
+        self.write(candles, 0, rows[-1].tolist(), commit=False)
+
+    def write(self, candles, back, row, commit):
+        # back = position from the newest candle (0 is the live one)
+        slot = (candles.start + candles.size - 1 - back) % candles.capacity
+        for indicator, values in zip(self.indicators, self.values):
+            result = indicator.commit(row) if commit else indicator.value(row)
+            values[:, slot] = result
+            values[:, slot + candles.capacity] = result
+
+    def view(self, n):
+        # (indicator, lines x n) aligned with candles.view(n)
+        candles = self.candles
+        if candles is None:
+            return []
+        end = candles.start + candles.size
+        n = min(n, candles.size)
+        return [(indicator, values[:, end - n:end]) for indicator, values in zip(self.indicators, self.values)]
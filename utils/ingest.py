@@ -0,0 +1,418 @@
+import multiprocessing
+import queue as queue_module
+import threading
+import zlib
+from datetime import datetime
+from multiprocessing import shared_memory
+import numpy as np
+from utils import binance_rest
+from utils.alerts import Alert, AlertEngine, AlertFeed
+from utils.candle_buffer import CandleBuffer, CANDLE_DTYPE
+from utils.kline_cache import KlineCache, CACHE_PATH
+from utils.market_state import MarketState, SymbolState
+from utils.stream_hub import StreamHub
+
+BOOK_DEPTH = 20
+SECTIONS = ("ticker", "trades", "book", "candles")
+
+
+class SharedSymbol:
+    # Fixed layout of one symbol's state in a shared memory block. Each
+    # section has its own seqlock counter: the single writer makes it odd
+    # while writing, readers retry until they see the same even value twice.
+
+    def __init__(self, capacity, name=None):
+        layout = [
+            ("seq", np.int64, (len(SECTIONS),)),
+            ("ticker", np.float64, (4,)),
+            ("trade_meta", np.int64, (2,)),
+            ("trades", np.float64, (SymbolState.TRADE_HISTORY, 4)),
+            ("flow", np.float64, (9,)),
+            ("book_meta", np.int64, (3,)),
+            ("book", np.float64, (2, BOOK_DEPTH, 2)),
+            ("candle_meta", np.int64, (4,)),
+            ("candles", CANDLE_DTYPE, (capacity * 2,)),
+        ]
+        size = sum(np.dtype(dtype).itemsize * int(np.prod(shape)) for _, dtype, shape in layout)
+
+        self.capacity = capacity
+        self.shm = shared_memory.SharedMemory(name=name, create=name is None, size=size)
+        self.name = self.shm.name
+
+        offset = 0
+        for field, dtype, shape in layout:
+            array = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offset)
+            setattr(self, field, array)
+            offset += array.nbytes
+
+        if name is None:
+            self.seq[:] = 0
+
+    def version(self, section):
+        return int(self.seq[SECTIONS.index(section)])
+
+    def write(self, section, fn, *args):
+        index = SECTIONS.index(section)
+        self.seq[index] += 1
+        try:
+            fn(*args)
+        finally:
+            self.seq[index] += 1
+
+    def read(self, section, fn):
+        index = SECTIONS.index(section)
+        while True:
+            before = int(self.seq[index])
+            if before % 2:
+                continue
+            result = fn()
+            if int(self.seq[index]) == before:
+                return result
+
+    def close(self, unlink=False):
+        for field in ("seq", "ticker", "trade_meta", "trades", "flow", "book_meta", "book", "candle_meta", "candles"):
+            setattr(self, field, None)
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+class SharedStateWriter:
+    # Worker-side view of a SymbolState that publishes every change into
+    # the symbol's shared block
+
+    def __init__(self, shared):
+        self.shared = shared
+        self.lock = threading.Lock()
+        self.generation = None
+        self.last_time = None
+        self.appended = 0
+
+    def close(self):
+        with self.lock:
+            self.shared.close()
+            self.shared = None
+
+    def on_state(self, state, kind):
+        with self.lock:
+            if self.shared is None:
+                return
+            if kind == "ticker" and state.ticker:
+                self.shared.write("ticker", self.write_ticker, state.ticker)
+            elif kind == "trades":
+                self.shared.write("trades", self.write_trades, *state.recent_trades(), state.trade_stats())
+            elif kind == "book":
+                self.shared.write("book", self.write_book, *state.book.top(BOOK_DEPTH), state.book.resyncs)
+            elif kind == "candles":
+                self.shared.write("candles", self.write_candles, state.candles)
+
+    def write_ticker(self, ticker):
+        self.shared.ticker[:] = ticker
+
+    def write_trades(self, count, trades, stats):
+        vwap, buy_volume, sell_volume, trade_count, rate, largest = stats
+        rows = [(time.timestamp(), price, amount, is_sell) for time, price, amount, is_sell, side in trades]
+
+        self.shared.trade_meta[:] = (count, len(rows))
+        if rows:
+            self.shared.trades[:len(rows)] = rows
+        self.shared.flow[:] = (
+            np.nan if vwap is None else vwap, buy_volume, sell_volume, trade_count, rate,
+            *(largest if largest else (np.nan,) * 4)
+        )
+
+    def write_book(self, asks, bids, resyncs):
+        self.shared.book_meta[:] = (len(asks), len(bids), resyncs)
+        if asks:
+            self.shared.book[0, :len(asks)] = asks
+        if bids:
+            self.shared.book[1, :len(bids)] = bids
+
+    def write_candles(self, candles):
+        shared = self.shared
+        if candles.generation != self.generation:
+            self.generation = candles.generation
+            self.appended = 0
+            shared.candles[:] = candles.data
+        elif candles.size:
+            # Every row from the last published one on can differ: usually
+            # one upsert, but a reconnect backfill merges many in one go
+            times = candles.view()["time"]
+            if self.last_time is None:
+                newer = candles.size - 1
+            else:
+                newer = int(np.searchsorted(times, self.last_time, side="right"))
+            self.appended += candles.size - newer
+            first = max(0, min(newer - 1, candles.size - 2))
+            slots = (candles.start + np.arange(first, candles.size)) % candles.capacity
+            shared.candles[slots] = candles.data[slots]
+            shared.candles[slots + candles.capacity] = candles.data[slots + candles.capacity]
+
+        self.last_time = candles.last_time
+        shared.candle_meta[:] = (candles.start, candles.size, candles.generation, self.appended)
+
+
+class DirectScheduler:
+    # Stands in for the UI scheduler inside a worker: there is no frame to
+    # batch for, so updates are applied right away (one at a time)
+
+    def __init__(self):
+        self.lock = threading.Lock()
+
+    def post(self, key, callback, *args):
+        with self.lock:
+            try:
+                callback(*args)
+            except Exception as e:
+                print("ingest update error:", e)
+
+    def append(self, key, callback, item, limit=None):
+        self.post(key, callback, [item])
+
+    def discard(self, owner):
+        pass
+
+
+def run_worker(commands, fired, stream_url, rest_url, cache_path, capacity):
+    if rest_url:
+        binance_rest.set_base_url(rest_url)
+
+    hub = StreamHub(stream_url)
+    hub.start()
+    cache = KlineCache(cache_path) if cache_path else None
+    # The heatmap history is not shared with the UI process, so it is not kept
+    market = MarketState(hub, DirectScheduler(), capacity, cache, liquidity=False)
+    writers = {}
+
+    # Alerts of this worker's symbols are evaluated here, on the stream
+    # thread; only the ones that fire travel back to the UI
+    alerts = AlertEngine(on_fire=lambda alert, value: fired.put((alert.id, value)))
+    feed = AlertFeed(alerts, hub)
+
+    while True:
+        command = commands.get()
+
+        if command[0] == "add":
+            symbol, name = command[1], command[2]
+            try:
+                writer = SharedStateWriter(SharedSymbol(capacity, name))
+            except FileNotFoundError:
+                # Removed by the UI before this worker got to it
+                continue
+            writers[symbol] = writer
+            state = market.add(symbol)
+            state.add_view(writer)
+            for kind in ("ticker", "trades", "book", "candles"):
+                writer.on_state(state, kind)
+
+        elif command[0] == "remove":
+            market.remove(command[1])
+            writer = writers.pop(command[1], None)
+            if writer:
+                writer.close()
+
+        elif command[0] == "alert":
+            alerts.add(Alert.from_dict(command[1]))
+
+        elif command[0] == "unalert":
+            alerts.remove(command[1])
+
+        elif command[0] == "stop":
+            break
+
+    feed.stop()
+    market.stop()
+    hub.stop()
+    if cache:
+        cache.close()
+    for writer in writers.values():
+        writer.close()
+
+
+class RemoteBook:
+    def __init__(self, shared):
+        self.shared = shared
+
+    def read_top(self, n):
+        n_asks, n_bids, resyncs = self.shared.book_meta.tolist()
+        book = self.shared.book
+        return book[0, :min(n, n_asks)].tolist(), book[1, :min(n, n_bids)].tolist()
+
+    def top(self, n):
+        asks, bids = self.shared.read("book", lambda: self.read_top(n))
+        return [tuple(level) for level in asks], [tuple(level) for level in bids]
+
+    @property
+    def resyncs(self):
+        return int(self.shared.book_meta[2])
+
+
+class RemoteSymbolState:
+    # UI-side counterpart of a SymbolState whose data is produced by an
+    # ingest worker. Offers the same read interface to the widgets; polled
+    # once per frame on the Tk thread to tell views what changed.
+
+    def __init__(self, symbol, shared):
+        self.symbol = symbol.lower()
+        self.shared = shared
+        self.views = ()
+        self.book = RemoteBook(shared)
+        self.liquidity = None
+        self.candles = CandleBuffer(shared.capacity)
+        self.appended = 0
+        self.versions = dict.fromkeys(SECTIONS, 0)
+
+    def add_view(self, view):
+        self.views = self.views + (view,)
+
+    def remove_view(self, view):
+        self.views = tuple(v for v in self.views if v is not view)
+
+    def notify(self, kind):
+        for view in self.views:
+            view.on_state(self, kind)
+
+    def poll(self):
+        for kind in SECTIONS:
+            version = self.shared.version(kind)
+            if version % 2 or version == self.versions[kind]:
+                continue
+            self.versions[kind] = version
+            if kind == "candles":
+                self.shared.read("candles", self.sync_candles)
+            self.notify(kind)
+
+    @property
+    def ticker(self):
+        if not self.versions["ticker"]:
+            return None
+        return tuple(self.shared.read("ticker", self.shared.ticker.tolist))
+
+    def read_trades(self):
+        count, n = self.shared.trade_meta.tolist()
+        return count, self.shared.trades[:n].tolist(), self.shared.flow.tolist()
+
+    def recent_trades(self):
+        count, rows, flow = self.shared.read("trades", self.read_trades)
+        return count, [
+            (datetime.fromtimestamp(time), price, amount, bool(is_sell), "ASK" if is_sell else "BID")
+            for time, price, amount, is_sell in rows
+        ]
+
+    def trade_stats(self):
+        count, rows, flow = self.shared.read("trades", self.read_trades)
+        vwap, buy_volume, sell_volume, trade_count, rate = flow[:5]
+        largest = None if np.isnan(flow[5]) else (flow[5], flow[6], flow[7], bool(flow[8]))
+        return None if np.isnan(vwap) else vwap, buy_volume, sell_volume, int(trade_count), rate, largest
+
+    def sync_candles(self):
+        start, size, generation, appended = self.shared.candle_meta.tolist()
+        local = self.candles
+
+        if generation != local.generation:
+            local.data[:] = self.shared.candles
+        elif size:
+            count = min(size, appended - self.appended + 2)
+            slots = (start + np.arange(size - count, size)) % local.capacity
+            local.data[slots] = self.shared.candles[slots]
+            local.data[slots + local.capacity] = self.shared.candles[slots + local.capacity]
+
+        local.start = start
+        local.size = size
+        local.generation = generation
+        self.appended = appended
+
+
+class IngestMarketState:
+    # Drop-in replacement for MarketState that runs the stream connections,
+    # parsing and book/candle maintenance in worker processes. Symbols are
+    # sharded over the workers; the UI process only reads shared memory.
+
+    def __init__(self, scheduler, workers=1, stream_url=None, rest_url=None, capacity=10080, cache_path=CACHE_PATH,
+                 alerts=None):
+        self.scheduler = scheduler
+        self.capacity = capacity
+        self.symbols = {}
+        self.job = None
+
+        context = multiprocessing.get_context("spawn")
+        self.fired = context.Queue()
+        self.queues = []
+        self.workers = []
+        for _ in range(workers):
+            queue = context.Queue()
+            worker = context.Process(
+                target=run_worker,
+                args=(queue, self.fired, stream_url, rest_url, cache_path, capacity),
+                daemon=True
+            )
+            worker.start()
+            self.queues.append(queue)
+            self.workers.append(worker)
+
+        # Alerts are mirrored to the worker that owns their symbol
+        self.alerts = alerts
+        if alerts:
+            alerts.add_listener(self.on_alert_change)
+            for alert in alerts.all():
+                self.on_alert_change(alert, True)
+
+        self.poll()
+
+    def queue(self, symbol):
+        return self.queues[zlib.crc32(symbol.encode()) % len(self.queues)]
+
+    def __contains__(self, symbol):
+        return symbol.lower() in self.symbols
+
+    def get(self, symbol):
+        return self.symbols.get(symbol.lower())
+
+    def add(self, symbol):
+        state = self.get(symbol)
+        if state is None:
+            shared = SharedSymbol(self.capacity)
+            state = RemoteSymbolState(symbol, shared)
+            self.symbols[state.symbol] = state
+            self.queue(state.symbol).put(("add", state.symbol, shared.name))
+        return state
+
+    def remove(self, symbol):
+        state = self.symbols.pop(symbol.lower(), None)
+        if state:
+            self.queue(state.symbol).put(("remove", state.symbol))
+            self.scheduler.discard(state)
+            state.shared.close(unlink=True)
+
+    def on_alert_change(self, alert, added):
+        if added:
+            self.queue(alert.symbol).put(("alert", alert.to_dict()))
+        else:
+            self.queue(alert.symbol).put(("unalert", alert.id))
+
+    def poll(self):
+        for state in list(self.symbols.values()):
+            state.poll()
+        while self.alerts:
+            try:
+                alert_id, value = self.fired.get_nowait()
+            except queue_module.Empty:
+                break
+            self.alerts.fired_remote(alert_id, value)
+        self.job = self.scheduler.root.after(max(1, int(self.scheduler.interval * 1000)), self.poll)
+
+    def stop(self):
+        if self.job is not None:
+            self.scheduler.root.after_cancel(self.job)
+            self.job = None
+
+        for queue in self.queues:
+            queue.put(("stop",))
+        for worker in self.workers:
+            worker.join(timeout=2)
+            if worker.is_alive():
+                worker.terminate()
+
+        for state in self.symbols.values():
+            state.shared.close(unlink=True)
+        self.symbols.clear()
@@ -0,0 +1,109 @@
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+from utils import binance_rest
+from utils.candle_buffer import CANDLE_DTYPE
+
+CACHE_PATH = os.path.join(os.path.dirname(__file__), "klines.sqlite3")
+
+INTERVAL_MS = {
+    "1m": 60_000,
+    "5m": 300_000,
+    "15m": 900_000,
+    "1h": 3_600_000,
+    "4h": 14_400_000,
+    "1d": 86_400_000,
+}
+
+
+def parse_klines(klines):
+    return np.array(
+        [(k[0], k[1], k[2], k[3], k[4], k[5]) for k in klines],
+        dtype=CANDLE_DTYPE
+    )
+
+
+class KlineCache:
+    PAGE_LIMIT = 1000
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, timeout=10, check_same_thread=False)
+
+        with self.lock:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS klines ("
+                "symbol TEXT, interval TEXT, time INTEGER, "
+                "open REAL, high REAL, low REAL, close REAL, volume REAL, "
+                "PRIMARY KEY (symbol, interval, time)) WITHOUT ROWID"
+            )
+            self.db.commit()
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+    def load(self, symbol, interval, limit):
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT time, open, high, low, close, volume FROM klines "
+                "WHERE symbol = ? AND interval = ? ORDER BY time DESC LIMIT ?",
+                (symbol.lower(), interval, limit)
+            ).fetchall()
+        return np.array(rows[::-1], dtype=CANDLE_DTYPE)
+
+    def load_since(self, symbol, interval, start_time):
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT time, open, high, low, close, volume FROM klines "
+                "WHERE symbol = ? AND interval = ? AND time >= ? ORDER BY time",
+                (symbol.lower(), interval, start_time)
+            ).fetchall()
+        return np.array(rows, dtype=CANDLE_DTYPE)
+
+    def store(self, symbol, interval, candles):
+        if not len(candles):
+            return
+        symbol = symbol.lower()
+        with self.lock:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO klines VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                ((symbol, interval, *row) for row in candles.tolist())
+            )
+            self.db.commit()
+
+    def last_time(self, symbol, interval):
+        with self.lock:
+            row = self.db.execute(
+                "SELECT MAX(time) FROM klines WHERE symbol = ? AND interval = ?",
+                (symbol.lower(), interval)
+            ).fetchone()
+        return row[0]
+
+    def backfill(self, symbol, interval, limit):
+        # Fetch only what is missing since the last stored candle (which is
+        # fetched again, as it may have been stored while still open), at
+        # most `limit` candles back, one page of PAGE_LIMIT at a time.
+        step = INTERVAL_MS[interval]
+        now = int(time.time() * 1000)
+        oldest = now - now % step - (limit - 1) * step
+
+        last = self.last_time(symbol, interval)
+        start = max(last, oldest) if last is not None else oldest
+        fetched = 0
+
+        while start <= now:
+            candles = parse_klines(binance_rest.get_klines(symbol, interval, self.PAGE_LIMIT, start_time=start))
+            self.store(symbol, interval, candles)
+            fetched += len(candles)
+
+            if len(candles) < self.PAGE_LIMIT:
+                break
+            start = int(candles["time"][-1]) + step
+
+        return fetched
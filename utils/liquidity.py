@@ -0,0 +1,139 @@
+import threading
+import numpy as np
+
+
+class LiquidityHistory:
+    # Resting book quantity per price bin over time, for the liquidity
+    # heatmap. One column per INTERVAL ms holds the book as it was when the
+    # interval began (later updates in the interval are skipped, so binning
+    # runs twice a second whatever the depth cadence). Columns live in a
+    # preallocated ring stored twice (like CandleBuffer), so the newest
+    # COLUMNS are always one contiguous slice. Each row has a sink bin at
+    # both ends that catches levels outside the price range, so binning needs
+    # no masks. The range is sized to the first book's LEVELS levels, centred
+    # on the mid and shifted (rarely) when the mid drifts into its outer
+    # quarters.
+
+    COLUMNS = 600
+    INTERVAL = 500
+    BINS = 160
+    MIN_BIN_WIDTH = 0.00001  # of the mid price, for books with few levels
+    LEVELS = 400
+
+    def __init__(self, columns=COLUMNS, interval=INTERVAL, bins=BINS):
+        self.columns = columns
+        self.interval = interval
+        self.bins = bins
+        self.lock = threading.Lock()
+
+        self.data = np.zeros((columns * 2, bins + 2), dtype=np.float32)
+        self.mids = np.full(columns * 2, np.nan)
+        self.start = 0
+        self.size = 0
+        self.column = None
+        self.origin = None
+        self.step = None
+
+        # Scratch space for binning one book, reused on every update
+        self.levels = np.empty((self.LEVELS * 2, 2))
+        self.scaled = np.empty(self.LEVELS * 2)
+        self.index = np.empty(self.LEVELS * 2, dtype=np.intp)
+
+    def clear(self):
+        with self.lock:
+            self.data[:] = 0
+            self.mids[:] = np.nan
+            self.start = 0
+            self.size = 0
+            self.column = None
+            self.origin = None
+
+    def update(self, book, time_ms):
+        column = int(time_ms) // self.interval
+        if self.column is not None and column <= self.column:
+            return
+
+        asks, bids = book.top(self.LEVELS)
+        if not asks or not bids:
+            return
+        mid = (asks[0][0] + bids[0][0]) / 2
+
+        with self.lock:
+            if self.origin is None:
+                self.step = max((asks[-1][0] - bids[-1][0]) / self.bins, mid * self.MIN_BIN_WIDTH)
+                self.origin = mid - self.bins / 2 * self.step
+            else:
+                position = (mid - self.origin) / self.step
+                if not self.bins / 4 <= position <= self.bins * 3 / 4:
+                    self.shift(int(round(position - self.bins / 2)))
+
+            slot = self.advance(column)
+
+            n_asks = len(asks)
+            n = n_asks + len(bids)
+            levels = self.levels[:n]
+            levels[:n_asks] = asks
+            levels[n_asks:] = bids
+
+            # Bin index + 1, clipped into the sink bins at either end
+            scaled = self.scaled[:n]
+            np.subtract(levels[:, 0], self.origin, out=scaled)
+            np.floor_divide(scaled, self.step, out=scaled)
+            np.clip(scaled, -1, self.bins, out=scaled)
+            index = self.index[:n]
+            np.add(scaled, 1, out=index, casting="unsafe")
+
+            row = self.data[slot]
+            row[:] = 0
+            np.add.at(row, index, levels[:, 1])
+            self.data[slot + self.columns] = row
+            self.mids[slot] = self.mids[slot + self.columns] = mid
+
+    def advance(self, column):
+        # Slot of `column`, opening new columns as time moves on. Columns
+        # skipped without a book update repeat the last book.
+        if self.column is None:
+            self.column = column
+            self.size = 1
+            return self.start
+
+        # The new column itself is overwritten by the caller
+        last = (self.start + self.size - 1) % self.columns
+        for _ in range(min(column - self.column, self.columns)):
+            if self.size < self.columns:
+                self.size += 1
+            else:
+                self.start = (self.start + 1) % self.columns
+            slot = (self.start + self.size - 1) % self.columns
+            self.data[slot] = self.data[last]
+            self.data[slot + self.columns] = self.data[last]
+            self.mids[slot] = self.mids[slot + self.columns] = self.mids[last]
+            last = slot
+
+        self.column = column
+        return last
+
+    def shift(self, bins):
+        # Move the price range by `bins` bins, keeping what stays in range
+        inner = self.data[:, 1:-1]
+        if abs(bins) >= self.bins:
+            inner[:] = 0
+        elif bins > 0:
+            inner[:, :-bins] = inner[:, bins:]
+            inner[:, -bins:] = 0
+        elif bins < 0:
+            inner[:, -bins:] = inner[:, :bins]
+            inner[:, :-bins] = 0
+        self.origin += bins * self.step
+
+    def read(self, image, mids):
+        # Copies the newest columns into caller-owned buffers: image is
+        # bins x columns (log scale, oldest column first), mids has one
+        # entry per column. Returns the price range, or None while empty.
+        with self.lock:
+            if self.origin is None:
+                return None
+            first = (self.start + self.size - self.columns) % self.columns
+            np.log1p(self.data[first:first + self.columns, 1:-1].T, out=image)
+            mids[:] = self.mids[first:first + self.columns]
+            return self.origin, self.origin + self.bins * self.step
@@ -0,0 +1,191 @@
+import bisect
+import threading
+import time
+from utils import background, binance_rest
+from utils.decoder import parse_levels
+
+
+class BookSide:
+    def __init__(self, descending):
+        self.descending = descending
+        self.levels = {}
+        self.keys = []
+
+    def __len__(self):
+        return len(self.keys)
+
+    def key(self, price):
+        return -price if self.descending else price
+
+    def clear(self):
+        self.levels.clear()
+        self.keys.clear()
+
+    def set(self, price, qty):
+        if qty == 0:
+            if self.levels.pop(price, None) is not None:
+                index = bisect.bisect_left(self.keys, self.key(price))
+                del self.keys[index]
+            return
+
+        if price not in self.levels:
+            bisect.insort(self.keys, self.key(price))
+        self.levels[price] = qty
+
+    def update(self, levels):
+        for price, qty in levels:
+            self.set(price, qty)
+
+    def trim(self, depth):
+        for key in self.keys[depth:]:
+            del self.levels[-key if self.descending else key]
+        del self.keys[depth:]
+
+    def top(self, n):
+        sign = -1 if self.descending else 1
+        return [(sign * key, self.levels[sign * key]) for key in self.keys[:n]]
+
+
+class LocalOrderBook:
+    # Follows Binance's "how to manage a local order book" procedure: diff
+    # events are buffered until the REST snapshot arrives, then applied in
+    # sequence; any gap in update ids triggers a fresh snapshot. A failed
+    # snapshot is retried after a delay that doubles up to RETRY_MAX.
+
+    SNAPSHOT_LIMIT = 1000
+    RETRY_DELAY = 1.0
+    RETRY_MAX = 30.0
+    MAX_LEVELS = 5000
+
+    def __init__(self, symbol, on_change=None):
+        self.symbol = symbol.lower()
+        self.on_change = on_change
+        self.lock = threading.Lock()
+
+        self.bids = BookSide(descending=True)
+        self.asks = BookSide(descending=False)
+        self.last_update_id = None
+        self.buffer = []
+        self.is_synced = False
+        self.is_fetching = False
+        self.is_active = True
+        self.resyncs = 0
+        self.failures = 0
+        self.retry_at = 0.0
+
+    def close(self):
+        self.is_active = False
+
+    def on_diff(self, first_id, last_id, bids, asks):
+        diff = (first_id, last_id, bids, asks)
+
+        with self.lock:
+            if not self.is_synced:
+                self.buffer.append(diff)
+                self.request_snapshot()
+                return
+
+            if last_id <= self.last_update_id:
+                return
+
+            # An event may span the last applied id; only a later start is a gap
+            if first_id > self.last_update_id + 1:
+                print(f"{self.symbol} order book gap ({self.last_update_id} -> {first_id}), resyncing")
+                self.resync()
+                self.buffer.append(diff)
+                return
+
+            self.apply(diff)
+
+        self.notify()
+
+    def apply(self, diff):
+        first_id, last_id, bids, asks = diff
+        self.bids.update(bids)
+        self.asks.update(asks)
+        self.last_update_id = last_id
+
+        if len(self.bids) > self.MAX_LEVELS:
+            self.bids.trim(self.MAX_LEVELS)
+        if len(self.asks) > self.MAX_LEVELS:
+            self.asks.trim(self.MAX_LEVELS)
+
+    def invalidate(self):
+        # The diff stream was interrupted: buffer again from the next diff
+        # and take a fresh snapshot then, as on first connect
+        with self.lock:
+            self.is_synced = False
+            self.buffer = []
+
+    def resync(self):
+        self.resyncs += 1
+        self.is_synced = False
+        self.buffer = []
+        self.request_snapshot()
+
+    def request_snapshot(self):
+        if self.is_fetching or time.monotonic() < self.retry_at:
+            return
+        self.is_fetching = True
+        background.submit(self.fetch_snapshot)
+
+    def fetch_snapshot(self):
+        try:
+            snapshot = binance_rest.get_depth(self.symbol, self.SNAPSHOT_LIMIT)
+        except Exception as e:
+            print(f"{self.symbol} depth snapshot error: {e}")
+            snapshot = None
+
+        with self.lock:
+            self.is_fetching = False
+            if snapshot is None:
+                self.failures += 1
+                self.retry_at = time.monotonic() + min(self.RETRY_DELAY * 2 ** (self.failures - 1), self.RETRY_MAX)
+                return
+            self.failures = 0
+            if not self.is_active:
+                return
+            synced = self.load_snapshot(snapshot)
+
+        if synced:
+            self.notify()
+
+    def load_snapshot(self, snapshot):
+        last_update_id = snapshot["lastUpdateId"]
+        pending = [d for d in self.buffer if d[1] > last_update_id]
+
+        # Snapshot is older than the buffered stream: try again
+        if pending and pending[0][0] > last_update_id + 1:
+            self.request_snapshot()
+            return False
+
+        self.bids.clear()
+        self.asks.clear()
+        self.bids.update(parse_levels(snapshot["bids"]))
+        self.asks.update(parse_levels(snapshot["asks"]))
+        self.last_update_id = last_update_id
+
+        for data in pending:
+            if data is not pending[0] and data[0] > self.last_update_id + 1:
+                self.resync()
+                return False
+            self.apply(data)
+
+        self.buffer = []
+        self.is_synced = True
+        return True
+
+    def top(self, n):
+        with self.lock:
+            return self.asks.top(n), self.bids.top(n)
+
+    def snapshot(self, n):
+        # Consistent copy with its update id (for serving other clients), None until synced
+        with self.lock:
+            if not self.is_synced:
+                return None
+            return self.last_update_id, self.bids.top(n), self.asks.top(n)
+
+    def notify(self):
+        if self.on_change and self.is_active:
+            self.on_change(self)
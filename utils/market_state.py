@@ -0,0 +1,269 @@
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime
+import numpy as np
+from utils import background, binance_rest, decoder
+from utils.metrics import metrics
+from utils.candle_buffer import CandleBuffer
+from utils.kline_cache import parse_klines
+from utils.liquidity import LiquidityHistory
+from utils.local_book import LocalOrderBook
+from utils.trade_aggregator import TradeAggregator
+
+
+class SymbolState:
+    # Live market data for one symbol, fed from the stream hub. Widgets bind
+    # to a state as views and are told what kind of data changed.
+
+    TRADE_HISTORY = 8
+    BACKFILL_SPREAD = 0.5
+
+    def __init__(self, symbol, hub, scheduler, capacity=10080, cache=None, liquidity=True):
+        self.symbol = symbol.lower()
+        self.names = {kind: f"{self.symbol}@{kind}" for kind in ("ticker", "trade", "depth@100ms", "kline_1m")}
+        self.hub = hub
+        self.scheduler = scheduler
+        self.cache = cache
+        self.is_active = False
+        self.views = ()
+        self.lock = threading.Lock()
+
+        self.ticker = None
+        self.trades = deque(maxlen=self.TRADE_HISTORY)
+        self.trade_count = 0
+        self.flow = TradeAggregator()
+        self.candles = CandleBuffer(capacity)
+        self.book = LocalOrderBook(self.symbol, on_change=self.on_book_change)
+        self.book_time = None
+        self.liquidity = LiquidityHistory() if liquidity else None
+
+    def streams(self):
+        return {
+            self.names["ticker"]: self.on_ticker,
+            self.names["trade"]: self.on_trade,
+            self.names["depth@100ms"]: self.on_depth,
+            self.names["kline_1m"]: self.on_kline,
+        }
+
+    def start(self):
+        if self.is_active:
+            return
+
+        self.is_active = True
+        for stream, callback in self.streams().items():
+            self.hub.subscribe(stream, callback)
+        self.hub.add_reconnect_listener(self.on_reconnect)
+        self.load_history()
+
+    def stop(self):
+        # Views are dropped too, so callbacks still in flight on the
+        # network threads reach nobody once the state is removed
+        self.is_active = False
+        self.views = ()
+        for stream, callback in self.streams().items():
+            self.hub.unsubscribe(stream, callback)
+        self.hub.remove_reconnect_listener(self.on_reconnect)
+        self.book.close()
+        self.scheduler.discard(self)
+
+    def add_view(self, view):
+        self.views = self.views + (view,)
+
+    def remove_view(self, view):
+        self.views = tuple(v for v in self.views if v is not view)
+
+    def notify(self, kind):
+        for view in self.views:
+            view.on_state(self, kind)
+
+    def on_ticker(self, payload):
+        if not self.is_active:
+            return
+
+        price, change, percent, volume, event_time = decoder.TICKER.extract(payload)
+        metrics.lag(self.names["ticker"], event_time)
+
+        self.ticker = (price, change, percent, volume)
+        self.notify("ticker")
+
+        # The ticker arrives every second, so the trade flow is refreshed
+        # (and drained) even while no trades come in
+        with self.lock:
+            had_flow = bool(self.flow.trades)
+            self.flow.expire(event_time)
+        if had_flow:
+            self.notify("trades")
+
+    def on_trade(self, payload):
+        if not self.is_active:
+            return
+
+        price, amount, is_sell, trade_time = decoder.TRADE.extract(payload)
+        metrics.lag(self.names["trade"], trade_time)
+        side = "ASK" if is_sell else "BID"
+
+        with self.lock:
+            self.trades.append((datetime.now(), price, amount, is_sell, side))
+            self.trade_count += 1
+            self.flow.add(trade_time, price, amount, is_sell)
+        self.notify("trades")
+
+    def recent_trades(self):
+        with self.lock:
+            return self.trade_count, list(self.trades)
+
+    def trade_stats(self):
+        with self.lock:
+            return self.flow.stats()
+
+    def on_depth(self, payload):
+        if not self.is_active:
+            return
+
+        first_id, last_id, bids, asks, event_time = decoder.depth_update(payload)
+        if event_time is not None:
+            metrics.lag(self.names["depth@100ms"], event_time)
+            self.book_time = event_time
+        self.book.on_diff(first_id, last_id, bids, asks)
+
+    def on_book_change(self, book):
+        if self.liquidity is not None:
+            self.liquidity.update(book, self.book_time or time.time() * 1000)
+        self.notify("book")
+
+    def on_kline(self, payload):
+        if not self.is_active:
+            return
+
+        t, o, h, l, c, v, closed = decoder.KLINE.extract(payload)
+
+        # Candles are only touched on the Tk thread. Keyed by open time so a
+        # candle's closing update is never superseded by the next candle.
+        self.scheduler.post((self, "kline", t), self.update_candle, t, o, h, l, c, v)
+
+    def update_candle(self, t, o, h, l, c, v):
+        if not len(self.candles):
+            return
+
+        is_new = self.candles.upsert(t, o, h, l, c, v)
+        if is_new and self.cache:
+            self.cache.store(self.symbol, "1m", self.candles.view(2)[:1])
+        self.notify("candles")
+
+    def load_history(self):
+        capacity = self.candles.capacity
+
+        def task():
+            # Serve whatever is cached right away, then fetch only the gap
+            if self.cache:
+                cached = self.cache.load(self.symbol, "1m", capacity)
+                if len(cached):
+                    self.scheduler.post((self, "history"), self.set_history, cached)
+
+            try:
+                if self.cache:
+                    self.cache.backfill(self.symbol, "1m", capacity)
+                    history = self.cache.load(self.symbol, "1m", capacity)
+                else:
+                    history = parse_klines(binance_rest.get_klines(self.symbol, "1m", min(capacity, 1000)))
+
+                self.scheduler.post((self, "history"), self.set_history, history)
+
+            except Exception as e:
+                print("REST error:", e)
+
+        background.submit(task)
+
+    def on_reconnect(self):
+        if not self.is_active:
+            return
+
+        self.book.invalidate()
+
+        last_time = self.candles.last_time
+        if last_time is None:
+            self.load_history()
+        else:
+            background.submit(self.backfill, last_time)
+
+    def backfill(self, last_time):
+        # Spread the REST load of many displays reconnecting at once
+        time.sleep(random.uniform(0, self.BACKFILL_SPREAD))
+
+        try:
+            if self.cache:
+                self.cache.backfill(self.symbol, "1m", self.candles.capacity)
+                missed = self.cache.load_since(self.symbol, "1m", last_time)
+            else:
+                missed = parse_klines(binance_rest.get_klines(self.symbol, "1m", 1000, start_time=last_time))
+        except Exception as e:
+            print("REST error:", e)
+            return
+
+        if len(missed):
+            self.scheduler.post((self, "backfill"), self.merge_candles, missed)
+
+    def merge_candles(self, candles):
+        if not self.is_active or not len(self.candles):
+            return
+
+        # The resubscribed kline stream may already have added candles past
+        # the gap, so the missed ones are merged in time order and the
+        # buffer reloaded (which also makes the caches and higher intervals
+        # start over from it). The REST rows win, except for a live candle
+        # newer than all of them.
+        current = self.candles.view()
+        live = current[-1:]
+        if live["time"][0] >= candles["time"][-1]:
+            candles = candles[candles["time"] != live["time"][0]]
+        current = current[~np.isin(current["time"], candles["time"])]
+        merged = np.concatenate([current, candles])
+        merged = merged[np.argsort(merged["time"], kind="stable")]
+
+        self.candles.load(merged)
+        if self.cache:
+            self.cache.store(self.symbol, "1m", candles)
+        self.notify("candles")
+
+    def set_history(self, history):
+        if not self.is_active:
+            return
+
+        self.candles.load(history)
+        self.notify("candles")
+
+
+class MarketState:
+    def __init__(self, hub, scheduler, capacity=10080, cache=None, liquidity=True):
+        self.hub = hub
+        self.scheduler = scheduler
+        self.capacity = capacity
+        self.cache = cache
+        self.liquidity = liquidity
+        self.symbols = {}
+
+    def __contains__(self, symbol):
+        return symbol.lower() in self.symbols
+
+    def get(self, symbol):
+        return self.symbols.get(symbol.lower())
+
+    def add(self, symbol):
+        state = self.get(symbol)
+        if state is None:
+            state = SymbolState(symbol, self.hub, self.scheduler, self.capacity, self.cache, self.liquidity)
+            self.symbols[state.symbol] = state
+            state.start()
+        return state
+
+    def remove(self, symbol):
+        state = self.symbols.pop(symbol.lower(), None)
+        if state:
+            state.stop()
+
+    def stop(self):
+        for state in self.symbols.values():
+            state.stop()
+        self.symbols.clear()
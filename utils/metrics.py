@@ -0,0 +1,181 @@
+import os
+import time
+from contextlib import contextmanager
+from utils.ws_server import WebSocketServer
+
+
+def format_value(value):
+    # Integers in full, so large counters keep counting in the exposition
+    if isinstance(value, (bool, int)):
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metrics:
+    # Counters and timings recorded on the hot paths. Each series is only
+    # written from one thread (the hub thread for streams, the Tk thread for
+    # render timings), so recording takes no lock. sample() runs once a
+    # second on the Tk thread and is what the overlay and exporters read.
+
+    LAG_SMOOTHING = 0.1
+
+    def __init__(self):
+        self.messages = {}
+        self.lags = {}
+        self.durations = {}
+        self.gauges = {}
+        self.counters = {}
+
+        self.sampled_at = time.perf_counter()
+        self.sampled_messages = {}
+        self.latest = {"rates": {}, "messages": {}, "lags": {}, "durations": {}, "gauges": {}, "counters": {}}
+
+    def count(self, stream):
+        self.messages[stream] = self.messages.get(stream, 0) + 1
+
+    def lag(self, stream, event_ms):
+        # Receive time minus exchange event time; includes any clock offset
+        value = time.time() * 1000 - event_ms
+        entry = self.lags.get(stream)
+        if entry is None:
+            self.lags[stream] = [value, value, value]
+        else:
+            entry[0] = value
+            entry[1] += (value - entry[1]) * self.LAG_SMOOTHING
+            if value > entry[2]:
+                entry[2] = value
+
+    def duration(self, name, seconds):
+        entry = self.durations.get(name)
+        if entry is None:
+            self.durations[name] = [1, seconds, seconds, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = seconds
+            if seconds > entry[3]:
+                entry[3] = seconds
+
+    @contextmanager
+    def timed(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.duration(name, time.perf_counter() - started)
+
+    def gauge(self, name, fn):
+        self.gauges[name] = fn
+
+    def counter(self, name, fn):
+        # Like gauge, for values that only ever increase
+        self.counters[name] = fn
+
+    def sample(self):
+        now = time.perf_counter()
+        elapsed = now - self.sampled_at or 1
+        messages = dict(self.messages)
+
+        rates = {
+            stream: (total - self.sampled_messages.get(stream, 0)) / elapsed
+            for stream, total in messages.items()
+        }
+
+        # Max lag and max duration are per sample interval
+        lags = {}
+        for stream, entry in list(self.lags.items()):
+            lags[stream] = tuple(entry)
+            entry[2] = entry[0]
+        durations = {}
+        for name, entry in list(self.durations.items()):
+            durations[name] = tuple(entry)
+            entry[3] = entry[2]
+
+        gauges = {}
+        counters = {}
+        for values, fns in ((gauges, self.gauges), (counters, self.counters)):
+            for name, fn in list(fns.items()):
+                try:
+                    values[name] = fn()
+                except Exception as e:
+                    print(f"metrics {name} error: {e}")
+
+        self.sampled_at = now
+        self.sampled_messages = messages
+        self.latest = {"rates": rates, "messages": messages, "lags": lags, "durations": durations, "gauges": gauges,
+                       "counters": counters}
+        return self.latest
+
+    def prometheus(self):
+        latest = self.latest
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f"# HELP dashboard_{name} {help_text}")
+            lines.append(f"# TYPE dashboard_{name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{val}"' for key, val in labels.items())
+                value = format_value(value)
+                lines.append(f"dashboard_{name}{{{label_text}}} {value}" if label_text else f"dashboard_{name} {value}")
+
+        family("stream_messages_total", "counter", "Messages received per stream.",
+               [({"stream": s}, v) for s, v in sorted(latest["messages"].items())])
+        family("stream_messages_per_second", "gauge", "Message rate per stream over the last sample.",
+               [({"stream": s}, v) for s, v in sorted(latest["rates"].items())])
+        family("stream_lag_ms", "gauge", "Receive time minus exchange event time (smoothed).",
+               [({"stream": s}, v[1]) for s, v in sorted(latest["lags"].items())])
+        family("stream_lag_max_ms", "gauge", "Largest lag since the last sample.",
+               [({"stream": s}, v[2]) for s, v in sorted(latest["lags"].items())])
+        family("duration_seconds_count", "counter", "Timed hot-path calls.",
+               [({"name": n}, v[0]) for n, v in sorted(latest["durations"].items())])
+        family("duration_seconds_sum", "counter", "Total time spent in timed hot paths.",
+               [({"name": n}, v[1]) for n, v in sorted(latest["durations"].items())])
+        family("duration_max_seconds", "gauge", "Slowest call since the last sample.",
+               [({"name": n}, v[3]) for n, v in sorted(latest["durations"].items())])
+        for name, value in sorted(latest["gauges"].items()):
+            family(name, "gauge", name.replace("_", " ").capitalize() + ".", [({}, value)])
+        for name, value in sorted(latest["counters"].items()):
+            family(name, "counter", name.replace("_", " ").capitalize() + ".", [({}, value)])
+
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        # Written to a temporary file and renamed so scrapers never see half a file
+        temp = f"{path}.tmp"
+        with open(temp, "w") as file:
+            file.write(self.prometheus())
+        os.replace(temp, path)
+
+    def summary(self):
+        latest = self.latest
+        lines = [f"{'stream':<24}{'msg/s':>8}{'lag ms':>9}{'max':>8}"]
+        for stream in sorted(latest["rates"]):
+            rate = latest["rates"][stream]
+            lag = latest["lags"].get(stream)
+            lag_text = f"{lag[1]:>9.0f}{lag[2]:>8.0f}" if lag else f"{'-':>9}{'-':>8}"
+            lines.append(f"{stream:<24}{rate:>8.1f}{lag_text}")
+
+        lines.append("")
+        lines.append(f"{'timing':<24}{'calls':>8}{'avg ms':>9}{'max':>8}")
+        for name, (count, total, last, peak) in sorted(latest["durations"].items()):
+            lines.append(f"{name:<24}{count:>8}{total / count * 1000:>9.2f}{peak * 1000:>8.2f}")
+
+        lines.append("")
+        for name, value in sorted({**latest["gauges"], **latest["counters"]}.items()):
+            lines.append(f"{name:<32}{value:>9,.0f}")
+        return "\n".join(lines)
+
+
+metrics = Metrics()
+
+
+def serve(port, host="127.0.0.1"):
+    # Local HTTP endpoint for scrapers: GET /metrics
+    def on_http(path):
+        if path.split("?")[0] != "/metrics":
+            return 404, "not found\n", "text/plain"
+        return 200, metrics.prometheus(), "text/plain; version=0.0.4"
+
+    server = WebSocketServer(host, port, on_http=on_http)
+    server.start()
+    return server
@@ -0,0 +1,50 @@
+import gzip
+import threading
+import time
+
+
+def rest_source(path, params):
+    # Replay looks responses up by endpoint and symbol, so a session
+    # recorded with one kline limit/start time still replays with another
+    return f"rest:{path}:{params.get('symbol', '')}"
+
+
+class Recorder:
+    # Appends raw frames and REST responses to a gzip file, one line each:
+    # "<receive time>\t<source>\t<raw text>". Appending again later adds a
+    # new gzip member, which gzip readers handle transparently.
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = gzip.open(path, "at", encoding="utf-8")
+        self.count = 0
+
+    def record(self, source, data):
+        line = f"{time.time():.6f}\t{source}\t{data}\n"
+        with self.lock:
+            if self.file:
+                self.file.write(line)
+                self.count += 1
+
+    def record_frame(self, message):
+        if isinstance(message, bytes):
+            message = message.decode()
+        self.record("ws", message)
+
+    def record_rest(self, path, params, body):
+        self.record(rest_source(path, params), body)
+
+    def close(self):
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+        print(f"recorded {self.count} messages to {self.path}")
+
+
+def read_records(path):
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        for line in file:
+            ts, source, data = line.rstrip("\n").split("\t", 2)
+            yield float(ts), source, data
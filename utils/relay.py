@@ -0,0 +1,292 @@
+import argparse
+import json
+import queue
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+from utils import binance_rest, decoder
+from utils.ingest import DirectScheduler
+from utils.market_state import MarketState
+from utils.metrics import metrics
+from utils.stream_hub import StreamHub
+from utils.ws_server import WebSocketServer
+
+# Streams whose latest frame is a complete state, replayed to new subscribers
+SNAPSHOT_KINDS = ("ticker", "kline_1m", "depth20", "depth20@100ms")
+
+
+def ignore(payload):
+    pass
+
+
+def format_levels(levels):
+    return [[f"{price:.8f}", f"{amount:.8f}"] for price, amount in levels]
+
+
+class RelayHub(StreamHub):
+    # Upstream connection of the relay: each frame updates the relay's own
+    # state first and is then handed on untouched
+    def __init__(self, url, on_frame):
+        super().__init__(url)
+        self.on_frame = on_frame
+
+    def on_message(self, ws, message):
+        super().on_message(ws, message)
+        self.on_frame(message)
+
+
+class Relay:
+    # Local fan-out server speaking the Binance combined-stream protocol.
+    # It holds one upstream subscription per stream however many dashboards
+    # want it, keeps the book and candles of every symbol in use, and
+    # answers the REST calls dashboards make when (re)syncing from that
+    # state: depth snapshots come from the relay's book at its current
+    # update id, so the diffs forwarded afterwards continue the sequence.
+
+    MAX_BACKLOG = 5000
+
+    def __init__(self, host="127.0.0.1", port=9100, upstream_url=None, capacity=1440):
+        self.hub = RelayHub(upstream_url, self.on_frame)
+        self.scheduler = DirectScheduler()
+        self.market = MarketState(self.hub, self.scheduler, capacity, liquidity=False)
+        self.server = WebSocketServer(
+            host, port,
+            on_open=self.on_open,
+            on_message=self.on_message,
+            on_close=self.on_close,
+            on_http=self.on_http
+        )
+
+        self.lock = threading.Lock()
+        # Serializes upstream (un)subscribes and symbol states, so one client
+        # leaving never undoes what another joining just set up
+        self.upstream_lock = threading.Lock()
+        self.clients = {}
+        self.symbols = {}
+        self.last_frames = {}
+        self.forwarded = 0
+        self.dropped = 0
+
+        metrics.gauge("relay_clients", lambda: len(self.server.connections))
+        metrics.gauge("relay_streams", lambda: len(self.clients))
+        metrics.counter("relay_forwarded_frames_total", lambda: self.forwarded)
+        metrics.counter("relay_dropped_clients_total", lambda: self.dropped)
+
+    @property
+    def url(self):
+        return f"{self.server.url}/stream"
+
+    @property
+    def rest_url(self):
+        return f"http://{self.server.host}:{self.server.port}"
+
+    def start(self):
+        self.hub.start()
+        self.server.start()
+        return self
+
+    def stop(self):
+        self.server.stop()
+        self.market.stop()
+        self.hub.stop()
+
+    # Upstream
+
+    def on_frame(self, message):
+        stream = decoder.stream_name(message)
+        if stream is None:
+            return
+
+        if stream.partition("@")[2] in SNAPSHOT_KINDS:
+            self.last_frames[stream] = message
+
+        for conn in self.clients.get(stream, ()):
+            self.forward(conn, message)
+            self.forwarded += 1
+
+    def forward(self, conn, message):
+        try:
+            conn.context["queue"].put_nowait(message)
+        except queue.Full:
+            # A client that cannot keep up is dropped; it reconnects and resyncs
+            print(f"relay: dropping slow client {conn.path}")
+            self.dropped += 1
+            conn.close()
+
+    # Clients
+
+    def on_open(self, conn):
+        conn.context["streams"] = set()
+        conn.context["queue"] = queue.Queue(self.MAX_BACKLOG)
+        threading.Thread(target=self.write_loop, args=(conn,), daemon=True).start()
+
+        # Like Binance, /stream?streams=a/b subscribes right away
+        streams = parse_qs(urlsplit(conn.path).query).get("streams")
+        if streams:
+            self.subscribe(conn, streams[0].split("/"))
+
+    def write_loop(self, conn):
+        # One writer per client, so a slow socket never holds up the upstream thread
+        while True:
+            message = conn.context["queue"].get()
+            if message is None or not conn.send(message):
+                break
+
+    def on_message(self, conn, message):
+        try:
+            request = json.loads(message)
+        except ValueError:
+            return
+
+        # Symbol streams are lower case; all-market ones like !miniTicker@arr are not
+        params = [stream if stream.startswith("!") else stream.lower() for stream in request.get("params", [])]
+        if request.get("method") == "SUBSCRIBE":
+            self.subscribe(conn, params)
+        elif request.get("method") == "UNSUBSCRIBE":
+            self.unsubscribe(conn, params)
+
+        conn.send(json.dumps({"result": None, "id": request.get("id")}))
+
+    def on_close(self, conn):
+        self.unsubscribe(conn, list(conn.context.get("streams", ())))
+        try:
+            conn.context["queue"].put_nowait(None)
+        except (KeyError, queue.Full):
+            pass
+
+    def subscribe(self, conn, streams):
+        new = []
+        with self.upstream_lock:
+            with self.lock:
+                for stream in streams:
+                    if stream in conn.context["streams"]:
+                        continue
+                    conn.context["streams"].add(stream)
+                    subscribers = self.clients.get(stream, ())
+                    self.clients[stream] = subscribers + (conn,)
+                    if not subscribers:
+                        new.append(stream)
+
+            for stream in new:
+                self.hub.subscribe(stream, ignore)
+                self.retain(stream, 1)
+
+        for stream in streams:
+            frame = self.last_frames.get(stream)
+            if frame:
+                self.forward(conn, frame)
+
+    def unsubscribe(self, conn, streams):
+        gone = []
+        with self.upstream_lock:
+            with self.lock:
+                for stream in streams:
+                    if stream not in conn.context["streams"]:
+                        continue
+                    conn.context["streams"].discard(stream)
+                    subscribers = tuple(c for c in self.clients.get(stream, ()) if c is not conn)
+                    if subscribers:
+                        self.clients[stream] = subscribers
+                    else:
+                        self.clients.pop(stream, None)
+                        self.last_frames.pop(stream, None)
+                        gone.append(stream)
+
+            for stream in gone:
+                self.hub.unsubscribe(stream, ignore)
+                self.retain(stream, -1)
+
+    def retain(self, stream, delta):
+        # A symbol's state lives as long as any of its streams has
+        # subscribers. Caller holds upstream_lock.
+        symbol = stream.partition("@")[0]
+        if not symbol or symbol.startswith("!"):
+            return
+
+        count = self.symbols.get(symbol, 0) + delta
+        if count > 0:
+            self.symbols[symbol] = count
+        else:
+            self.symbols.pop(symbol, None)
+
+        if delta > 0 and count == 1:
+            self.market.add(symbol)
+        elif count <= 0:
+            self.market.remove(symbol)
+
+    # REST
+
+    def on_http(self, path):
+        url = urlsplit(path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        if url.path == "/metrics":
+            return 200, metrics.prometheus(), "text/plain; version=0.0.4"
+
+        state = self.market.get(params.get("symbol", ""))
+        try:
+            body = None
+            if url.path == "/api/v3/depth" and state:
+                body = self.depth(state, int(params.get("limit", 100)))
+            elif url.path == "/api/v3/klines" and state and params.get("interval") == "1m":
+                body = self.klines(state, int(params.get("limit", 500)), params.get("startTime"))
+
+            # Anything the relay cannot answer from its own state goes upstream
+            if body is None:
+                body = binance_rest.get(url.path, params)
+        except Exception as e:
+            print(f"relay REST error: {e}")
+            return 502, json.dumps({"msg": str(e)})
+
+        return 200, json.dumps(body)
+
+    def depth(self, state, limit):
+        # While the relay's own book is still syncing the request goes
+        # upstream at once: the exchange snapshot continues the same diffs
+        snapshot = state.book.snapshot(limit)
+        if snapshot is None:
+            return None
+        last_update_id, bids, asks = snapshot
+        return {"lastUpdateId": last_update_id, "bids": format_levels(bids), "asks": format_levels(asks)}
+
+    def klines(self, state, limit, start_time):
+        # Candles are written on the upstream thread under the scheduler lock
+        with self.scheduler.lock:
+            candles = state.candles.view()
+            if start_time is not None:
+                start_time = int(start_time)
+                if not len(candles) or candles["time"][0] > start_time:
+                    return None
+                rows = candles[candles["time"] >= start_time][:limit].tolist()
+            else:
+                if len(candles) < limit:
+                    return None
+                rows = candles[-limit:].tolist()
+
+        return [
+            [t, f"{o:.8f}", f"{h:.8f}", f"{l:.8f}", f"{c:.8f}", f"{v:.8f}", t + 59999]
+            for t, o, h, l, c, v in rows
+        ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local relay sharing one upstream connection between dashboards")
+    parser.add_argument("--host", default="127.0.0.1", help="use 0.0.0.0 to serve the LAN")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--upstream-url", help="upstream combined stream endpoint (default Binance)")
+    parser.add_argument("--upstream-rest-url", help="upstream REST base URL (default Binance)")
+    parser.add_argument("--capacity", type=int, default=1440, help="1m candles kept per symbol")
+    args = parser.parse_args()
+
+    if args.upstream_rest_url:
+        binance_rest.set_base_url(args.upstream_rest_url)
+
+    relay = Relay(args.host, args.port, args.upstream_url, args.capacity).start()
+    print(f"relay streaming on {relay.url}, REST on {relay.rest_url}")
+    print(f"dashboards: python main.py --relay {args.host}:{relay.server.port}")
+    try:
+        while True:
+            time.sleep(1)
+            metrics.sample()
+    except KeyboardInterrupt:
+        relay.stop()
@@ -0,0 +1,71 @@
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from utils.recorder import read_records, rest_source
+from utils.stream_hub import StreamHub
+
+
+class ReplayHub(StreamHub):
+    # Plays a recording back through the normal hub dispatch, with no
+    # network. speed is a multiple of real time; 0 replays as fast as
+    # possible. Recorded REST responses are served via binance_rest.
+
+    def __init__(self, path, speed=1.0):
+        super().__init__(url=path)
+        self.path = path
+        self.speed = speed
+        self.frames = 0
+        self.responses = defaultdict(deque)
+
+        for ts, source, data in read_records(path):
+            if source != "ws":
+                self.responses[source].append(data)
+
+    def start(self):
+        if self.is_running:
+            return
+        self.is_running = True
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def stop(self):
+        self.is_running = False
+
+    def run(self):
+        # Frames for streams nobody has subscribed to yet would be dropped
+        while self.is_running and not self.handlers:
+            time.sleep(0.05)
+
+        first = None
+        started = time.perf_counter()
+
+        for ts, source, data in read_records(self.path):
+            if not self.is_running:
+                return
+            if source != "ws":
+                continue
+
+            if first is None:
+                first = ts
+            if self.speed > 0:
+                delay = (ts - first) / self.speed - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+
+            try:
+                self.on_message(None, data)
+            except Exception as e:
+                print(f"replay frame error: {e}")
+            self.frames += 1
+
+        elapsed = time.perf_counter() - started
+        print(f"replay finished: {self.frames} frames in {elapsed:.2f}s")
+
+    def response(self, path, params):
+        queue = self.responses.get(rest_source(path, params))
+        if not queue:
+            raise LookupError(f"no recorded response for {path} {params}")
+
+        # Serve recorded responses in order, repeating the last one
+        body = queue.popleft() if len(queue) > 1 else queue[0]
+        return json.loads(body)
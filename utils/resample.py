@@ -0,0 +1,83 @@
+import numpy as np
+from utils.candle_buffer import CandleBuffer, CANDLE_DTYPE
+from utils.kline_cache import INTERVAL_MS
+
+BASE_MS = INTERVAL_MS["1m"]
+
+
+def bucket_starts(times, step):
+    keys = times // step
+    return np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+
+
+def aggregate(candles, starts, step):
+    ends = np.r_[starts[1:], len(candles)] - 1
+
+    out = np.empty(len(starts), dtype=CANDLE_DTYPE)
+    out["time"] = candles["time"][starts] // step * step
+    out["open"] = candles["open"][starts]
+    out["high"] = np.maximum.reduceat(candles["high"], starts)
+    out["low"] = np.minimum.reduceat(candles["low"], starts)
+    out["close"] = candles["close"][ends]
+    out["volume"] = np.add.reduceat(candles["volume"], starts)
+    return out
+
+
+def resample(candles, step):
+    if not len(candles):
+        return np.empty(0, dtype=CANDLE_DTYPE)
+    return aggregate(candles, bucket_starts(candles["time"], step), step)
+
+
+def decimate(candles, positions, step):
+    # Level of detail for drawing: candles merged into one OHLC bar per
+    # `step` ms (aligned on time, so bars stay put while panning). Returns
+    # the bars, their x (centre of the merged candles) and the index of each
+    # bar's last candle, for sampling values that line up with the closes.
+    if not len(candles):
+        return candles, positions, np.empty(0, dtype=np.intp)
+
+    starts = bucket_starts(candles["time"], step)
+    ends = np.r_[starts[1:], len(candles)] - 1
+    return aggregate(candles, starts, step), (positions[starts] + positions[ends]) / 2, ends
+
+
+class IntervalSeries:
+    # Candles of a higher interval derived from a 1m CandleBuffer. Built once
+    # with a vectorized resample, then only the buckets from the last one on
+    # are recomputed.
+
+    def __init__(self, base, interval):
+        self.base = base
+        self.interval = interval
+        self.step = INTERVAL_MS[interval]
+        self.generation = None
+        self.candles = base if self.step == BASE_MS else CandleBuffer(base.capacity)
+
+    def rebuild(self):
+        self.generation = self.base.generation
+        self.candles.load(resample(self.base.view(), self.step))
+
+    def update(self):
+        if self.candles is self.base:
+            return self.candles
+
+        if self.generation != self.base.generation:
+            self.rebuild()
+            return self.candles
+
+        last = self.base.last_time
+        if last is None:
+            return self.candles
+        since = self.candles.last_time
+        if since is None:
+            self.rebuild()
+            return self.candles
+
+        # Every bucket from the series' last one on: a backfill or a frame
+        # with several 1m candles can reach past the live bucket
+        tail = self.base.view((last - since) // BASE_MS + 1)
+        tail = tail[tail["time"] >= since]
+        for bucket in resample(tail, self.step).tolist():
+            self.candles.upsert(*bucket)
+        return self.candles
@@ -0,0 +1,322 @@
+import argparse
+import json
+import random
+import string
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+from utils.ws_server import WebSocketServer
+
+
+class Market:
+    def __init__(self, rng, now, depth=100, history=60):
+        self.random = rng
+        self.price = rng.uniform(1, 1000)
+        self.trade_id = 0
+        self.update_id = 1
+        self.depth = depth
+        self.history_limit = max(history, 1000)
+
+        # Past 1m candles for the klines endpoint (an hour by default)
+        start = now - now % 60000
+        self.history = []
+        self.day_open = price = self.price
+        for t in range(start - history * 60000, start, 60000):
+            o = price
+            price *= 1 + rng.gauss(0, 0.002)
+            self.history.append([t, o, max(o, price) * 1.001, min(o, price) * 0.999, price, rng.uniform(1, 500)])
+        self.price = price
+        self.candle = None
+        self.closed_candle = None
+
+        self.tick = self.price * 0.0001
+        self.bids = {round(self.price - self.tick * (i + 1), 8): rng.expovariate(1) for i in range(depth)}
+        self.asks = {round(self.price + self.tick * (i + 1), 8): rng.expovariate(1) for i in range(depth)}
+
+    def step(self, now):
+        self.price *= 1 + self.random.gauss(0, 0.0005)
+
+        start = now - now % 60000
+        if self.candle and self.candle[0] != start:
+            self.history.append(self.candle)
+            self.history = self.history[-self.history_limit:]
+            self.closed_candle = self.candle
+            self.candle = None
+            return
+        if self.candle is None:
+            self.candle = [start, self.price, self.price, self.price, self.price, 0.0]
+
+        candle = self.candle
+        candle[2] = max(candle[2], self.price)
+        candle[3] = min(candle[3], self.price)
+        candle[4] = self.price
+        candle[5] += self.random.uniform(0, 5)
+
+    def depth_diff(self):
+        first = self.update_id
+        bids = []
+        asks = []
+
+        for _ in range(self.random.randint(1, 6)):
+            side, changes, sign = (self.bids, bids, -1) if self.random.random() < 0.5 else (self.asks, asks, 1)
+            price = round(self.price + sign * self.tick * self.random.randint(1, self.depth), 8)
+            qty = 0.0 if price in side and self.random.random() < 0.3 else self.random.expovariate(1)
+            if qty:
+                side[price] = qty
+            else:
+                side.pop(price, None)
+            changes.append([f"{price:.8f}", f"{qty:.8f}"])
+            self.update_id += 1
+
+        # Remove levels the price has walked through so the book never crosses
+        for side, changes, crossed in ((self.bids, bids, lambda p: p >= self.price),
+                                       (self.asks, asks, lambda p: p <= self.price)):
+            for price in [p for p in side if crossed(p)]:
+                del side[price]
+                changes.append([f"{price:.8f}", "0.00000000"])
+            if changes:
+                self.update_id += 1
+
+        return first, self.update_id - 1, bids, asks
+
+    def levels(self, side, reverse, limit):
+        prices = sorted(side, reverse=reverse)[:limit]
+        return [[f"{p:.8f}", f"{side[p]:.8f}"] for p in prices]
+
+
+# Local stand-in for the Binance combined stream endpoint and the REST
+# klines/depth endpoints, serving synthetic market data on one port.
+class StandInServer:
+    MINI_TICKER_INTERVAL = 1000
+
+    def __init__(self, host="127.0.0.1", port=0, interval=0.1, seed=None, depth=100, history=60, pairs=400):
+        self.interval = interval
+        self.depth = depth
+        self.history = history
+        self.random = random.Random(seed)
+        self.markets = {}
+        self.pairs = pairs
+        self.universe = None
+        self.mini_ticker_time = 0
+        self.lock = threading.Lock()
+        self.is_running = False
+        self.server = WebSocketServer(
+            host, port,
+            on_open=self.on_open,
+            on_message=self.on_message,
+            on_http=self.on_http
+        )
+
+    @property
+    def url(self):
+        return f"{self.server.url}/stream"
+
+    @property
+    def rest_url(self):
+        return f"http://{self.server.host}:{self.server.port}"
+
+    def start(self):
+        self.server.start()
+        self.is_running = True
+        threading.Thread(target=self.run, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.is_running = False
+        self.server.stop()
+
+    def market(self, symbol):
+        symbol = symbol.lower()
+        if symbol not in self.markets:
+            self.markets[symbol] = Market(self.random, int(time.time() * 1000), self.depth, self.history)
+        return self.markets[symbol]
+
+    def on_open(self, conn):
+        conn.context["streams"] = set()
+
+    def on_message(self, conn, message):
+        request = json.loads(message)
+        streams = conn.context["streams"]
+
+        if request.get("method") == "SUBSCRIBE":
+            streams.update(request["params"])
+        elif request.get("method") == "UNSUBSCRIBE":
+            streams.difference_update(request["params"])
+
+        conn.send(json.dumps({"result": None, "id": request.get("id")}))
+
+    def on_http(self, path):
+        url = urlsplit(path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        with self.lock:
+            market = self.market(query.get("symbol", "btcusdt"))
+            limit = int(query.get("limit", 500))
+
+            if url.path == "/api/v3/depth":
+                body = {
+                    "lastUpdateId": market.update_id - 1,
+                    "bids": market.levels(market.bids, True, limit),
+                    "asks": market.levels(market.asks, False, limit),
+                }
+            elif url.path == "/api/v3/klines":
+                start = int(query.get("startTime", 0))
+                rows = [k for k in market.history if k[0] >= start]
+                if market.candle:
+                    rows.append(market.candle)
+                # Like Binance: the oldest rows from startTime, else the most recent
+                rows = rows[:limit] if "startTime" in query else rows[-limit:]
+                body = [
+                    [t, f"{o:.8f}", f"{h:.8f}", f"{l:.8f}", f"{c:.8f}", f"{v:.8f}", t + 59999]
+                    for t, o, h, l, c, v in rows
+                ]
+            else:
+                return 404, json.dumps({"msg": "not found"})
+
+        return 200, json.dumps(body)
+
+    def run(self):
+        while self.is_running:
+            now = int(time.time() * 1000)
+
+            with self.server.lock:
+                connections = list(self.server.connections)
+
+            streams = set()
+            for conn in connections:
+                streams.update(conn.context.get("streams", ()))
+
+            # One payload per stream per tick, shared by every subscriber
+            with self.lock:
+                for symbol in {stream.partition("@")[0] for stream in streams if not stream.startswith("!")}:
+                    self.market(symbol).step(now)
+                frames = {}
+                for stream in streams:
+                    data = self.make_payload(stream, now)
+                    if data is not None:
+                        frames[stream] = json.dumps({"stream": stream, "data": data}, separators=(",", ":"))
+                for market in self.markets.values():
+                    market.closed_candle = None
+
+            for conn in connections:
+                for stream in list(conn.context.get("streams", ())):
+                    if stream in frames:
+                        conn.send(frames[stream])
+
+            time.sleep(self.interval)
+
+    def make_payload(self, stream, now):
+        if stream == "!miniTicker@arr":
+            return self.mini_tickers(now)
+
+        symbol, _, kind = stream.partition("@")
+        market = self.market(symbol)
+        price = market.price
+
+        if kind == "ticker":
+            return {
+                "e": "24hrTicker", "E": now, "s": symbol.upper(),
+                "p": f"{price - market.day_open:.8f}",
+                "P": f"{(price - market.day_open) / market.day_open * 100:.3f}",
+                "c": f"{price:.8f}",
+                "v": f"{self.random.uniform(1e3, 1e5):.8f}",
+            }
+
+        if kind == "trade":
+            market.trade_id += 1
+            return {
+                "e": "trade", "E": now, "s": symbol.upper(), "t": market.trade_id,
+                "p": f"{price:.8f}", "q": f"{self.random.expovariate(1):.8f}",
+                "T": now, "m": self.random.random() < 0.5,
+            }
+
+        if kind.startswith("depth20"):
+            return {
+                "lastUpdateId": market.update_id - 1,
+                "bids": market.levels(market.bids, True, 20),
+                "asks": market.levels(market.asks, False, 20),
+            }
+
+        if kind.startswith("depth"):
+            first, last, bids, asks = market.depth_diff()
+            return {
+                "e": "depthUpdate", "E": now, "s": symbol.upper(),
+                "U": first, "u": last, "b": bids, "a": asks,
+            }
+
+        if kind == "kline_1m":
+            closed = market.closed_candle is not None
+            candle = market.closed_candle if closed else market.candle
+            if candle is None:
+                return None
+            t, o, h, l, c, v = candle
+            return {
+                "e": "kline", "E": now, "s": symbol.upper(),
+                "k": {
+                    "t": t, "T": t + 59999, "i": "1m",
+                    "o": f"{o:.8f}", "h": f"{h:.8f}", "l": f"{l:.8f}",
+                    "c": f"{c:.8f}", "v": f"{v:.8f}", "x": closed,
+                },
+            }
+
+        return None
+
+    def mini_tickers(self, now):
+        # All-market array, once a second like Binance, with only the pairs
+        # that changed. Symbols with a market report its price; the rest
+        # (mostly USDT pairs, a few BTC ones) are random walks.
+        if now - self.mini_ticker_time < self.MINI_TICKER_INTERVAL:
+            return None
+        self.mini_ticker_time = now
+
+        if self.universe is None:
+            self.universe = {}
+            while len(self.universe) < self.pairs:
+                base = "".join(self.random.choices(string.ascii_uppercase, k=self.random.randint(3, 5)))
+                quote = "BTC" if self.random.random() < 0.1 else "USDT"
+                price = 10 ** self.random.uniform(-4, 4)
+                self.universe[base + quote] = [price, price, price, price, 0.0]
+
+        items = []
+        for symbol, row in self.universe.items():
+            if self.random.random() < 0.5:
+                continue
+            row[3] *= 1 + self.random.gauss(0, 0.002)
+            row[1] = max(row[1], row[3])
+            row[2] = min(row[2], row[3])
+            row[4] += self.random.expovariate(1 / 1000)
+            items.append((symbol, row))
+        for symbol, market in self.markets.items():
+            price = market.price
+            items.append((symbol.upper(), [market.day_open, max(market.day_open, price), min(market.day_open, price),
+                                           price, self.random.uniform(1e3, 1e5)]))
+
+        return [
+            {
+                "e": "24hrMiniTicker", "E": now, "s": symbol,
+                "c": f"{c:.8f}", "o": f"{o:.8f}", "h": f"{h:.8f}", "l": f"{l:.8f}",
+                "v": f"{v:.8f}", "q": f"{v * c:.8f}",
+            }
+            for symbol, (o, h, l, c, v) in items
+        ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the Binance stream and REST endpoints")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9001)
+    parser.add_argument("--interval", type=float, default=0.1)
+    parser.add_argument("--depth", type=int, default=100, help="order book levels per side")
+    parser.add_argument("--history", type=int, default=60, help="minutes of kline history")
+    parser.add_argument("--pairs", type=int, default=400, help="pairs in the all-market mini-ticker stream")
+    args = parser.parse_args()
+
+    server = StandInServer(
+        args.host, args.port, args.interval, depth=args.depth, history=args.history, pairs=args.pairs
+    ).start()
+    print(f"stand-in streaming on {server.url}, REST on {server.rest_url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
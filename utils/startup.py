@@ -0,0 +1,45 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# Imported first by main.py, so times are measured from (almost) process start
+STARTED = time.perf_counter()
+
+marks = {}
+stages = []
+lock = threading.Lock()
+
+
+def elapsed():
+    return time.perf_counter() - STARTED
+
+
+def mark(name):
+    # Only the first occurrence counts (e.g. the first painted price)
+    if name in marks:
+        return
+    with lock:
+        marks.setdefault(name, elapsed())
+
+
+@contextmanager
+def stage(name):
+    # Times a block, typically a group of deferred imports
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        with lock:
+            stages.append((name, time.perf_counter() - started, threading.current_thread().name))
+
+
+def summary():
+    with lock:
+        lines = [f"{'stage':<28}{'ms':>9}  thread"]
+        for name, seconds, thread in stages:
+            lines.append(f"{name:<28}{seconds * 1000:>9.1f}  {thread}")
+        lines.append("")
+        lines.append(f"{'milestone':<28}{'ms':>9}")
+        for name, at in sorted(marks.items(), key=lambda item: item[1]):
+            lines.append(f"{name:<28}{at * 1000:>9.1f}")
+    return "\n".join(lines)
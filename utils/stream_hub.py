@@ -0,0 +1,196 @@
+import itertools
+import json
+import random
+import threading
+import time
+import websocket
+from utils import decoder
+from utils.metrics import metrics
+
+
+class StreamHub:
+    URL = "wss://stream.binance.com:9443/stream"
+    BATCH_DELAY = 0.05
+
+    # Reconnect delays are drawn uniformly from [0, min(MAX, BASE * 2^n)]
+    # ("full jitter"), so a fleet of displays does not reconnect in lockstep
+    RECONNECT_BASE = 0.5
+    RECONNECT_MAX = 30
+    PING_INTERVAL = 20
+    PING_TIMEOUT = 10
+    STALE_AFTER = 10
+
+    def __init__(self, url=None):
+        self.url = url or self.URL
+        self.ws = None
+        self.is_running = False
+        self.is_connected = False
+        self.opens = 0
+        self.stopped = threading.Event()
+        self.last_message = time.monotonic()
+        self.reconnects = 0
+        self.reconnect_listeners = ()
+
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.handlers = {}
+        self.subscribed = set()
+        self.flush_timer = None
+        self.recorder = None
+
+    def start(self):
+        if self.is_running:
+            return
+
+        self.is_running = True
+        self.stopped.clear()
+
+        threading.Thread(target=self.supervise, daemon=True).start()
+        threading.Thread(target=self.watchdog, daemon=True).start()
+
+    def stop(self):
+        self.is_running = False
+        self.stopped.set()
+        if self.flush_timer:
+            self.flush_timer.cancel()
+        if self.ws:
+            self.ws.close()
+            self.ws = None
+
+    def supervise(self):
+        attempt = 0
+
+        while self.is_running:
+            self.ws = websocket.WebSocketApp(
+                self.url,
+                on_open=self.on_open,
+                on_message=self.on_message,
+                on_error=lambda ws, error: print(f"stream hub error: {error}"),
+                on_close=self.on_close
+            )
+            opens = self.opens
+            self.ws.run_forever(ping_interval=self.PING_INTERVAL, ping_timeout=self.PING_TIMEOUT)
+
+            if not self.is_running:
+                break
+
+            # A connection that opened starts the backoff over
+            if self.opens != opens:
+                attempt = 0
+            delay = self.reconnect_delay(attempt)
+            attempt += 1
+            self.stopped.wait(delay)
+
+    def reconnect_delay(self, attempt):
+        delay = random.uniform(0, min(self.RECONNECT_MAX, self.RECONNECT_BASE * 2 ** attempt))
+        print(f"stream hub reconnecting in {delay:.2f}s")
+        return delay
+
+    def is_stale(self):
+        # Pings catch dead sockets; this catches a live socket whose streams went quiet
+        if self.is_connected and self.subscribed and time.monotonic() - self.last_message > self.STALE_AFTER:
+            print(f"stream hub: no data for {self.STALE_AFTER}s, reconnecting")
+            self.last_message = time.monotonic()
+            return True
+        return False
+
+    def watchdog(self):
+        while not self.stopped.wait(1):
+            ws = self.ws
+            if ws and self.is_stale():
+                ws.close()
+
+    def add_reconnect_listener(self, callback):
+        self.reconnect_listeners = self.reconnect_listeners + (callback,)
+
+    def remove_reconnect_listener(self, callback):
+        self.reconnect_listeners = tuple(cb for cb in self.reconnect_listeners if cb != callback)
+
+    def subscribe(self, stream, callback):
+        with self.lock:
+            self.handlers[stream] = self.handlers.get(stream, ()) + (callback,)
+        self.schedule_flush()
+
+    def unsubscribe(self, stream, callback):
+        with self.lock:
+            callbacks = tuple(cb for cb in self.handlers.get(stream, ()) if cb != callback)
+            if callbacks:
+                self.handlers[stream] = callbacks
+            else:
+                self.handlers.pop(stream, None)
+        self.schedule_flush()
+
+    def schedule_flush(self):
+        # Coalesce subscription changes made in one burst (e.g. a coin switch)
+        # into a single SUBSCRIBE and a single UNSUBSCRIBE request.
+        with self.lock:
+            if self.flush_timer or not self.is_connected:
+                return
+            self.flush_timer = threading.Timer(self.BATCH_DELAY, self.flush)
+            self.flush_timer.daemon = True
+            self.flush_timer.start()
+
+    def flush(self):
+        with self.lock:
+            self.flush_timer = None
+            if not self.is_connected:
+                return
+            wanted = set(self.handlers)
+            to_unsubscribe = sorted(self.subscribed - wanted)
+            to_subscribe = sorted(wanted - self.subscribed)
+            self.subscribed = wanted
+
+        if to_unsubscribe:
+            self.send("UNSUBSCRIBE", to_unsubscribe)
+        if to_subscribe:
+            self.send("SUBSCRIBE", to_subscribe)
+
+    def send(self, method, params):
+        ws = self.ws
+        if not ws:
+            return
+        try:
+            ws.send(json.dumps({"method": method, "params": params, "id": next(self.ids)}))
+        except Exception as e:
+            print(f"stream hub {method.lower()} error: {e}")
+
+    def on_open(self, ws):
+        print("stream hub connected")
+        with self.lock:
+            self.is_connected = True
+            self.subscribed = set()
+            self.last_message = time.monotonic()
+            is_reconnect = self.opens > 0
+            self.opens += 1
+        self.flush()
+
+        # Let the owners of the streams fill whatever they missed meanwhile
+        if is_reconnect:
+            self.reconnects += 1
+            for callback in self.reconnect_listeners:
+                try:
+                    callback()
+                except Exception as e:
+                    print(f"stream hub reconnect listener error: {e}")
+
+    def on_close(self, ws, status, message):
+        print("stream hub closed")
+        with self.lock:
+            self.is_connected = False
+
+    def on_message(self, ws, message):
+        self.last_message = time.monotonic()
+        if self.recorder:
+            self.recorder.record_frame(message)
+
+        # Handlers get the raw payload and decode only the fields they need
+        stream, payload = decoder.split_frame(message)
+
+        if stream is None:
+            if payload.get("error"):
+                print(f"stream hub request {payload.get('id')} failed: {payload['error']}")
+            return
+
+        metrics.count(stream)
+        for callback in self.handlers.get(stream, ()):
+            callback(payload)
@@ -0,0 +1,82 @@
+class SymbolView:
+    # The part of a view that follows one SymbolState, shared by every
+    # frontend: it registers with the state, coalesces its change events
+    # through the scheduler and pulls out what changed. Frontends (the Tk
+    # widgets, the text view used by the terminal and headless modes)
+    # implement the show_* hooks of the KINDS they draw and never touch the
+    # state or the streams themselves.
+
+    KINDS = ()
+    DEPTH = 20
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.state = None
+        self.trade_count = 0
+
+    def bind(self, state):
+        self.unbind()
+        self.state = state
+        self.trade_count = 0
+        self.reset()
+        state.add_view(self)
+        self.refresh(state)
+
+    def unbind(self):
+        if self.state:
+            self.state.remove_view(self)
+            self.state = None
+        self.scheduler.discard(self)
+
+    def on_state(self, state, kind):
+        if kind in self.KINDS:
+            self.scheduler.post((self, kind), self.render, state, kind)
+
+    def refresh(self, state):
+        # Everything at once, for a newly bound state
+        for kind in self.KINDS:
+            self.render(state, kind)
+
+    def render(self, state, kind):
+        if state is not self.state:
+            return
+
+        if kind == "ticker":
+            if state.ticker:
+                self.show_ticker(*state.ticker)
+        elif kind == "trades":
+            # Only the trades added since the last frame
+            count, trades = state.recent_trades()
+            new = min(count - self.trade_count, len(trades))
+            self.trade_count = count
+            if new > 0:
+                self.show_trades(trades[-new:])
+            self.show_flow(*state.trade_stats())
+        elif kind == "book":
+            asks, bids = state.book.top(self.DEPTH)
+            self.show_book(asks, bids)
+        elif kind == "candles":
+            self.show_candles(state)
+
+    # Renderer hooks
+
+    def reset(self):
+        # Clear everything shown for the previous symbol
+        pass
+
+    def show_ticker(self, price, change, percent, volume):
+        pass
+
+    def show_trades(self, trades):
+        # (time, price, amount, is_sell, side), oldest first
+        pass
+
+    def show_flow(self, vwap, buy_volume, sell_volume, count, rate, largest):
+        pass
+
+    def show_book(self, asks, bids):
+        # Best levels first on both sides
+        pass
+
+    def show_candles(self, state):
+        pass
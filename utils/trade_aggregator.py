@@ -0,0 +1,63 @@
+import time
+from collections import deque
+
+
+class TradeAggregator:
+    # Rolling window statistics over the trade stream. Sums are kept
+    # incrementally and the largest print is tracked with a monotonic deque,
+    # so each trade costs O(1) amortized no matter how busy the market is.
+
+    def __init__(self, window=60_000):
+        self.window = window
+        self.trades = deque()
+        self.largest = deque()
+        self.reset()
+
+    def reset(self):
+        self.trades.clear()
+        self.largest.clear()
+        self.notional = 0.0
+        self.buy_volume = 0.0
+        self.sell_volume = 0.0
+
+    def add(self, time, price, amount, is_sell):
+        trade = (time, price, amount, is_sell)
+        self.trades.append(trade)
+        self.notional += price * amount
+        if is_sell:
+            self.sell_volume += amount
+        else:
+            self.buy_volume += amount
+
+        while self.largest and self.largest[-1][2] <= amount:
+            self.largest.pop()
+        self.largest.append(trade)
+
+        self.expire(time)
+
+    def expire(self, now):
+        cutoff = now - self.window
+        while self.trades and self.trades[0][0] <= cutoff:
+            time, price, amount, is_sell = self.trades.popleft()
+            self.notional -= price * amount
+            if is_sell:
+                self.sell_volume -= amount
+            else:
+                self.buy_volume -= amount
+
+        while self.largest and self.largest[0][0] <= cutoff:
+            self.largest.popleft()
+
+        # Start the sums over once the window drains so float error cannot build up
+        if not self.trades:
+            self.reset()
+
+    def stats(self, now=None):
+        # Trades also age out between prints, so a quiet market decays to zero
+        self.expire(time.time() * 1000 if now is None else now)
+        count = len(self.trades)
+        volume = self.buy_volume + self.sell_volume
+        vwap = self.notional / volume if volume > 0 else None
+        largest = self.largest[0] if self.largest else None
+        rate = count / (self.window / 1000)
+        return vwap, self.buy_volume, self.sell_volume, count, rate, largest
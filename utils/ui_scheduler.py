@@ -0,0 +1,135 @@
+import itertools
+import threading
+import time
+from utils.metrics import metrics
+
+
+class UpdateScheduler:
+    # Network threads hand their latest state to the scheduler; the Tk main
+    # loop applies everything that arrived in one pass per frame.
+
+    def __init__(self, root, fps=20):
+        self.root = root
+        self.interval = 1 / fps
+        self.lock = threading.Lock()
+        self.job = None
+
+        self.pending = {}
+        self.batches = {}
+
+        self.posted = 0
+        self.applied = 0
+        self.coalesced = 0
+
+    def start(self):
+        if self.job is None:
+            self.job = self.root.after(int(self.interval * 1000), self.flush)
+
+    def stop(self):
+        if self.job is not None:
+            self.root.after_cancel(self.job)
+            self.job = None
+
+    def post(self, key, callback, *args):
+        # Keep only the latest state per key
+        with self.lock:
+            self.posted += 1
+            if key in self.pending:
+                self.coalesced += 1
+            self.pending[key] = (callback, args)
+
+    def append(self, key, callback, item, limit=None):
+        # Accumulate items per key; callback receives them oldest first
+        with self.lock:
+            self.posted += 1
+            batch = self.batches.get(key)
+            if batch is None:
+                batch = self.batches[key] = (callback, [])
+            items = batch[1]
+            items.append(item)
+            if limit is not None and len(items) > limit:
+                del items[0]
+                self.coalesced += 1
+
+    def discard(self, owner):
+        # Drop queued updates whose key belongs to owner, e.g. a stopped component
+        with self.lock:
+            for queue in (self.pending, self.batches):
+                for key in [k for k in queue if k[0] is owner]:
+                    del queue[key]
+
+    def flush(self):
+        started = time.perf_counter()
+
+        # A second pass picks up updates posted by the first one (e.g. a
+        # candle update notifying the chart) so they land in the same frame
+        for _ in range(2):
+            with self.lock:
+                pending, self.pending = self.pending, {}
+                batches, self.batches = self.batches, {}
+
+            if not pending and not batches:
+                break
+
+            for callback, args in pending.values():
+                self.apply(callback, *args)
+
+            for callback, items in batches.values():
+                self.apply(callback, items)
+
+        elapsed = time.perf_counter() - started
+        metrics.duration("ui_flush", elapsed)
+        delay = max(1, int((self.interval - elapsed) * 1000))
+        self.job = self.root.after(delay, self.flush)
+
+    def apply(self, callback, *args):
+        try:
+            callback(*args)
+            self.applied += 1
+        except Exception as e:
+            print("UI update error:", e)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "posted": self.posted,
+                "applied": self.applied,
+                "coalesced": self.coalesced,
+                "pending": len(self.pending) + len(self.batches),
+            }
+
+
+class FrameLoop:
+    # Minimal stand-in for a Tk root's after(), so the scheduler can run
+    # without Tk: the terminal and headless frontends and the benchmarks
+    # call update() in their own loop
+
+    def __init__(self):
+        self.jobs = {}
+        self.ids = itertools.count()
+
+    def after(self, delay, callback):
+        job = next(self.ids)
+        self.jobs[job] = (time.perf_counter() + delay / 1000, callback)
+        return job
+
+    def after_cancel(self, job):
+        self.jobs.pop(job, None)
+
+    def next_due(self):
+        # Seconds until the next job is due (None when there is none)
+        if not self.jobs:
+            return None
+        return max(min(due for due, callback in self.jobs.values()) - time.perf_counter(), 0)
+
+    def update(self, wait=0.001):
+        # Runs the due jobs, then sleeps until the next one, at most `wait`
+        now = time.perf_counter()
+        for job, (due, callback) in sorted(self.jobs.items(), key=lambda item: item[1][0]):
+            if due <= now:
+                del self.jobs[job]
+                callback()
+
+        delay = self.next_due()
+        if wait:
+            time.sleep(wait if delay is None else min(delay, wait))
@@ -0,0 +1,237 @@
+import base64
+import hashlib
+import os
+import socket
+import struct
+import threading
+
+GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+
+def accept_key(key):
+    digest = hashlib.sha1((key + GUID).encode()).digest()
+    return base64.b64encode(digest).decode()
+
+
+def encode_frame(payload, opcode=OP_TEXT, mask=False):
+    if isinstance(payload, str):
+        payload = payload.encode()
+
+    length = len(payload)
+    head = bytes([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0
+
+    if length < 126:
+        head += bytes([mask_bit | length])
+    elif length < 1 << 16:
+        head += bytes([mask_bit | 126]) + struct.pack("!H", length)
+    else:
+        head += bytes([mask_bit | 127]) + struct.pack("!Q", length)
+
+    if not mask:
+        return head + payload
+
+    key = os.urandom(4)
+    return head + key + apply_mask(payload, key)
+
+
+def apply_mask(payload, key):
+    if not payload:
+        return payload
+    n = len(payload)
+    pattern = (key * (n // 4 + 1))[:n]
+    return (int.from_bytes(payload, "big") ^ int.from_bytes(pattern, "big")).to_bytes(n, "big")
+
+
+def read_exact(stream, n):
+    data = stream.read(n)
+    if data is None or len(data) < n:
+        raise ConnectionError("connection closed")
+    return data
+
+
+def read_frame(stream):
+    b1, b2 = read_exact(stream, 2)
+    opcode = b1 & 0x0F
+    length = b2 & 0x7F
+
+    if length == 126:
+        length = struct.unpack("!H", read_exact(stream, 2))[0]
+    elif length == 127:
+        length = struct.unpack("!Q", read_exact(stream, 8))[0]
+
+    key = read_exact(stream, 4) if b2 & 0x80 else None
+    payload = read_exact(stream, length) if length else b""
+    if key:
+        payload = apply_mask(payload, key)
+
+    return opcode, payload
+
+
+class Connection:
+    def __init__(self, sock, path):
+        self.sock = sock
+        self.path = path
+        self.lock = threading.Lock()
+        self.is_open = True
+        self.context = {}
+
+    def send(self, text):
+        if not self.is_open:
+            return False
+        try:
+            with self.lock:
+                self.sock.sendall(encode_frame(text))
+            return True
+        except OSError:
+            self.is_open = False
+            return False
+
+    def close(self):
+        if not self.is_open:
+            return
+        self.is_open = False
+        try:
+            with self.lock:
+                self.sock.sendall(encode_frame(b"", OP_CLOSE))
+        except OSError:
+            pass
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+class WebSocketServer:
+    def __init__(self, host="127.0.0.1", port=0, on_open=None, on_message=None, on_close=None, on_http=None):
+        self.host = host
+        self.port = port
+        self.on_open = on_open
+        self.on_message = on_message
+        self.on_close = on_close
+        self.on_http = on_http
+        self.sock = None
+        self.is_running = False
+        self.connections = set()
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+
+    def start(self):
+        if self.is_running:
+            return
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((self.host, self.port))
+        self.sock.listen()
+        self.port = self.sock.getsockname()[1]
+        self.is_running = True
+
+        threading.Thread(target=self.accept_loop, daemon=True).start()
+
+    def stop(self):
+        self.is_running = False
+        if self.sock:
+            self.sock.close()
+            self.sock = None
+        with self.lock:
+            connections = list(self.connections)
+        for conn in connections:
+            conn.close()
+
+    def accept_loop(self):
+        while self.is_running:
+            try:
+                client, _ = self.sock.accept()
+            except OSError:
+                break
+            threading.Thread(target=self.serve, args=(client,), daemon=True).start()
+
+    def read_request(self, stream):
+        request = b""
+        while not request.endswith(b"\r\n\r\n"):
+            line = stream.readline()
+            if not line:
+                raise ConnectionError("handshake aborted")
+            request += line
+
+        lines = request.decode().split("\r\n")
+        path = lines[0].split(" ")[1]
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        return path, headers
+
+    def respond_http(self, client, path):
+        # Plain HTTP requests (e.g. REST stand-ins) share the port with the WebSocket
+        # on_http may return a content type as a third item
+        status, body, *content_type = self.on_http(path) if self.on_http else (404, "")
+        content_type = content_type[0] if content_type else "application/json"
+        body = body.encode()
+        reason = "OK" if status == 200 else "Error"
+        client.sendall(
+            f"HTTP/1.1 {status} {reason}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n".encode() + body
+        )
+
+    def handshake(self, client, path, headers):
+        response = (
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept_key(headers['sec-websocket-key'])}\r\n\r\n"
+        )
+        client.sendall(response.encode())
+        return path
+
+    def serve(self, client):
+        client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        stream = client.makefile("rb")
+        conn = None
+
+        try:
+            path, headers = self.read_request(stream)
+            if headers.get("upgrade", "").lower() != "websocket":
+                self.respond_http(client, path)
+                return
+
+            conn = Connection(client, self.handshake(client, path, headers))
+            with self.lock:
+                self.connections.add(conn)
+            if self.on_open:
+                self.on_open(conn)
+
+            while conn.is_open:
+                opcode, payload = read_frame(stream)
+                if opcode == OP_CLOSE:
+                    break
+                if opcode == OP_PING:
+                    with conn.lock:
+                        client.sendall(encode_frame(payload, OP_PONG))
+                elif opcode in (OP_TEXT, OP_BINARY) and self.on_message:
+                    self.on_message(conn, payload.decode())
+        except (ConnectionError, OSError, KeyError, IndexError):
+            pass
+        finally:
+            if conn:
+                conn.close()
+                with self.lock:
+                    self.connections.discard(conn)
+                if self.on_close:
+                    self.on_close(conn)
+            stream.close()
+            client.close()